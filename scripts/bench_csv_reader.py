@@ -0,0 +1,115 @@
+# scripts/bench_csv_reader.py
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+import argparse
+import os
+import tempfile
+import time
+import warnings
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+from multimatcher.datasets.registry import get_dataset_spec
+from multimatcher.schema.io import read_csv_clean
+
+# same options schema_generation uses
+READ_KWARGS = dict(
+    encodings=["utf-8", "cp949", "latin1"],
+    engine="python",
+    quotechar='"',
+    escapechar="\\",
+    on_bad_lines="warn",
+)
+
+
+def make_m2bench_style_tables(out_dir: str, rows: int, seed: int = 0) -> List[str]:
+    """Synthetic customer/product/brand-like tables (utf-8 + a cp949 variant)."""
+    rng = np.random.default_rng(seed)
+    customer = pd.DataFrame({
+        "customer_id": [f"AAAAAAAA{i:08d}" for i in range(rows)],
+        "person_id": np.arange(rows),
+        "gender": rng.choice(["M", "F"], rows),
+        "birthday": pd.date_range("1950-01-01", periods=rows, freq="h").strftime("%Y-%m-%d"),
+        "address": [f"{i} Main St, City {i % 97}" for i in range(rows)],
+    })
+    product = pd.DataFrame({
+        "product_id": [f"B{i:09d}" for i in range(rows)],
+        "brand_id": rng.integers(0, 64, rows),
+        "title": [f"Product \"{i}\", size {i % 13}" for i in range(rows)],
+        "price": rng.random(rows) * 500,
+        "imUrl": [f"http://example.com/img/{i}.jpg" for i in range(rows)],
+    })
+    brand_kr = pd.DataFrame({
+        "brand_id": np.arange(rows),
+        "name": [f"브랜드_{i}" for i in range(rows)],
+        "country": rng.choice(["한국", "China", "Wales"], rows),
+    })
+
+    paths = []
+    for name, df, enc in (
+        ("customer.csv", customer, "utf-8"),
+        ("product.csv", product, "utf-8"),
+        ("brand_cp949.csv", brand_kr, "cp949"),
+    ):
+        p = os.path.join(out_dir, name)
+        df.to_csv(p, index=False, encoding=enc)
+        paths.append(p)
+    return paths
+
+
+def bench(paths: List[str], backends: List[str], repeat: int) -> None:
+    print(f"{'file':<28}{'MB':>8}" + "".join(f"{b + ' s':>12}" for b in backends) + f"{'speedup':>10}  same")
+    for p in paths:
+        timings: Dict[str, float] = {}
+        frames: Dict[str, pd.DataFrame] = {}
+        for backend in backends:
+            best = float("inf")
+            for _ in range(repeat):
+                t0 = time.perf_counter()
+                df = read_csv_clean(p, backend=backend, **READ_KWARGS).infer_objects()
+                best = min(best, time.perf_counter() - t0)
+            timings[backend] = best
+            frames[backend] = df
+
+        ref = frames[backends[0]]
+        same = all(frames[b].equals(ref) for b in backends[1:])
+        speedup = timings[backends[0]] / min(timings[b] for b in backends[1:]) if len(backends) > 1 else 1.0
+        mb = os.path.getsize(p) / 1e6
+        print(
+            f"{os.path.basename(p):<28}{mb:>8.1f}"
+            + "".join(f"{timings[b]:>12.3f}" for b in backends)
+            + f"{speedup:>9.1f}x  {same}"
+        )
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Benchmark read_csv_clean: legacy (python engine) vs sniff-once backends.")
+    ap.add_argument("--rows", type=int, default=200_000, help="Rows per synthetic table.")
+    ap.add_argument("--dataset", default=None, help="Benchmark a real dataset's table files instead (needs --data-root).")
+    ap.add_argument("--data-root", default=os.getenv("MULTIMATCHER_DATA_ROOT"))
+    ap.add_argument("--backends", default="legacy,c", help="Comma-separated: legacy,c,pyarrow (first = baseline).")
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    warnings.simplefilter("ignore")
+    backends = [b.strip() for b in args.backends.split(",") if b.strip()]
+
+    if args.dataset:
+        spec = get_dataset_spec(args.dataset, data_root=args.data_root or "data")
+        paths = [os.path.join(spec.table_dir, f) for f in spec.table_files]
+        bench(paths, backends, args.repeat)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        bench(make_m2bench_style_tables(tmp, args.rows), backends, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+# scripts/bench_kneedle.py
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+import argparse
+import time
+import warnings
+
+import numpy as np
+
+from multimatcher.filtering.kneedle import kneedle
+from multimatcher.filtering.thresholding import compute_thresholds
+
+
+def per_row_thresholds(similarity_matrix: np.ndarray, S: float, D: float) -> np.ndarray:
+    """Previous compute_thresholds: one kneedle() call per row."""
+    thresholds = np.empty(similarity_matrix.shape[0], dtype=float)
+    for i, row in enumerate(similarity_matrix):
+        row = row[~np.isnan(row)]
+        if row.size == 0:
+            thresholds[i] = 0.0
+            continue
+        kp = kneedle(row, S=S, D=D)
+        thresholds[i] = float(kp) if kp is not None else 0.0
+    return thresholds
+
+
+def make_similarities(n: int, width: int, seed: int = 0) -> np.ndarray:
+    """Retrieval-like rows: self (1.0), a few close matches, then a long tail; descending like real results."""
+    rng = np.random.default_rng(seed)
+    close = rng.integers(0, 6, size=n)
+    sims = rng.beta(2.0, 5.0, size=(n, width)) * 0.6 + 0.2
+    head = rng.uniform(0.75, 0.95, size=(n, width))
+    cols = np.arange(width)[None, :]
+    sims = np.where((cols >= 1) & (cols <= close[:, None]), head, sims)
+    sims[:, 0] = 1.0
+    return -np.sort(-sims, axis=1)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="compute_thresholds: per-row kneedle() loop vs batched kneedle_rows.")
+    ap.add_argument("--sizes", default="1000,2000,5000,10000,20000,50000")
+    ap.add_argument(
+        "--width",
+        type=int,
+        default=None,
+        help="Candidates per row (top-k). Default: N (all pairs) up to --max-cells, else top-k width.",
+    )
+    ap.add_argument("--max-cells", type=float, default=1e8, help="Largest N x width matrix (float64) to build.")
+    ap.add_argument("--loop-max-cells", type=float, default=2.5e7, help="Skip the per-row loop above this size.")
+    ap.add_argument("--S", type=float, default=1.0)
+    ap.add_argument("--D", type=float, default=0.85)
+    args = ap.parse_args()
+
+    print(f"{'N':>7}{'width':>7}{'loop s':>10}{'batch s':>10}{'speedup':>9}{'identical':>11}")
+    for n in (int(s) for s in args.sizes.split(",") if s.strip()):
+        width = args.width or n
+        if n * width > args.max_cells:
+            width = max(2, int(args.max_cells // n))
+        sims = make_similarities(n, width)
+
+        t0 = time.perf_counter()
+        batch = compute_thresholds(sims, S=args.S, D=args.D)
+        t_batch = time.perf_counter() - t0
+
+        if n * width > args.loop_max_cells:
+            print(f"{n:>7}{width:>7}{'-':>10}{t_batch:>10.2f}{'-':>9}{'-':>11}")
+            continue
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)  # mean of empty diff for 1-element rows
+            t0 = time.perf_counter()
+            loop = per_row_thresholds(sims, args.S, args.D)
+            t_loop = time.perf_counter() - t0
+        same = np.array_equal(loop, batch)
+        print(f"{n:>7}{width:>7}{t_loop:>10.2f}{t_batch:>10.2f}{t_loop / t_batch:>8.1f}x{str(same):>11}")
+
+
+if __name__ == "__main__":
+    main()
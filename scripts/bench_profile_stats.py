@@ -0,0 +1,126 @@
+# scripts/bench_profile_stats.py
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+import argparse
+import json
+import math
+import time
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+import pandas as pd
+
+from multimatcher.schema.stats import extract_unique_values, stat_compute
+
+
+# ---- previous per-element implementations (reference) ----
+def legacy_stat_compute(series: pd.Series) -> Dict[str, Any]:
+    null_count = series.isna().sum()
+    count_val = series.count()
+    percentage_unique = round(series.nunique() / count_val * 100, 1) if count_val > 0 else None
+    return {
+        "count": count_val,
+        "min": round(series.min(), 1) if count_val > 0 else None,
+        "max": round(series.max(), 1) if count_val > 0 else None,
+        "mean": round(series.mean(), 1) if count_val > 0 else None,
+        "median": round(series.median(), 1) if count_val > 0 else None,
+        "std": round(series.std(), 1) if count_val > 0 else None,
+        "var": round(series.var(), 1) if count_val > 0 else None,
+        "percentage_unique_value": percentage_unique,
+        "possible_primary_key": bool(null_count == 0 and (percentage_unique == 100)),
+    }
+
+
+def legacy_extract_unique_values(col_vals: pd.Series) -> List[Any]:
+    def try_parse(x: Any) -> Any:
+        if isinstance(x, str):
+            s = x.strip()
+            if s.startswith("[") and s.endswith("]"):
+                try:
+                    parsed = json.loads(s)
+                    if isinstance(parsed, list):
+                        return parsed
+                except json.JSONDecodeError:
+                    pass
+        return x
+
+    def flatten(x: Any):
+        if isinstance(x, list):
+            for elem in x:
+                yield from flatten(elem)
+        else:
+            yield x
+
+    parsed = col_vals.map(try_parse)
+    if parsed.apply(lambda x: isinstance(x, list)).any():
+        seen = set()
+        uniques: List[Any] = []
+        for item in parsed:
+            for val in flatten(item):
+                if pd.isna(val):
+                    continue
+                if val not in seen:
+                    seen.add(val)
+                    uniques.append(val)
+        return uniques
+    return parsed.unique().tolist()
+
+
+def make_columns(rows: int, seed: int = 0) -> Dict[str, pd.Series]:
+    rng = np.random.default_rng(seed)
+    floats = rng.normal(100, 25, rows)
+    floats[rng.random(rows) < 0.05] = np.nan
+    tags = [["a", "b"], ["c"], [], ["a", ["d", "e"]]]
+    return {
+        "int64": pd.Series(rng.integers(0, rows, rows)),
+        "int64_pk": pd.Series(np.arange(rows)),
+        "float64_nan": pd.Series(floats),
+        "string": pd.Series([f"value_{i % 5000}" for i in range(rows)], dtype=object),
+        "json_list_str": pd.Series([json.dumps(tags[i % 4]) + (" " if i % 7 else "") for i in range(rows)], dtype=object),
+        "list_objects": pd.Series([tags[i % 4] for i in range(rows)], dtype=object),
+        "mixed_object": pd.Series([i if i % 2 else f"s{i % 100}" for i in range(rows)], dtype=object),
+    }
+
+
+def _same(a: Any, b: Any) -> bool:
+    if isinstance(a, dict):
+        return a.keys() == b.keys() and all(_same(a[k], b[k]) for k in a)
+    if isinstance(a, float) and isinstance(b, float) and math.isnan(a) and math.isnan(b):
+        return True
+    return a == b
+
+
+def _best(fn: Callable[[], Any], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Micro-benchmark stat_compute / extract_unique_values per dtype.")
+    ap.add_argument("--rows", type=int, default=200_000)
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    print(f"{'column':<16}{'kernel':<24}{'legacy s':>10}{'new s':>10}{'speedup':>10}  same")
+    for name, col in make_columns(args.rows).items():
+        kernels = [("extract_unique_values", legacy_extract_unique_values, extract_unique_values, col.dropna())]
+        if pd.api.types.is_numeric_dtype(col):
+            kernels.append(("stat_compute", legacy_stat_compute, stat_compute, col))
+        for kernel, old, new, arg in kernels:
+            t_old = _best(lambda: old(arg), args.repeat)
+            t_new = _best(lambda: new(arg), args.repeat)
+            same = _same(old(arg), new(arg))
+            print(f"{name:<16}{kernel:<24}{t_old:>10.3f}{t_new:>10.3f}{t_old / t_new:>9.1f}x  {same}")
+
+
+if __name__ == "__main__":
+    main()
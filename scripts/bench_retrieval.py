@@ -0,0 +1,88 @@
+# scripts/bench_retrieval.py
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+import argparse
+import os
+import tempfile
+import time
+from typing import Optional, Tuple
+
+import numpy as np
+
+from multimatcher.retrieval.dense_cosine import dense_cosine_topk
+
+os.environ.setdefault("CHROMA_TELEMETRY_DISABLED", "1")
+
+
+def make_embeddings(n: int, dim: int, seed: int = 0) -> np.ndarray:
+    """Clustered random vectors (schema elements of one concept sit close together)."""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(max(1, n // 20), dim)).astype(np.float32)
+    x = centers[rng.integers(0, centers.shape[0], n)] + 0.5 * rng.normal(size=(n, dim)).astype(np.float32)
+    return x
+
+
+def bench_dense(x: np.ndarray, k: Optional[int], block_rows: int) -> Tuple[float, np.ndarray]:
+    t0 = time.perf_counter()
+    idx, _ = dense_cosine_topk(x, top_k=k, block_rows=block_rows)
+    return time.perf_counter() - t0, idx
+
+
+def bench_chroma(x: np.ndarray, k: int) -> Tuple[float, Optional[np.ndarray], str]:
+    """Same call pattern as chroma_cosine (cosine HNSW, add all, query all), with precomputed vectors."""
+    import chromadb
+
+    with tempfile.TemporaryDirectory() as tmp:
+        client = chromadb.PersistentClient(path=tmp)
+        col = client.create_collection(name="bench", metadata={"hnsw:space": "cosine"})
+        ids = [str(i) for i in range(x.shape[0])]
+        t0 = time.perf_counter()
+        try:
+            batch = client.get_max_batch_size()
+            for s in range(0, len(ids), batch):
+                col.add(ids=ids[s:s + batch], embeddings=x[s:s + batch])
+            out = col.query(query_embeddings=x, n_results=k, include=["distances"])
+        except Exception as e:  # e.g. result size limits of the installed chromadb
+            return time.perf_counter() - t0, None, type(e).__name__
+        elapsed = time.perf_counter() - t0
+    idx = np.array([[int(i) for i in row] for row in out["ids"]], dtype=np.int64)
+    return elapsed, idx, ""
+
+
+def recall_at_k(exact: np.ndarray, approx: np.ndarray) -> float:
+    hits = sum(len(set(a.tolist()) & set(e.tolist())) for a, e in zip(approx, exact))
+    return hits / exact.size
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Benchmark exact NumPy cosine engine vs Chroma all-pairs query.")
+    ap.add_argument("--sizes", default="1000,10000,50000")
+    ap.add_argument("--dim", type=int, default=3072, help="text-embedding-3-large: 3072")
+    ap.add_argument("--top-k", type=int, default=None, help="Neighbours per row (default: N while the N x N output fits --max-output-gb, else 100).")
+    ap.add_argument("--max-output-gb", type=float, default=4.0)
+    ap.add_argument("--block-rows", type=int, default=1024)
+    ap.add_argument("--no-chroma", action="store_true")
+    args = ap.parse_args()
+
+    print(f"{'N':>8}{'k':>8}{'numpy s':>10}{'chroma s':>10}{'speedup':>10}{'recall':>8}  note")
+    for n in (int(s) for s in args.sizes.split(",") if s.strip()):
+        x = make_embeddings(n, args.dim)
+        k = args.top_k
+        if k is None:
+            k = n if n * n * 8 / 1e9 <= args.max_output_gb else 100
+        k = min(k, n)
+
+        t_dense, exact = bench_dense(x, k, args.block_rows)
+        t_chroma, approx, note = (float("nan"), None, "skipped") if args.no_chroma else bench_chroma(x, k)
+        recall = recall_at_k(exact, approx) if approx is not None else float("nan")
+        speedup = t_chroma / t_dense if approx is not None else float("nan")
+        print(f"{n:>8}{k:>8}{t_dense:>10.2f}{t_chroma:>10.2f}{speedup:>9.1f}x{recall:>8.3f}  {note}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+# scripts/bench_retrieval_memory.py
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+from multimatcher.filtering.thresholding import build_sim_matrices
+from multimatcher.retrieval.chroma_cosine import compute_pairwise_cosine_similarity
+from multimatcher.retrieval.dense_cosine import compute_pairwise_cosine_similarity_dense
+
+os.environ.setdefault("CHROMA_TELEMETRY_DISABLED", "1")
+
+
+def make_inputs(n: int, text_chars: int, dim: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    texts = [f"t{i}:" + "x" * text_chars for i in range(n)]
+    meta = [
+        {"source_type": "table", "source_name": f"src{i % 20}", "element_type": "column", "element_name": f"col_{i}"}
+        for i in range(n)
+    ]
+    x = rng.normal(size=(n, dim)).astype(np.float32)
+    embed_fn = lambda batch: x[[int(t[1:t.index(":")]) for t in batch]]  # noqa: E731
+    return texts, meta, embed_fn
+
+
+def measure(fn):
+    """(seconds, retained MB of the returned result, peak MB) of Python allocations."""
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - t0
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, retained / 1e6, peak / 1e6, result
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Retrieval result memory: list of candidate dicts vs index/score arrays.")
+    ap.add_argument("--sizes", default="250,500,1000")
+    ap.add_argument("--text-chars", type=int, default=400, help="Rendered schema text length.")
+    ap.add_argument("--dim", type=int, default=64)
+    ap.add_argument("--engines", default="chroma,numpy")
+    args = ap.parse_args()
+
+    print(f"{'engine':>8}{'N':>7}{'format':>8}{'sec':>8}{'result MB':>11}{'peak MB':>10}{'+sim_matrices s':>17}")
+    for n in (int(s) for s in args.sizes.split(",") if s.strip()):
+        texts, meta, embed_fn = make_inputs(n, args.text_chars, args.dim)
+        for engine in (e.strip() for e in args.engines.split(",") if e.strip()):
+            for as_arrays in (False, True):
+                with tempfile.TemporaryDirectory() as tmp:
+                    if engine == "chroma":
+                        run = lambda: compute_pairwise_cosine_similarity(  # noqa: E731
+                            texts, meta, None, "bench", tmp, "bench", embed_fn=embed_fn, as_arrays=as_arrays
+                        )
+                    else:
+                        run = lambda: compute_pairwise_cosine_similarity_dense(  # noqa: E731
+                            texts, meta, None, "bench", embed_fn=embed_fn, as_arrays=as_arrays
+                        )
+                    elapsed, retained, peak, result = measure(run)
+                t0 = time.perf_counter()
+                build_sim_matrices(result, meta)
+                t_sim = time.perf_counter() - t0
+                del result
+                fmt = "arrays" if as_arrays else "dicts"
+                print(f"{engine:>8}{n:>7}{fmt:>8}{elapsed:>8.2f}{retained:>11.1f}{peak:>10.1f}{t_sim:>17.2f}")
+
+
+if __name__ == "__main__":
+    main()
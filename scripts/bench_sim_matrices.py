@@ -0,0 +1,150 @@
+# scripts/bench_sim_matrices.py
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+import argparse
+import json
+import subprocess
+import time
+from typing import List, Tuple
+
+import numpy as np
+
+from multimatcher.filtering.thresholding import apply_thresholds, build_sim_matrices, compute_thresholds
+from multimatcher.retrieval.neighbors import NeighborArrays
+
+
+def legacy_sim_matrices(neighbors: NeighborArrays, ids: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Previous build_sim_matrices: (N, K, 4) object array [from_id, rank, similarity, to_id]."""
+    N, K = neighbors.indices.shape
+    valid = neighbors.indices >= 0
+    similarity_matrix = neighbors.scores.astype(float)
+
+    sim_matrix = np.empty((N, K, 4), dtype=object)
+    sim_matrix[:, :, 0] = np.where(valid, ids[:, None], None)
+    sim_matrix[:, :, 1] = np.where(valid, np.arange(1, K + 1, dtype=object)[None, :], None)
+    sim_matrix[:, :, 2] = similarity_matrix
+    sim_matrix[:, :, 3] = np.where(valid, ids[np.where(valid, neighbors.indices, 0)], None)
+    return sim_matrix, similarity_matrix
+
+
+def legacy_apply_thresholds(sim_matrix: np.ndarray, similarity_matrix: np.ndarray, thresholds: np.ndarray) -> List[List[dict]]:
+    mask = similarity_matrix >= thresholds[:, None]
+    filtered: List[List[dict]] = []
+    for i in range(similarity_matrix.shape[0]):
+        valid_idxs = np.where(mask[i])[0]
+        order = valid_idxs[np.argsort(similarity_matrix[i, valid_idxs])[::-1]]
+        filtered.append(
+            [
+                {"Candidate": str(to_id), "Cosine Similarity": float(sim)}
+                for to_id, sim in zip(sim_matrix[i, order, 3], similarity_matrix[i, order])
+            ]
+        )
+    return filtered
+
+
+def make_neighbors(n: int, width: int, seed: int = 0) -> Tuple[NeighborArrays, np.ndarray]:
+    """Retrieval-like arrays: self (1.0) first, a few close matches, a long tail; ids like 'source_17/column_123'."""
+    rng = np.random.default_rng(seed)
+    indices = np.empty((n, width), dtype=np.int32)
+    indices[:, 0] = np.arange(n)
+    indices[:, 1:] = rng.integers(0, n, size=(n, width - 1))
+    close = rng.integers(0, 6, size=n)
+    scores = (rng.beta(2.0, 5.0, size=(n, width)) * 0.6 + 0.2).astype(np.float32)
+    cols = np.arange(width)[None, :]
+    head = rng.uniform(0.75, 0.95, size=(n, width)).astype(np.float32)
+    scores = np.where((cols >= 1) & (cols <= close[:, None]), head, scores)
+    scores = -np.sort(-scores, axis=1)
+    scores[:, 0] = 1.0
+    ids = np.empty(n, dtype=object)
+    ids[:] = [f"source_{i % 50}/column_{i}" for i in range(n)]
+    return NeighborArrays(indices, scores), ids
+
+
+def _rss_mb(field: str) -> float:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(field + ":"):
+                return int(line.split()[1]) / 1024
+    return float("nan")
+
+
+def _reset_peak_rss() -> None:
+    """Restart VmHWM from the current RSS (Linux >= 4.0), so setup temporaries are not counted."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+def child(impl: str, n: int, width: int, stage: str) -> None:
+    neighbors, ids = make_neighbors(n, width)
+    meta = [{"source_name": s.split("/")[0], "element_name": s.split("/")[1]} for s in ids]
+    _reset_peak_rss()
+    base = _rss_mb("VmRSS")
+    t0 = time.perf_counter()
+    if impl == "legacy":
+        sim_matrix, similarity_matrix = legacy_sim_matrices(neighbors, ids)
+        thresholds = compute_thresholds(similarity_matrix)
+        build_peak = _rss_mb("VmHWM")
+        filtered = legacy_apply_thresholds(sim_matrix, similarity_matrix, thresholds) if stage == "filter" else []
+    else:
+        sim_matrix, similarity_matrix = build_sim_matrices(neighbors, meta)
+        thresholds = compute_thresholds(similarity_matrix)
+        build_peak = _rss_mb("VmHWM")
+        filtered = apply_thresholds(sim_matrix, similarity_matrix, thresholds)[0] if stage == "filter" else []
+    elapsed = time.perf_counter() - t0
+    pairs = sum(len(f) for f in filtered)
+    print(
+        json.dumps(
+            {"sec": elapsed, "base_mb": base, "build_mb": build_peak, "peak_mb": _rss_mb("VmHWM"), "pairs": pairs}
+        )
+    )
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Filtering stage peak RSS: (N, K, 4) object sim_matrix vs typed SimMatrix.")
+    ap.add_argument("--sizes", default="1000,2000,5000")
+    ap.add_argument("--width", type=int, default=None, help="Candidates per row (top-k). Default: N (all pairs).")
+    ap.add_argument("--impls", default="legacy,typed")
+    ap.add_argument(
+        "--stage",
+        choices=["build", "filter"],
+        default="filter",
+        help="build: stop after compute_thresholds (the filtered dicts dominate all-pairs runs and are the same for both).",
+    )
+    ap.add_argument("--child", nargs=3, metavar=("IMPL", "N", "WIDTH"), help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.child:
+        child(args.child[0], int(args.child[1]), int(args.child[2]), args.stage)
+        return
+
+    print("MB over the RSS after retrieval arrays were built (VmHWM, fresh process per run, reset after setup):")
+    print("  build = build_sim_matrices + compute_thresholds, filter = + apply_thresholds")
+    print(f"{'impl':>8}{'N':>7}{'width':>7}{'sec':>8}{'build MB':>10}{'filter MB':>11}{'peak MB':>9}{'pairs':>10}")
+    for n in (int(s) for s in args.sizes.split(",") if s.strip()):
+        width = min(args.width or n, n)
+        for impl in (i.strip() for i in args.impls.split(",") if i.strip()):
+            out = subprocess.run(
+                [sys.executable, __file__, "--stage", args.stage, "--child", impl, str(n), str(width)],
+                capture_output=True,
+                text=True,
+            )
+            if out.returncode != 0:
+                print(f"{impl:>8}{n:>7}{width:>7}  failed (exit {out.returncode}, killed = out of memory)")
+                continue
+            r = json.loads(out.stdout.strip().splitlines()[-1])
+            print(
+                f"{impl:>8}{n:>7}{width:>7}{r['sec']:>8.2f}{r['build_mb'] - r['base_mb']:>10.1f}"
+                f"{r['peak_mb'] - r['base_mb']:>11.1f}{r['peak_mb']:>9.1f}{r['pairs']:>10}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+# scripts/bench_streaming.py
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+import argparse
+import hashlib
+import json
+import subprocess
+import time
+
+import numpy as np
+
+from multimatcher.filtering.streaming import stream_filter
+from multimatcher.filtering.thresholding import apply_thresholds, build_sim_matrices, compute_thresholds
+from multimatcher.retrieval.dense_cosine import dense_cosine_topk, iter_neighbor_blocks
+from multimatcher.retrieval.neighbors import NeighborArrays
+
+
+def make_embeddings(n: int, dim: int, seed: int = 0) -> np.ndarray:
+    """Clustered vectors (about five elements per cluster), so rows have a few close neighbours."""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(max(1, n // 5), dim))
+    x = centers[rng.integers(0, len(centers), size=n)] + 0.6 * rng.normal(size=(n, dim))
+    return x.astype(np.float32)
+
+
+def _rss_mb(field: str) -> float:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(field + ":"):
+                return int(line.split()[1]) / 1024
+    return float("nan")
+
+
+def _reset_peak_rss() -> None:
+    """Restart VmHWM from the current RSS (Linux >= 4.0), so setup temporaries are not counted."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+def child(mode: str, n: int, dim: int, top_k: int, block_rows: int) -> None:
+    x = make_embeddings(n, dim)
+    ids = np.empty(n, dtype=object)
+    ids[:] = [f"source_{i % 50}/column_{i}" for i in range(n)]
+    k = top_k or None
+    _reset_peak_rss()
+    base = _rss_mb("VmRSS")
+    t0 = time.perf_counter()
+    if mode == "batch":
+        neighbors = NeighborArrays(*dense_cosine_topk(x, top_k=k, block_rows=block_rows))
+        meta = [{"source_name": s.split("/")[0], "element_name": s.split("/")[1]} for s in ids]
+        sim_matrix, similarity_matrix = build_sim_matrices(neighbors, meta)
+        thresholds = compute_thresholds(similarity_matrix)
+        graph = apply_thresholds(sim_matrix, similarity_matrix, thresholds, as_graph=True)
+    else:
+        thresholds, graph = stream_filter(iter_neighbor_blocks(x, top_k=k, block_rows=block_rows), ids, as_graph=True)
+    elapsed = time.perf_counter() - t0
+    digest = hashlib.md5()
+    for a in (thresholds, graph.similarity.indptr, graph.similarity.indices, graph.similarity.data):
+        digest.update(np.ascontiguousarray(a).tobytes())
+    print(
+        json.dumps(
+            {
+                "sec": elapsed,
+                "base_mb": base,
+                "peak_mb": _rss_mb("VmHWM"),
+                "pairs": graph.nnz,
+                "graph_mb": graph.nbytes / 2**20,
+                "digest": digest.hexdigest(),
+            }
+        )
+    )
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(
+        description="Retrieval -> Kneedle -> candidates: batch (N x k arrays) vs streaming row blocks (peak RSS)."
+    )
+    ap.add_argument("--sizes", default="2000,5000,10000")
+    ap.add_argument("--dim", type=int, default=256)
+    ap.add_argument("--top-k", type=int, default=0, help="0 = all pairs.")
+    ap.add_argument("--block-rows", type=int, default=256)
+    ap.add_argument("--modes", default="batch,streaming")
+    ap.add_argument("--child", nargs=2, metavar=("MODE", "N"), help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.child:
+        child(args.child[0], int(args.child[1]), args.dim, args.top_k, args.block_rows)
+        return
+
+    print("MB over the RSS after the embeddings were built (VmHWM, fresh process per run, reset after setup)")
+    print(f"{'mode':>10}{'N':>7}{'k':>7}{'sec':>8}{'peak MB':>9}{'graph MB':>10}{'pairs':>11}  identical")
+    for n in (int(s) for s in args.sizes.split(",") if s.strip()):
+        digests = set()
+        for mode in (m.strip() for m in args.modes.split(",") if m.strip()):
+            out = subprocess.run(
+                [
+                    sys.executable, __file__, "--dim", str(args.dim), "--top-k", str(args.top_k),
+                    "--block-rows", str(args.block_rows), "--child", mode, str(n),
+                ],
+                capture_output=True,
+                text=True,
+            )
+            if out.returncode != 0:
+                print(f"{mode:>10}{n:>7}  failed (exit {out.returncode}, killed = out of memory)")
+                continue
+            r = json.loads(out.stdout.strip().splitlines()[-1])
+            digests.add(r["digest"])
+            print(
+                f"{mode:>10}{n:>7}{args.top_k or n:>7}{r['sec']:>8.2f}{r['peak_mb'] - r['base_mb']:>9.1f}"
+                f"{r['graph_mb']:>10.1f}{r['pairs']:>11}  {len(digests) == 1}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+# scripts/eval_embedding_compression.py
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+from typing import Set, Tuple
+
+from chromadb.utils import embedding_functions
+from dotenv import load_dotenv
+
+from multimatcher.datasets.registry import get_dataset_spec, load_dataset
+from multimatcher.eval.candidate_eval import evaluate_candidates
+from multimatcher.filtering.candidate_graph import CandidateGraph
+from multimatcher.filtering.thresholding import apply_thresholds, build_sim_matrices, compute_thresholds
+from multimatcher.retrieval.compression import EmbeddingCompression
+from multimatcher.retrieval.dense_cosine import dense_cosine_topk
+from multimatcher.retrieval.embedding_cache import EmbeddingCache
+from multimatcher.retrieval.local_embedding import HashedNgramEmbedder, is_local_model
+from multimatcher.retrieval.neighbors import NeighborArrays
+from multimatcher.schema.cache import ProfileCache, default_cache_dir
+from multimatcher.schema.catalog import SchemaCatalog
+from multimatcher.schema.render import PromptRenderer
+
+load_dotenv()
+
+
+def _stage2(neighbors: NeighborArrays, catalog: SchemaCatalog, D: float) -> Tuple[Set[Tuple[str, str]], CandidateGraph]:
+    """Retrieval arrays -> (Kneedle candidate pairs, candidate graph)."""
+    sim_matrix, similarity_matrix = build_sim_matrices(neighbors, catalog)
+    thresholds = compute_thresholds(similarity_matrix, S=1.0, D=D)
+    graph = apply_thresholds(sim_matrix, similarity_matrix, thresholds, as_graph=True)
+    rows, cols = graph.edges()
+    pairs = {(catalog.ids[i], catalog.ids[j]) for i, j in zip(rows.tolist(), cols.tolist())}
+    return pairs, graph
+
+
+def _gt_recall(graph: CandidateGraph, grouping_candidates_path: str, catalog: SchemaCatalog) -> float:
+    df = evaluate_candidates(graph, grouping_candidates_path, catalog=catalog)
+    total = sum(len(gt) for gt in df["ground_truth"])
+    missing = sum(len(m) for m in df["missing"] if isinstance(m, list))
+    return 1.0 - missing / total if total else float("nan")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(
+        description="Candidate recall vs speed/memory for reduced-dimension and quantized embeddings (exact NumPy retrieval)."
+    )
+    ap.add_argument("--dataset", required=True, help="m2bench-ecommerce | m2bench-healthcare | unibench | m2e-unibench")
+    ap.add_argument("--data-root", default=None, help="Default: MULTIMATCHER_DATA_ROOT or ./data under repo.")
+    ap.add_argument("--embedding-model", default="text-embedding-3-large", help="or local-ngram[-<dim>] (offline)")
+    ap.add_argument("--embedding-cache", default=None, help="Default: <dataset gt_dir>/embedding_cache.sqlite")
+    ap.add_argument("--dims", default="full,1024,512,256", help="Comma list; full = keep all dimensions.")
+    ap.add_argument("--methods", default="prefix,pca", help="Comma list of prefix, pca.")
+    ap.add_argument("--dtypes", default="float32,float16,int8", help="Comma list of float32, float16, int8.")
+    ap.add_argument("--top-k", type=int, default=None, help="Default: all N.")
+    ap.add_argument("--kneedle-d", type=float, default=0.85)
+    ap.add_argument("--profile-cache", action="store_true", help="Reuse profiles from the per-user profile cache.")
+    args = ap.parse_args()
+
+    data_root = Path(args.data_root or os.getenv("MULTIMATCHER_DATA_ROOT") or "data")
+    if not data_root.is_absolute():
+        data_root = Path(__file__).resolve().parents[1] / data_root
+    spec = get_dataset_spec(args.dataset, data_root=str(data_root))
+    profile_cache = ProfileCache(default_cache_dir(os.path.join("profile_cache", args.dataset))) if args.profile_cache else None
+    bundle = load_dataset(args.dataset, data_root=str(data_root), cache=profile_cache)
+    catalog = bundle.catalog
+    texts = PromptRenderer().render_all(catalog)
+
+    if is_local_model(args.embedding_model):
+        embeddings = HashedNgramEmbedder.from_model_name(args.embedding_model)(texts)
+    else:
+        api_key = os.getenv("OPENAI_EMBEDDING_API_KEY") or os.getenv("OPENAI_Embedding_API_KEY")
+        if not api_key:
+            raise RuntimeError("Missing OPENAI_EMBEDDING_API_KEY (cached embeddings are reused when present).")
+        cache = EmbeddingCache(args.embedding_cache or os.path.join(spec.gt_dir, "embedding_cache.sqlite"))
+        openai_ef = embedding_functions.OpenAIEmbeddingFunction(api_key=api_key, model_name=args.embedding_model)
+        embeddings = cache.embed(args.embedding_model, texts, openai_ef)
+
+    settings = [EmbeddingCompression()]
+    for dim in (d.strip() for d in args.dims.split(",") if d.strip()):
+        for method in (m.strip() for m in args.methods.split(",") if m.strip()):
+            for dtype in (t.strip() for t in args.dtypes.split(",") if t.strip()):
+                setting = EmbeddingCompression(dim=None if dim == "full" else int(dim), method=method, dtype=dtype)
+                if setting.tag not in {s.tag for s in settings}:
+                    settings.append(setting)
+
+    print(f"[DATASET] {bundle.spec.name}  N={len(catalog)}  model={args.embedding_model}  D={embeddings.shape[1]}")
+    print("vec MB     : stored vectors (codes + per-vector scale/norm)")
+    print("peak MB    : peak Python/NumPy allocations during reduction + retrieval")
+    print("cand_recall: Kneedle candidate pairs kept / full float32 Kneedle candidate pairs")
+    print("gt_recall  : grouping_candidates.csv pairs covered by the Kneedle candidates")
+    print(f"{'setting':>20}{'dim':>6}{'vec MB':>9}{'peak MB':>9}{'sec':>8}{'cand_recall':>13}{'cand_ratio':>12}{'gt_recall':>11}")
+
+    base_pairs = None
+    with tempfile.TemporaryDirectory() as tmp:
+        for setting in settings:
+            if setting.dtype != "float32":
+                setting = EmbeddingCompression(setting.dim, setting.method, setting.dtype, os.path.join(tmp, f"{setting.tag}.npy"))
+            tracemalloc.start()
+            t0 = time.perf_counter()
+            vectors = setting.apply(embeddings)
+            idx, scores = dense_cosine_topk(vectors, top_k=args.top_k)
+            elapsed = time.perf_counter() - t0
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            pairs, graph = _stage2(NeighborArrays(idx, scores), catalog, args.kneedle_d)
+            if base_pairs is None:
+                base_pairs = pairs
+            cand_recall = len(pairs & base_pairs) / len(base_pairs) if base_pairs else float("nan")
+            cand_ratio = len(pairs) / len(base_pairs) if base_pairs else float("nan")
+            gt = _gt_recall(graph, bundle.grouping_candidates_path, catalog)
+            print(
+                f"{setting.tag:>20}{vectors.shape[1]:>6}{vectors.nbytes / 1e6:>9.2f}{peak / 1e6:>9.1f}{elapsed:>8.2f}"
+                f"{cand_recall:>13.3f}{cand_ratio:>12.3f}{gt:>11.3f}"
+            )
+            del vectors
+
+
+if __name__ == "__main__":
+    main()
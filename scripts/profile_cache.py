@@ -0,0 +1,45 @@
+# scripts/profile_cache.py
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+import argparse
+import os
+
+from dotenv import load_dotenv
+
+from multimatcher.schema.cache import ProfileCache, default_cache_dir
+
+load_dotenv()
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Inspect or invalidate the on-disk profile cache.")
+    ap.add_argument("command", choices=["stats", "invalidate"])
+    ap.add_argument("--dataset", default=None, help="Use the per-user cache of this dataset (run_dataset.py --profile-cache).")
+    ap.add_argument("--cache-dir", default=None, help="Explicit cache directory (overrides --dataset).")
+    ap.add_argument("--file", default=None, help="invalidate: only entries of this source file (basename).")
+    args = ap.parse_args()
+
+    if args.cache_dir:
+        cache_dir = args.cache_dir
+    elif args.dataset:
+        cache_dir = default_cache_dir(os.path.join("profile_cache", args.dataset))
+    else:
+        raise RuntimeError("Pass --cache-dir or --dataset.")
+
+    cache = ProfileCache(cache_dir)
+    if args.command == "stats":
+        st = cache.stats()
+        print(f"[PROFILE_CACHE] dir={cache_dir}")
+        print(f"entries={st.entries}  size={st.size_bytes / 1e6:.2f}MB")
+    else:
+        n = cache.invalidate(args.file)
+        print(f"[PROFILE_CACHE] removed {n} entr{'y' if n == 1 else 'ies'} from {cache_dir}")
+
+
+if __name__ == "__main__":
+    main()
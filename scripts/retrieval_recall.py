@@ -0,0 +1,155 @@
+# scripts/retrieval_recall.py
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+import argparse
+import os
+import tempfile
+import time
+from typing import Any, Dict, List, Set, Tuple
+
+import numpy as np
+from chromadb.utils import embedding_functions
+from dotenv import load_dotenv
+
+from multimatcher.datasets.registry import get_dataset_spec, load_dataset
+from multimatcher.eval.candidate_eval import evaluate_candidates
+from multimatcher.filtering.candidate_graph import CandidateGraph
+from multimatcher.filtering.thresholding import apply_thresholds, build_sim_matrices, compute_thresholds
+from multimatcher.retrieval.chroma_cosine import HnswParams, compute_pairwise_cosine_similarity
+from multimatcher.retrieval.dense_cosine import dense_cosine_topk, topk_to_cosine_results
+from multimatcher.retrieval.embedding_cache import EmbeddingCache
+from multimatcher.retrieval.local_embedding import HashedNgramEmbedder, is_local_model
+from multimatcher.schema.cache import ProfileCache, default_cache_dir
+from multimatcher.schema.catalog import SchemaCatalog
+from multimatcher.schema.render import PromptRenderer
+
+load_dotenv()
+
+
+def _stage2(
+    cosine_results: List[Dict[str, Any]], catalog: SchemaCatalog, D: float
+) -> Tuple[List[List[str]], Set[Tuple[str, str]], CandidateGraph, int]:
+    """Retrieval results -> (ranked neighbour ids, Kneedle candidate pairs, candidate graph, similarity bytes)."""
+    sim_matrix, similarity_matrix = build_sim_matrices(cosine_results, catalog)
+    thresholds = compute_thresholds(similarity_matrix, S=1.0, D=D)
+    graph = apply_thresholds(sim_matrix, similarity_matrix, thresholds, as_graph=True)
+
+    neighbours = [
+        [f"{c['metadata']['source_name']}/{c['metadata']['element_name']}".lower() for c in r["candidates"]]
+        for r in cosine_results
+    ]
+    rows, cols = graph.edges()
+    pairs = {(catalog.ids[i], catalog.ids[j]) for i, j in zip(rows.tolist(), cols.tolist())}
+    return neighbours, pairs, graph, sim_matrix.nbytes
+
+
+def _gt_recall(graph: CandidateGraph, grouping_candidates_path: str, catalog: SchemaCatalog) -> float:
+    df = evaluate_candidates(graph, grouping_candidates_path, catalog=catalog)
+    total = sum(len(gt) for gt in df["ground_truth"])
+    missing = sum(len(m) for m in df["missing"] if isinstance(m, list))
+    return 1.0 - missing / total if total else float("nan")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(
+        description="Recall of top-k retrieval (exact NumPy / Chroma HNSW) against full all-pairs retrieval."
+    )
+    ap.add_argument("--dataset", required=True, help="m2bench-ecommerce | m2bench-healthcare | unibench | m2e-unibench")
+    ap.add_argument("--data-root", default=None, help="Default: MULTIMATCHER_DATA_ROOT or ./data under repo.")
+    ap.add_argument("--embedding-model", default="text-embedding-3-large", help="or local-ngram[-<dim>] (offline)")
+    ap.add_argument("--embedding-cache", default=None, help="Default: <dataset gt_dir>/embedding_cache.sqlite")
+    ap.add_argument("--ks", default="5,10,20,50,100")
+    ap.add_argument("--engines", default="numpy,chroma", help="Comma list of numpy, chroma.")
+    ap.add_argument("--kneedle-d", type=float, default=0.85)
+    ap.add_argument("--profile-cache", action="store_true", help="Reuse profiles from the per-user profile cache.")
+    ap.add_argument("--hnsw-m", type=int, default=None)
+    ap.add_argument("--hnsw-ef-search", type=int, default=None)
+    ap.add_argument("--hnsw-ef-construction", type=int, default=None)
+    args = ap.parse_args()
+
+    data_root = Path(args.data_root or os.getenv("MULTIMATCHER_DATA_ROOT") or "data")
+    if not data_root.is_absolute():
+        data_root = Path(__file__).resolve().parents[1] / data_root
+    spec = get_dataset_spec(args.dataset, data_root=str(data_root))
+    profile_cache = ProfileCache(default_cache_dir(os.path.join("profile_cache", args.dataset))) if args.profile_cache else None
+    bundle = load_dataset(args.dataset, data_root=str(data_root), cache=profile_cache)
+    catalog = bundle.catalog
+    texts = PromptRenderer().render_all(catalog)
+    n = len(catalog)
+
+    if is_local_model(args.embedding_model):
+        api_key, cache = None, None
+        local_ef = HashedNgramEmbedder.from_model_name(args.embedding_model)
+        embeddings = local_ef(texts)
+    else:
+        api_key = os.getenv("OPENAI_EMBEDDING_API_KEY") or os.getenv("OPENAI_Embedding_API_KEY")
+        if not api_key:
+            raise RuntimeError("Missing OPENAI_EMBEDDING_API_KEY (cached embeddings are reused when present).")
+        local_ef = None
+        cache = EmbeddingCache(args.embedding_cache or os.path.join(spec.gt_dir, "embedding_cache.sqlite"))
+        openai_ef = embedding_functions.OpenAIEmbeddingFunction(api_key=api_key, model_name=args.embedding_model)
+        embeddings = cache.embed(args.embedding_model, texts, openai_ef)
+    hnsw = HnswParams(M=args.hnsw_m, ef_search=args.hnsw_ef_search, ef_construction=args.hnsw_ef_construction)
+
+    t0 = time.perf_counter()
+    idx, scores = dense_cosine_topk(embeddings)
+    full_neigh, full_pairs, full_graph, full_bytes = _stage2(
+        topk_to_cosine_results(texts, catalog.metadata(), idx, scores), catalog, args.kneedle_d
+    )
+    t_full = time.perf_counter() - t0
+
+    print(f"[DATASET] {bundle.spec.name}  N={n}  {hnsw.collection_metadata()}")
+    print("recall@k   : retrieved k-NN / exact k-NN")
+    print("cand_recall: Kneedle candidate pairs kept / full-retrieval Kneedle candidate pairs")
+    print("cand_ratio : Kneedle candidate pairs / full-retrieval Kneedle candidate pairs")
+    print("gt_recall  : grouping_candidates.csv pairs covered by the Kneedle candidates")
+    print(f"{'engine':>8}{'k':>7}{'recall@k':>10}{'cand_recall':>13}{'cand_ratio':>12}{'gt_recall':>11}{'sim MB':>9}{'sec':>8}")
+    print(
+        f"{'full':>8}{n:>7}{1.0:>10.3f}{1.0:>13.3f}{1.0:>12.3f}"
+        f"{_gt_recall(full_graph, bundle.grouping_candidates_path, catalog):>11.3f}{full_bytes / 1e6:>9.2f}{t_full:>8.2f}"
+    )
+
+    engines = [e.strip() for e in args.engines.split(",") if e.strip()]
+    for k in sorted({min(int(s), n) for s in args.ks.split(",") if s.strip()}):
+        exact_k = [set(row[:k]) for row in full_neigh]
+        for engine in engines:
+            t0 = time.perf_counter()
+            if engine == "numpy":
+                idx, scores = dense_cosine_topk(embeddings, top_k=k)
+                results = topk_to_cosine_results(texts, catalog.metadata(), idx, scores)
+            elif engine == "chroma":
+                with tempfile.TemporaryDirectory() as tmp:
+                    results = compute_pairwise_cosine_similarity(
+                        queries=texts,
+                        metadata=catalog,
+                        openai_api_key=api_key,
+                        embedding_model=args.embedding_model,
+                        vectordb_path=tmp,
+                        collection_name="recall",
+                        embedding_cache=cache,
+                        top_k=k,
+                        hnsw=hnsw,
+                        embed_fn=local_ef,
+                    )
+            else:
+                raise ValueError(f"Unknown engine: {engine}")
+            neigh, pairs, graph, nbytes = _stage2(results, catalog, args.kneedle_d)
+            elapsed = time.perf_counter() - t0
+
+            recall_k = sum(len(set(row) & ex) for row, ex in zip(neigh, exact_k)) / max(1, sum(map(len, exact_k)))
+            cand_recall = len(pairs & full_pairs) / len(full_pairs) if full_pairs else float("nan")
+            cand_ratio = len(pairs) / len(full_pairs) if full_pairs else float("nan")
+            gt = _gt_recall(graph, bundle.grouping_candidates_path, catalog)
+            print(
+                f"{engine:>8}{k:>7}{recall_k:>10.3f}{cand_recall:>13.3f}{cand_ratio:>12.3f}"
+                f"{gt:>11.3f}{nbytes / 1e6:>9.2f}{elapsed:>8.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
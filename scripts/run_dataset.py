@@ -8,14 +8,40 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
 
 import argparse
+import dataclasses
 import os
-from typing import Dict, List, Optional
+import time
+from typing import Dict, List, Optional, Sequence, Union
 
+import numpy as np
 from dotenv import load_dotenv
 
-from multimatcher.datasets.registry import load_dataset
-from multimatcher.schema.build import render_prompt_from_context
-from multimatcher.retrieval.chroma_cosine import compute_pairwise_cosine_similarity
+from multimatcher.datasets.registry import load_dataset, get_dataset_spec
+from multimatcher.schema.cache import ProfileCache, default_cache_dir
+from multimatcher.schema.profile import ProfileConfig
+from multimatcher.schema.catalog import SchemaCatalog
+from multimatcher.schema.models import SchemaContext
+from multimatcher.schema.render import PromptRenderer
+from multimatcher.retrieval.chroma_cosine import (
+    CollectionSyncStats,
+    HnswParams,
+    compute_pairwise_cosine_similarity,
+)
+from multimatcher.filtering.value_overlap import LshParams, merge_value_candidates, value_overlap_pairs
+from multimatcher.retrieval.compression import REDUCTION_METHODS, STORAGE_DTYPES, EmbeddingCompression
+from multimatcher.retrieval.dense_cosine import DEFAULT_BLOCK_ROWS, compute_pairwise_cosine_similarity_dense
+from multimatcher.retrieval.embedding_cache import EmbeddingCache
+from multimatcher.retrieval.embedding_provider import (
+    DEFAULT_MAX_BATCH_TEXTS,
+    DEFAULT_MAX_BATCH_TOKENS,
+    BatchedEmbedder,
+    OpenAIEmbeddingProvider,
+)
+from multimatcher.retrieval.local_embedding import HashedNgramEmbedder, is_local_model
+from multimatcher.filtering.blocking import BlockingRules
+from multimatcher.filtering.budget import BUDGET_UNITS, PromptBudget, allocate_budget, llm_input_size
+from multimatcher.filtering.candidate_graph import CandidateGraph
+from multimatcher.filtering.streaming import stream_filter
 from multimatcher.filtering.thresholding import (
     build_sim_matrices,
     compute_thresholds,
@@ -78,27 +104,35 @@ def _resolve_data_root(cli_data_root: Optional[str]) -> Path:
     return p.resolve()
 
 
-def build_llm_reasoning_inputs(all_schema_contexts, real_filter) -> List[str]:
+def build_llm_reasoning_inputs(
+    catalog: Union[SchemaCatalog, Sequence[SchemaContext]],
+    real_filter,
+    rendered: Optional[List[str]] = None,
+) -> List[str]:
     """
     Notebook Cell 13 로직을 함수화:
       - Query: SchemaContext -> prompt string
-      - Candidates: real_filter[i]의 Candidate id를 SchemaContext로 찾아 prompt string
+      - Candidates: real_filter[i]의 Candidate id를 SchemaCatalog id로 찾아 prompt string
+        (CandidateGraph면 row(i)의 element index를 그대로 사용, id lookup 없음)
       - 포맷: 'Query:{...}<->Candidates:{cand1|cand2|...}'
       - Candidates가 비면 Candidates:None 으로 명시
+    rendered: prompt string per element (same order); rendered here once per element if omitted.
     """
-    id_to_ctx: Dict[str, object] = {
-        f"{ctx.source_name}/{ctx.element_name}": ctx for ctx in all_schema_contexts
-    }
+    if not isinstance(catalog, SchemaCatalog):
+        catalog = SchemaCatalog.from_contexts(catalog)
+    if rendered is None:
+        rendered = PromptRenderer().render_all(catalog)
 
     llm_inputs: List[str] = []
-    for i, query_ctx in enumerate(all_schema_contexts):
-        query_text = render_prompt_from_context(query_ctx)
-
+    for i, query_text in enumerate(rendered):
         cand_chunks: List[str] = []
-        for entry in real_filter[i]:
-            cand_id = entry.get("Candidate")
-            if cand_id and cand_id in id_to_ctx:
-                cand_chunks.append(render_prompt_from_context(id_to_ctx[cand_id]))
+        if isinstance(real_filter, CandidateGraph):
+            cand_chunks = [rendered[j] for j in real_filter.row(i).tolist()]
+        else:
+            for entry in real_filter[i]:
+                j = catalog.index_of(entry.get("Candidate"))
+                if j is not None:
+                    cand_chunks.append(rendered[j])
 
         cand_str = "|".join(cand_chunks) if cand_chunks else "None"
         llm_inputs.append(f"Query:{query_text}<->Candidates:{cand_str}")
@@ -115,7 +149,7 @@ def main() -> None:
     )
     ap.add_argument(
         "--llm",
-        required=True,
+        default=None,
         help=(
             "gpt-5 | gpt-5-mini | gpt-oss-120b | gpt-oss-20b | "
             "gemini-2.5-pro | gemini-2.5-flash | "
@@ -123,8 +157,22 @@ def main() -> None:
             "qwen3-max | qwen3-next-80b"
         ),
     )
-    ap.add_argument("--embedding-model", default="text-embedding-3-large")
+    ap.add_argument(
+        "--embedding-model",
+        default="text-embedding-3-large",
+        help="OpenAI embedding model, or local-ngram[-<dim>]: offline hashed char n-gram TF-IDF (no API key).",
+    )
+    ap.add_argument(
+        "--no-llm",
+        action="store_true",
+        help="Stop after Kneedle filtering (no LLM grouping/evaluation); --llm is then optional.",
+    )
     ap.add_argument("--vectordb-path", default=None)
+    ap.add_argument(
+        "--rebuild-vectordb",
+        action="store_true",
+        help="Recreate the Chroma collection instead of syncing the stored one (upsert changed / delete removed).",
+    )
 
     # data root (optional)
     ap.add_argument(
@@ -153,11 +201,176 @@ def main() -> None:
         ),
     )
 
+    # Profiling: chunked (bounded-memory) mode for very large source files
+    ap.add_argument(
+        "--profile-chunksize",
+        type=int,
+        default=None,
+        help="Profile CSV sources in chunks of this many rows (bounded memory). Default: load whole file.",
+    )
+    ap.add_argument(
+        "--exact-distinct-cap",
+        type=int,
+        default=100_000,
+        help="Chunked exact mode: distinct values held per numeric column before switching to HyperLogLog.",
+    )
+    ap.add_argument(
+        "--csv-backend",
+        default="c",
+        choices=["c", "pyarrow", "legacy"],
+        help="CSV reader: sniff encoding/dialect once + single C/pyarrow parse (default), or legacy per-encoding python parse.",
+    )
+    ap.add_argument(
+        "--profile-mode",
+        default="exact",
+        choices=["exact", "approx"],
+        help="approx: HyperLogLog distinct counts + selection/sketch medians (error bounds reported in stat_summary).",
+    )
+    ap.add_argument(
+        "--hll-precision",
+        type=int,
+        default=14,
+        help="HyperLogLog register bits for --profile-mode approx (relative error ~1.04/sqrt(2^p)).",
+    )
+    ap.add_argument(
+        "--row-budget",
+        type=int,
+        default=None,
+        help="Profile at most ~this many rows per file (random blocks at byte offsets). Default: every row.",
+    )
+    ap.add_argument("--sample-seed", type=int, default=0, help="Seed for --row-budget block offsets.")
+
+    ap.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Profile source files concurrently with this many worker processes (default: 1, sequential).",
+    )
+
+    # Profile cache (opt-in): skip re-profiling unchanged source files
+    ap.add_argument(
+        "--profile-cache",
+        action="store_true",
+        help="Reuse profiles of unchanged source files from the per-user cache (~/.cache/multimatcher/profile_cache/<dataset>).",
+    )
+    ap.add_argument("--profile-cache-dir", default=None, help="Cache directory (implies --profile-cache).")
+    ap.add_argument("--no-profile-cache", action="store_true", help=argparse.SUPPRESS)  # default now; kept for old scripts
+    ap.add_argument(
+        "--profile-cache-key",
+        default="mtime",
+        choices=["mtime", "content"],
+        help="Fingerprint files by path+size+mtime (default) or by content hash.",
+    )
+
+    ap.add_argument(
+        "--retrieval-engine",
+        default="chroma",
+        choices=["chroma", "numpy"],
+        help="chroma: HNSW all-pairs query (default). numpy: exact in-memory blocked cosine matmul.",
+    )
+    ap.add_argument(
+        "--top-k",
+        type=int,
+        default=None,
+        help="Keep only the k nearest neighbours per element (Kneedle runs on the truncated lists). Default: all N.",
+    )
+    ap.add_argument(
+        "--blocking",
+        default="none",
+        choices=["none", "source", "source+type"],
+        help=(
+            "Exclude pairs before retrieval scoring: source = same source_name; "
+            "source+type = also incompatible data_type families (numeric vs temporal; strings match anything)."
+        ),
+    )
+    ap.add_argument("--hnsw-m", type=int, default=None, help="Chroma HNSW max neighbours per node (default 16).")
+    ap.add_argument("--hnsw-ef-search", type=int, default=None, help="Chroma HNSW query beam width (default 100).")
+    ap.add_argument("--hnsw-ef-construction", type=int, default=None, help="Chroma HNSW build beam width (default 100).")
+
+    # Embedding cache: (embedding model, sha256(text)) -> vector, shared across runs
+    ap.add_argument("--embedding-cache", default=None, help="SQLite path. Default: <dataset gt_dir>/embedding_cache.sqlite")
+    ap.add_argument("--no-embedding-cache", action="store_true", help="Re-embed every text through the API.")
+
+    # Embedding requests: token-aware batches, bounded concurrency, retry with backoff
+    ap.add_argument(
+        "--embed-batch-tokens",
+        type=int,
+        default=DEFAULT_MAX_BATCH_TOKENS,
+        help="Max estimated tokens per embedding request.",
+    )
+    ap.add_argument("--embed-batch-size", type=int, default=DEFAULT_MAX_BATCH_TEXTS, help="Max texts per embedding request.")
+    ap.add_argument("--embed-concurrency", type=int, default=4, help="Embedding requests in flight.")
+    ap.add_argument("--embed-max-retries", type=int, default=6, help="Retries per request on throttling/timeouts/5xx.")
+
+    # Value-overlap candidates: MinHash per element (profiling) + LSH, merged before thresholding
+    ap.add_argument(
+        "--value-overlap",
+        action="store_true",
+        help="Also keep candidates whose value sets overlap (MinHash/LSH Jaccard), whatever their cosine rank.",
+    )
+    ap.add_argument("--minhash-perm", type=int, default=64, help="MinHash signature length (multiple of --lsh-bands).")
+    ap.add_argument("--lsh-bands", type=int, default=16, help="LSH bands; more bands = lower collision threshold.")
+    ap.add_argument("--lsh-min-jaccard", type=float, default=0.5, help="Drop colliding pairs below this Jaccard estimate.")
+    ap.add_argument("--lsh-max-bucket", type=int, default=100, help="Skip LSH buckets with more elements than this.")
+
+    # Reduced-dimension / quantized vectors for retrieval (the embedding cache keeps full vectors)
+    ap.add_argument("--embedding-dim", type=int, default=None, help="Keep this many dimensions. Default: all.")
+    ap.add_argument(
+        "--dim-reduction",
+        default="prefix",
+        choices=list(REDUCTION_METHODS),
+        help="prefix: first dims re-normalized (Matryoshka, text-embedding-3-*). pca: corpus principal components.",
+    )
+    ap.add_argument(
+        "--embedding-dtype",
+        default="float32",
+        choices=list(STORAGE_DTYPES),
+        help="Vector storage for retrieval; float16/int8 (per-vector scale) need --retrieval-engine numpy.",
+    )
+    ap.add_argument(
+        "--embedding-store",
+        default=None,
+        help="Memory-mapped .npy for float16/int8 vectors. Default: <dataset gt_dir>/embedding_store/<model>-<setting>.npy",
+    )
+    ap.add_argument(
+        "--streaming",
+        action="store_true",
+        help=(
+            "Score, threshold and filter retrieval rows block by block (numpy engine only): "
+            "no N x N arrays are held, same candidates as the batch path."
+        ),
+    )
+    ap.add_argument("--block-rows", type=int, default=DEFAULT_BLOCK_ROWS, help="Query rows per retrieval block.")
+
+    # Global LLM input budget (instead of / on top of --kneedle-d)
+    ap.add_argument(
+        "--prompt-budget",
+        type=int,
+        default=None,
+        help="Max total LLM input for the grouping stage; Kneedle candidates are admitted by similarity until spent.",
+    )
+    ap.add_argument(
+        "--budget-unit",
+        default="tokens",
+        choices=list(BUDGET_UNITS),
+        help="tokens: estimated (3 bytes/token, system prompt included per call); chars: prompt characters.",
+    )
+
     args = ap.parse_args()
 
+    if args.llm is None and not args.no_llm:
+        ap.error("--llm is required (or pass --no-llm)")
     # Basic validation for D
     if not (0.0 < args.kneedle_d <= 1.0):
         raise ValueError(f"--kneedle-d must be in (0, 1]. Got: {args.kneedle_d}")
+    if args.top_k is not None and args.top_k < 2:
+        raise ValueError(f"--top-k must be >= 2 (self + at least one neighbour). Got: {args.top_k}")
+    if args.embedding_dtype != "float32" and args.retrieval_engine != "numpy":
+        ap.error("--embedding-dtype float16/int8 requires --retrieval-engine numpy (Chroma stores float32)")
+    if args.streaming and args.retrieval_engine != "numpy":
+        ap.error("--streaming requires --retrieval-engine numpy")
+    if args.prompt_budget is not None and args.prompt_budget < 0:
+        ap.error("--prompt-budget must be >= 0")
 
     # -----------------------------
     # 0) Resolve data root + Load dataset bundle
@@ -173,86 +386,248 @@ def main() -> None:
             "  - or placing datasets under repo_root/data\n"
         )
 
+    timings: Dict[str, float] = {}
+    t0 = time.perf_counter()
+
     # pass data_root to dataset loader
-    bundle = load_dataset(args.dataset, data_root=str(data_root))
-    all_schema_contexts = bundle.all_schema_contexts
+    profile = ProfileConfig(
+        chunksize=args.profile_chunksize,
+        csv_backend=args.csv_backend,
+        profile_mode=args.profile_mode,
+        hll_precision=args.hll_precision,
+        row_budget=args.row_budget,
+        sample_seed=args.sample_seed,
+        minhash_perm=args.minhash_perm if args.value_overlap else 0,
+        distinct_cap=args.exact_distinct_cap,
+    )
+    profile_cache = None
+    if (args.profile_cache or args.profile_cache_dir) and not args.no_profile_cache:
+        cache_dir = args.profile_cache_dir or default_cache_dir(os.path.join("profile_cache", args.dataset))
+        profile_cache = ProfileCache(cache_dir, key_mode=args.profile_cache_key)
+
+    bundle = load_dataset(
+        args.dataset,
+        data_root=str(data_root),
+        profile=profile,
+        workers=args.workers,
+        cache=profile_cache,
+    )
+    catalog = bundle.catalog
 
     # -----------------------------
     # 1) Stage 1 -> text + meta
     # -----------------------------
-    all_texts = [render_prompt_from_context(ctx) for ctx in all_schema_contexts]
-    all_meta = [
-        {
-            "source_type": ctx.source_type,
-            "source_name": ctx.source_name,
-            "element_type": ctx.element_type,
-            "element_name": ctx.element_name,
-        }
-        for ctx in all_schema_contexts
-    ]
+    all_texts = PromptRenderer().render_all(catalog)
+    timings["profile"] = time.perf_counter() - t0
 
     vectordb_path = args.vectordb_path or os.path.join(bundle.spec.gt_dir, "vectordb")
+    local_embedding = is_local_model(args.embedding_model)
+    embedding_cache = None
+    # local vectors are cheap and fitted on the whole corpus (IDF), so they bypass the cache
+    if not args.no_embedding_cache and not local_embedding:
+        embedding_cache = EmbeddingCache(
+            args.embedding_cache or os.path.join(bundle.spec.gt_dir, "embedding_cache.sqlite")
+        )
 
-    # Embedding key는 과거 변수명/새 변수명 둘 다 허용
-    embedding_api_key = _get_env_any("OPENAI_EMBEDDING_API_KEY", "OPENAI_Embedding_API_KEY")
-
-    # -----------------------------
-    # 2) Stage 2 retrieval (cosine)
-    # -----------------------------
-    cosine_results = compute_pairwise_cosine_similarity(
-        queries=all_texts,
-        metadata=all_meta,
-        openai_api_key=embedding_api_key,
-        embedding_model=args.embedding_model,
-        vectordb_path=vectordb_path,
-        collection_name="candidates",
-    )
+    if local_embedding:
+        embedding_api_key = None
+        embedder = HashedNgramEmbedder.from_model_name(args.embedding_model)
+    else:
+        # Embedding key는 과거 변수명/새 변수명 둘 다 허용
+        embedding_api_key = _get_env_any("OPENAI_EMBEDDING_API_KEY", "OPENAI_Embedding_API_KEY")
+        embedder = BatchedEmbedder(
+            OpenAIEmbeddingProvider(embedding_api_key, args.embedding_model),
+            max_batch_tokens=args.embed_batch_tokens,
+            max_batch_texts=args.embed_batch_size,
+            concurrency=args.embed_concurrency,
+            max_retries=args.embed_max_retries,
+        )
 
-    # regex 없이 from_id는 all_meta 기반으로
-    sim_matrix, similarity_matrix = build_sim_matrices(cosine_results, all_meta)
+    compression = None
+    if args.embedding_dim is not None or args.embedding_dtype != "float32":
+        compression = EmbeddingCompression(dim=args.embedding_dim, method=args.dim_reduction, dtype=args.embedding_dtype)
+        if compression.dtype != "float32":
+            store_path = args.embedding_store or os.path.join(
+                bundle.spec.gt_dir, "embedding_store", f"{args.embedding_model}-{compression.tag}.npy"
+            )
+            compression = dataclasses.replace(compression, store_path=store_path)
 
     # -----------------------------
-    # 3) Stage 2 filtering (Kneedle)
+    # 2) Stage 2 retrieval (cosine)
     # -----------------------------
-    thresholds = compute_thresholds(similarity_matrix, S=KNEEDLE_S, D=args.kneedle_d)
-    _, real_filter = apply_thresholds(sim_matrix, similarity_matrix, thresholds)
+    t0 = time.perf_counter()
+    blocking_rules = BlockingRules(same_source=args.blocking != "none", data_type=args.blocking == "source+type")
+    blocking = blocking_rules.apply(catalog) if blocking_rules.enabled else None
+    vectordb_sync = None
+    value_overlap = None
+    if args.value_overlap:
+        if catalog.value_minhash is None:
+            raise RuntimeError("No value signatures in the catalog (every element is empty?)")
+        lsh = LshParams(bands=args.lsh_bands, max_bucket=args.lsh_max_bucket, min_jaccard=args.lsh_min_jaccard)
+        value_overlap = value_overlap_pairs(catalog.value_minhash, lsh, blocking=blocking)
+
+    if args.streaming:
+        # retrieval -> Kneedle -> kept candidates per row block; similarity rows are dropped as they go
+        blocks = compute_pairwise_cosine_similarity_dense(
+            queries=all_texts,
+            metadata=catalog,
+            openai_api_key=embedding_api_key,
+            embedding_model=args.embedding_model,
+            embedding_cache=embedding_cache,
+            top_k=args.top_k,
+            block_rows=args.block_rows,
+            embed_fn=embedder,
+            blocking=blocking,
+            compression=compression,
+            as_blocks=True,
+        )
+        timings["embed"] = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        thresholds, candidates = stream_filter(
+            blocks, catalog.ids, S=KNEEDLE_S, D=args.kneedle_d, overlap=value_overlap, as_graph=True
+        )
+        timings["retrieval+kneedle"] = time.perf_counter() - t0
+    else:
+        if args.retrieval_engine == "numpy":
+            cosine_results = compute_pairwise_cosine_similarity_dense(
+                queries=all_texts,
+                metadata=catalog,
+                openai_api_key=embedding_api_key,
+                embedding_model=args.embedding_model,
+                embedding_cache=embedding_cache,
+                top_k=args.top_k,
+                block_rows=args.block_rows,
+                embed_fn=embedder,
+                blocking=blocking,
+                as_arrays=True,
+                compression=compression,
+            )
+        else:
+            vectordb_sync = CollectionSyncStats()
+            cosine_results = compute_pairwise_cosine_similarity(
+                queries=all_texts,
+                metadata=catalog,
+                openai_api_key=embedding_api_key,
+                embedding_model=args.embedding_model,
+                vectordb_path=vectordb_path,
+                collection_name="candidates",
+                embedding_cache=embedding_cache,
+                top_k=args.top_k,
+                hnsw=HnswParams(M=args.hnsw_m, ef_search=args.hnsw_ef_search, ef_construction=args.hnsw_ef_construction),
+                embed_fn=embedder,
+                blocking=blocking,
+                # local-ngram vectors depend on the whole corpus (IDF), so stored ones cannot be reused
+                reuse=not (args.rebuild_vectordb or local_embedding),
+                sync_stats=vectordb_sync,
+                as_arrays=True,
+                compression=compression,
+            )
+
+        # regex 없이 from_id는 catalog.ids 기반으로 (retrieval returns index/score arrays only)
+        sim_matrix, similarity_matrix = build_sim_matrices(cosine_results, catalog)
+        timings["retrieval"] = time.perf_counter() - t0
+
+        # -----------------------------
+        # 3) Stage 2 filtering (Kneedle)
+        # -----------------------------
+        t0 = time.perf_counter()
+        thresholds = compute_thresholds(similarity_matrix, S=KNEEDLE_S, D=args.kneedle_d)
+        value_candidates = None
+        if value_overlap is not None:
+            value_candidates = merge_value_candidates(sim_matrix, similarity_matrix, value_overlap)
+        # CSR candidate graph over catalog indices (self dropped); ids are only needed for the prompts
+        candidates = apply_thresholds(
+            sim_matrix, similarity_matrix, thresholds, value_candidates=value_candidates, as_graph=True
+        )
+        timings["kneedle"] = time.perf_counter() - t0
 
     # Defensive checks
-    if len(real_filter) != len(all_schema_contexts):
+    if len(candidates) != len(catalog):
         raise RuntimeError(
-            f"Length mismatch: real_filter={len(real_filter)} vs contexts={len(all_schema_contexts)}"
+            f"Length mismatch: candidates={len(candidates)} vs contexts={len(catalog)}"
+        )
+
+    # Global prompt budget: admit the highest-similarity Kneedle candidates across all queries until it is spent
+    budget_report = None
+    if args.prompt_budget is not None:
+        candidates, budget_report = allocate_budget(
+            candidates,
+            all_texts,
+            PromptBudget(args.prompt_budget, unit=args.budget_unit),
+            system_prompt=REASONING_CANDIDATES_SYSTEM_MESSAGE,
         )
 
     # -----------------------------
     # 4) Stage 3 LLM grouping
     # -----------------------------
-    llm_inputs = build_llm_reasoning_inputs(all_schema_contexts, real_filter)
-
-    model_spec = get_model_spec(args.llm)
-    chat = build_chat_model(
-        model_spec,
-        temperature=args.temperature,
-        timeout_s=args.timeout,
-        max_retries=args.max_retries,
-    )
+    llm_inputs = build_llm_reasoning_inputs(catalog, candidates, rendered=all_texts)
+    # expected LLM input, reported before any call is made
+    if budget_report is not None:
+        print(f"[BUDGET] {budget_report}")
+    prompt_chars, prompt_tokens = llm_input_size(llm_inputs, REASONING_CANDIDATES_SYSTEM_MESSAGE)
+    print(f"[PROMPTS] inputs={len(llm_inputs)}  chars={prompt_chars}  est_tokens={prompt_tokens}  (system prompt included)")
+
+    model_spec = None
+    schema_groups_raw: List[str] = []
+    if not args.no_llm:
+        t0 = time.perf_counter()
+        model_spec = get_model_spec(args.llm)
+        chat = build_chat_model(
+            model_spec,
+            temperature=args.temperature,
+            timeout_s=args.timeout,
+            max_retries=args.max_retries,
+        )
 
-    schema_groups_raw = run_grouping(
-        chat_model=chat,
-        llm_reasoning_inputs=llm_inputs,
-        system_prompt=REASONING_CANDIDATES_SYSTEM_MESSAGE,
-    )
+        schema_groups_raw = run_grouping(
+            chat_model=chat,
+            llm_reasoning_inputs=llm_inputs,
+            system_prompt=REASONING_CANDIDATES_SYSTEM_MESSAGE,
+        )
+        timings["llm"] = time.perf_counter() - t0
 
     # -----------------------------
     # 5) Print summary
     # -----------------------------
     print(f"[DATA_ROOT] {data_root}")
-    print(f"[DATASET] {bundle.spec.name}  contexts={len(all_schema_contexts)}")
-    print(f"[LLM] alias={args.llm}  provider={model_spec.provider}  model={model_spec.model}")
-    print(f"[EMBED] model={args.embedding_model}")
+    print(f"[DATASET] {bundle.spec.name}  contexts={len(catalog)}")
+    if model_spec is not None:
+        print(f"[LLM] alias={args.llm}  provider={model_spec.provider}  model={model_spec.model}")
+    else:
+        print("[LLM] disabled (--no-llm)")
+    print(f"[EMBED] model={args.embedding_model}  retrieval={args.retrieval_engine}  top_k={args.top_k or 'all'}")
+    if compression is not None:
+        print(f"[EMBED_STORE] setting={compression.tag}  path={compression.store_path or '(in memory)'}")
+    if profile_cache is not None:
+        print(f"[PROFILE_CACHE] dir={profile_cache.cache_dir}  {profile_cache.stats()}")
+    if isinstance(embedder, BatchedEmbedder):
+        print(f"[EMBED_API] {embedder.stats()}")
+    if embedding_cache is not None:
+        print(f"[EMBED_CACHE] path={embedding_cache.path}  {embedding_cache.stats(args.embedding_model)}")
     print("vectordb_path:", vectordb_path)
+    if vectordb_sync is not None:
+        print(f"[VECTORDB] {vectordb_sync}")
     print("grouping_candidates_path:", bundle.grouping_candidates_path)
     print("group_path:", bundle.group_path)
     print(f"kneedle: S={KNEEDLE_S} (fixed), D={args.kneedle_d}")
+    print("[TIMING] " + "  ".join(f"{stage}={sec:.2f}s" for stage, sec in timings.items()))
+    n_components, labels = candidates.components()
+    print(
+        f"[CANDIDATES] pairs={candidates.nnz}  per_element={candidates.nnz / max(1, len(catalog)):.2f}  "
+        f"components={n_components}  largest={int(np.bincount(labels).max()) if len(labels) else 0}  "
+        f"graph_bytes={candidates.nbytes}"
+    )
+    if value_overlap is not None:
+        rows, _ = candidates.edges()
+        added = int(
+            (~np.isnan(candidates.value_jaccard.data) & ~(candidates.similarity.data >= thresholds[rows])).sum()
+        )
+        print(f"[VALUE_OVERLAP] {value_overlap}  added_below_threshold={added}")
+    if blocking is not None:
+        # candidate_chars: rendered text the blocked pairs would have added to candidate lists (upper bound on prompt savings)
+        print(f"[BLOCKING] rules={args.blocking}  {blocking.report([len(t) for t in all_texts])}")
+    if args.no_llm:
+        return
     print(f"schema_groups_raw: {len(schema_groups_raw)} items")
 
     # -----------------------------
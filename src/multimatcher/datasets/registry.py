@@ -2,11 +2,16 @@
 from __future__ import annotations
 
 import os
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
+from functools import cached_property
 from typing import Dict, List, Optional, Sequence, Tuple
 
-from multimatcher.schema.build import schema_generation, graph_edge_generation
+from multimatcher.schema.build import schema_generation, graph_edge_generation, with_graph_edges
 from multimatcher.schema.models import SchemaContext, GraphEdge
+from multimatcher.schema.cache import ProfileCache
+from multimatcher.schema.catalog import SchemaCatalog
+from multimatcher.schema.profile import ProfileConfig
 
 
 # -----------------------------
@@ -21,6 +26,14 @@ class GraphEdgeSpec:
     target_node: str
 
 
+@dataclass(frozen=True)
+class SourceFileSpec:
+    directory: str
+    filename: str
+    model: str  # table | document | graph
+    edge_files: Sequence[str] = ()  # graph nodes only: edges to attach (by edge filename)
+
+
 @dataclass(frozen=True)
 class DatasetSpec:
     """
@@ -64,6 +77,11 @@ class DatasetBundle:
     grouping_candidates_path: str
     group_path: str
 
+    @cached_property
+    def catalog(self) -> SchemaCatalog:
+        """Columnar view of all_schema_contexts (same order; built once)."""
+        return SchemaCatalog.from_contexts(self.all_schema_contexts)
+
 
 # -----------------------------
 # Helpers
@@ -82,51 +100,73 @@ def _require_file(path: str, hint: str) -> None:
         raise RuntimeError(f"File not found: {path}\nHint: {hint}")
 
 
-def _build_graph_edges(spec: DatasetSpec) -> Dict[str, GraphEdge]:
+def _profile_sources(
+    edges: Sequence[GraphEdgeSpec],
+    sources: Sequence[SourceFileSpec],
+    profile: Optional[ProfileConfig] = None,
+    workers: int = 1,
+    cache: Optional[ProfileCache] = None,
+) -> List[SchemaContext]:
     """
-    Returns mapping: edge_filename -> GraphEdge
+    Profile every edge and source file, then attach edges to copies of the graph node contexts.
+    - workers > 1: files are profiled concurrently in a process pool
+    - output order always follows `sources` (deterministic); each GraphEdge is
+      built once and the same object is shared by every node that references it
+    - cache: cached edge/source profiles are reused (hit/miss counts end up on `cache`)
     """
-    edge_objs: Dict[str, GraphEdge] = {}
-    for e in spec.graph_edges:
-        edge_objs[e.filename] = graph_edge_generation(
-            path=e.graph_dir,
-            fname=e.filename,
-            direction=e.direction,
-            source_node=e.source_node,
-            target_node=e.target_node,
-        )
-    return edge_objs
+    edge_args = [(e.graph_dir, e.filename, e.direction, e.source_node, e.target_node) for e in edges]
+    src_args = [(s.directory, s.filename, s.model) for s in sources]
 
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+            edge_futs = [ex.submit(_cached_call, graph_edge_generation, a, profile, cache) for a in edge_args]
+            src_futs = [ex.submit(_cached_call, schema_generation, a, profile, cache) for a in src_args]
+            edge_objs = [_collect(f.result(), cache) for f in edge_futs]
+            per_source = [_collect(f.result(), cache) for f in src_futs]
+    else:
+        edge_objs = [graph_edge_generation(*a, profile=profile, cache=cache) for a in edge_args]
+        per_source = [schema_generation(*a, profile=profile, cache=cache) for a in src_args]
 
-def _build_schema_contexts(spec: DatasetSpec) -> List[SchemaContext]:
-    # 1) graph edges 먼저 생성
-    edge_map = _build_graph_edges(spec)
+    edge_map: Dict[str, GraphEdge] = {e.filename: obj for e, obj in zip(edges, edge_objs)}
 
     contexts: List[SchemaContext] = []
+    for s, ctxs in zip(sources, per_source):
+        edges_to_attach = [edge_map[ef] for ef in s.edge_files if ef in edge_map]
+        if s.model == "graph" and edges_to_attach:
+            ctxs = with_graph_edges(ctxs, edges_to_attach)
+        contexts += ctxs
+    return contexts
 
-    # 2) tables
-    if spec.table_dir:
-        for f in spec.table_files:
-            contexts += schema_generation(spec.table_dir, f, "table")
 
-    # 3) documents
-    if spec.document_dir:
-        for f in spec.document_files:
-            contexts += schema_generation(spec.document_dir, f, "document")
+def _cached_call(fn, args, profile: Optional[ProfileConfig], cache: Optional[ProfileCache]):
+    """Worker-side call; the worker's cache copy counts hits/misses, returned as deltas."""
+    if cache is None:
+        return fn(*args, profile=profile), 0, 0
+    hits, misses = cache.hits, cache.misses
+    out = fn(*args, profile=profile, cache=cache)
+    return out, cache.hits - hits, cache.misses - misses
 
-    # 4) graph nodes (node/property files)
-    if spec.graph_dir:
-        for node_file in spec.graph_node_files:
-            edge_files = spec.graph_node_edge_map.get(node_file, [])
-            edges_to_attach = [edge_map[ef] for ef in edge_files if ef in edge_map]
-            contexts += schema_generation(
-                spec.graph_dir,
-                node_file,
-                "graph",
-                edges_to_attach if edges_to_attach else None,
-            )
 
-    return contexts
+def _collect(result, cache: Optional[ProfileCache]):
+    out, hits, misses = result
+    if cache is not None:
+        cache.hits += hits
+        cache.misses += misses
+    return out
+
+
+def _spec_sources(spec: DatasetSpec) -> List[SourceFileSpec]:
+    sources: List[SourceFileSpec] = []
+    if spec.table_dir:
+        sources += [SourceFileSpec(spec.table_dir, f, "table") for f in spec.table_files]
+    if spec.document_dir:
+        sources += [SourceFileSpec(spec.document_dir, f, "document") for f in spec.document_files]
+    if spec.graph_dir:
+        sources += [
+            SourceFileSpec(spec.graph_dir, f, "graph", tuple(spec.graph_node_edge_map.get(f, ())))
+            for f in spec.graph_node_files
+        ]
+    return sources
 
 
 # -----------------------------
@@ -227,11 +267,21 @@ def get_dataset_spec(name: str, data_root: str) -> DatasetSpec:
     raise ValueError(f"Unknown dataset name: {name}")
 
 
-def load_dataset(name: str, data_root: str) -> DatasetBundle:
+def load_dataset(
+    name: str,
+    data_root: str,
+    profile: Optional[ProfileConfig] = None,
+    workers: int = 1,
+    cache: Optional[ProfileCache] = None,
+) -> DatasetBundle:
     """
     Load dataset by name using the provided data_root.
     run_dataset.py passes data_root resolved relative to repo root,
     so callers can avoid absolute paths.
+
+    profile: optional profiling settings (e.g. chunked, bounded-memory profiling).
+    workers: >1 profiles source files concurrently in a process pool (order stays deterministic).
+    cache: optional on-disk ProfileCache; unchanged files are not re-profiled.
     """
     spec = get_dataset_spec(name, data_root=data_root)
 
@@ -274,27 +324,29 @@ def load_dataset(name: str, data_root: str) -> DatasetBundle:
         graph_nodes2 = ("post2.csv",)
 
         # edges (graph1 only, per your notebook)
-        e_interested = graph_edge_generation(graph_dir1, "person_interestedin_tag1.csv", "directed", "person", "hashtag")
-        e_follows = graph_edge_generation(graph_dir1, "person_follows_person1.csv", "directed", "person", "person")
+        edges = (
+            GraphEdgeSpec(graph_dir1, "person_interestedin_tag1.csv", "directed", "person", "hashtag"),
+            GraphEdgeSpec(graph_dir1, "person_follows_person1.csv", "directed", "person", "person"),
+        )
+        node_edges1 = {
+            "person1.csv": ("person_interestedin_tag1.csv", "person_follows_person1.csv"),
+            "hashtag1.csv": ("person_interestedin_tag1.csv",),
+        }
 
-        # contexts
-        contexts: List[SchemaContext] = []
+        # sources (output order: side 1 tables/documents/graph, then side 2)
+        sources: List[SourceFileSpec] = []
 
         # side 1
-        for f in table_files1:
-            contexts += schema_generation(table_dir1, f, "table")
-        for f in doc_files1:
-            contexts += schema_generation(doc_dir1, f, "document")
-        contexts += schema_generation(graph_dir1, "person1.csv", "graph", [e_interested, e_follows])
-        contexts += schema_generation(graph_dir1, "hashtag1.csv", "graph", [e_interested])
+        sources += [SourceFileSpec(table_dir1, f, "table") for f in table_files1]
+        sources += [SourceFileSpec(doc_dir1, f, "document") for f in doc_files1]
+        sources += [SourceFileSpec(graph_dir1, f, "graph", node_edges1.get(f, ())) for f in graph_nodes1]
 
         # side 2
-        for f in table_files2:
-            contexts += schema_generation(table_dir2, f, "table")
-        for f in doc_files2:
-            contexts += schema_generation(doc_dir2, f, "document")
-        for f in graph_nodes2:
-            contexts += schema_generation(graph_dir2, f, "graph")
+        sources += [SourceFileSpec(table_dir2, f, "table") for f in table_files2]
+        sources += [SourceFileSpec(doc_dir2, f, "document") for f in doc_files2]
+        sources += [SourceFileSpec(graph_dir2, f, "graph") for f in graph_nodes2]
+
+        contexts = _profile_sources(edges, sources, profile=profile, workers=workers, cache=cache)
 
         return DatasetBundle(
             spec=spec,
@@ -322,7 +374,7 @@ def load_dataset(name: str, data_root: str) -> DatasetBundle:
         for e in spec.graph_edges:
             _require_file(_join(e.graph_dir, e.filename), hint="Check graph_edges list vs actual filenames.")
 
-    contexts = _build_schema_contexts(spec)
+    contexts = _profile_sources(spec.graph_edges, _spec_sources(spec), profile=profile, workers=workers, cache=cache)
     return DatasetBundle(
         spec=spec,
         all_schema_contexts=contexts,
@@ -1,20 +1,43 @@
 from __future__ import annotations
-from typing import Any, List
+from typing import Any, List, Optional, Union
 import ast
 import pandas as pd
 
-def evaluate_candidates(filtered: List[List[dict]], grouping_candidates_path: str) -> pd.DataFrame:
+from ..filtering.candidate_graph import CandidateGraph
+from ..schema.catalog import SchemaCatalog
+
+def evaluate_candidates(
+    filtered: Union[List[List[dict]], CandidateGraph],
+    grouping_candidates_path: str,
+    catalog: Optional[SchemaCatalog] = None,
+) -> pd.DataFrame:
     """
     filtered: list of list of {'Candidate': str, 'Cosine Similarity': float}
-      - assumes filtered[i][0]['Candidate'] is the query id (self)
+      - without `catalog`, filtered[i][0]['Candidate'] is taken as the query id (apply_thresholds
+        puts the query's own entry first); entries with that id are not counted as candidates
+      - with `catalog` (same order as filtered), the query id is catalog.ids[i] and every other
+        entry counts as a candidate (no reliance on self ranking first)
+    filtered may also be a CandidateGraph (apply_thresholds(as_graph=True)); `catalog` is then required
+    and candidate ids are catalog.ids of each row's element indices
     """
+    if isinstance(filtered, CandidateGraph):
+        if catalog is None:
+            raise ValueError("evaluate_candidates needs the catalog to resolve CandidateGraph element ids")
+        ids = catalog.ids
+        filtered = [[{"Candidate": ids[j]} for j in filtered.row(i).tolist()] for i in range(len(filtered))]
+
     pred_rows = []
-    for f in filtered:
+    for i, f in enumerate(filtered):
+        if catalog is not None:
+            query_norm = str(catalog.ids[i]).strip().lower()
+            cands = {str(item["Candidate"]).strip().lower() for item in f} - {query_norm}
+            pred_rows.append((query_norm, cands))
+            continue
         if not f:
             continue
         query = f[0]["Candidate"]
         query_norm = str(query).strip().lower()
-        cands = {str(item["Candidate"]).strip().lower() for item in f[1:]}
+        cands = {str(item["Candidate"]).strip().lower() for item in f} - {query_norm}
         pred_rows.append((query_norm, cands))
     df_pred = pd.DataFrame(pred_rows, columns=["query", "candidates"])
 
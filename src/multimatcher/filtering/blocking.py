@@ -0,0 +1,163 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+import numpy as np
+import pandas as pd
+
+from ..schema.catalog import SchemaCatalog
+
+# data_type -> family; anything else (string, object, None, ...) is a wildcard, since ids, dates and
+# numbers are often stored as text in one source and typed in another. 0/1 flags are often integers.
+TYPE_FAMILIES: Dict[str, str] = {
+    "integer": "numeric",
+    "float": "numeric",
+    "boolean": "numeric",
+    "datetime": "temporal",
+}
+ANY_FAMILY = "any"
+
+def type_family(data_type: Optional[str]) -> str:
+    return TYPE_FAMILIES.get(data_type or "", ANY_FAMILY)
+
+def _allowed_pairs(
+    src_q: np.ndarray, fam_q: np.ndarray, src_c: np.ndarray, fam_c: np.ndarray, same_source: bool, data_type: bool
+) -> np.ndarray:
+    """(queries, candidates) bool: True = pair kept (family code -1 = wildcard)."""
+    allowed = np.ones((src_q.size, src_c.size), dtype=bool)
+    if same_source:
+        allowed &= src_q[:, None] != src_c[None, :]
+    if data_type:
+        allowed &= (fam_q[:, None] < 0) | (fam_c[None, :] < 0) | (fam_q[:, None] == fam_c[None, :])
+    return allowed
+
+@dataclass(frozen=True)
+class BlockingRules:
+    """
+    Pairs excluded before retrieval scoring (never ranked, thresholded or sent to the LLM):
+    - same_source: both elements come from the same source_name (groups must span sources)
+    - data_type: both elements have a typed family (numeric / temporal) and the families differ
+    An element is never blocked against itself (pipeline expects self as the first candidate).
+    """
+    same_source: bool = False
+    data_type: bool = False
+
+    @property
+    def enabled(self) -> bool:
+        return self.same_source or self.data_type
+
+    def apply(self, catalog: SchemaCatalog) -> "BlockingMask":
+        return BlockingMask.from_catalog(self, catalog)
+
+@dataclass(frozen=True)
+class BlockingReport:
+    pairs: int
+    same_source: int
+    data_type: int
+    candidate_chars: int
+
+    @property
+    def blocked(self) -> int:
+        return self.same_source + self.data_type
+
+    def __str__(self) -> str:
+        pct = self.blocked / self.pairs * 100 if self.pairs else 0.0
+        return (
+            f"blocked={self.blocked}/{self.pairs} pairs ({pct:.1f}%) "
+            f"same_source={self.same_source} data_type={self.data_type} "
+            f"candidate_chars={self.candidate_chars}"
+        )
+
+class BlockingMask:
+    """
+    BlockingRules bound to one catalog (integer codes per element).
+    - mask(start, stop): allowed candidates for query rows [start, stop) as a (b, N) bool array
+    - groups(): elements sharing (source, type family), i.e. the same allowed candidates
+    - allowed_counts(): candidates left per element (self included)
+    - report(text_lengths): blocked pair counts and the candidate text chars they would have carried
+    """
+
+    def __init__(self, rules: BlockingRules, source_codes: np.ndarray, family_codes: np.ndarray, families: Sequence[str]):
+        self.rules = rules
+        self.source_codes = source_codes
+        self.family_codes = family_codes  # -1 = wildcard (ANY_FAMILY)
+        self.families = list(families)
+
+    @classmethod
+    def from_catalog(cls, rules: BlockingRules, catalog: SchemaCatalog) -> "BlockingMask":
+        source_codes = np.asarray(catalog.source_name.codes, dtype=np.int64)
+        fam = pd.Categorical(
+            [type_family(dt) for dt in np.asarray(catalog.data_type, dtype=object)],
+            categories=sorted(set(TYPE_FAMILIES.values())),
+        )
+        return cls(rules, source_codes, np.asarray(fam.codes, dtype=np.int64), fam.categories)
+
+    def __len__(self) -> int:
+        return int(self.source_codes.size)
+
+    def family(self, i: int) -> str:
+        code = int(self.family_codes[i])
+        return ANY_FAMILY if code < 0 else self.families[code]
+
+    def mask(self, start: int, stop: int) -> np.ndarray:
+        allowed = _allowed_pairs(
+            self.source_codes[start:stop],
+            self.family_codes[start:stop],
+            self.source_codes,
+            self.family_codes,
+            self.rules.same_source,
+            self.rules.data_type,
+        )
+        allowed[np.arange(stop - start), np.arange(start, stop)] = True
+        return allowed
+
+    def allows(self, left: np.ndarray, right: np.ndarray) -> np.ndarray:
+        """Element-wise: is pair (left[t], right[t]) kept? (bool, same length)"""
+        keep = np.ones(left.shape, dtype=bool)
+        if self.rules.same_source:
+            keep &= self.source_codes[left] != self.source_codes[right]
+        if self.rules.data_type:
+            fam_l, fam_r = self.family_codes[left], self.family_codes[right]
+            keep &= (fam_l < 0) | (fam_r < 0) | (fam_l == fam_r)
+        return keep | (left == right)
+
+    def _groups(self):
+        """Distinct (source, family) keys, group id per element, group sizes."""
+        keys, group_of = np.unique(np.stack([self.source_codes, self.family_codes], axis=1), axis=0, return_inverse=True)
+        group_of = group_of.reshape(-1)
+        return keys, group_of, np.bincount(group_of, minlength=len(keys))
+
+    def groups(self) -> List[np.ndarray]:
+        """Element ids per distinct (source, type family): elements blocked against the same candidates."""
+        _, group_of, _ = self._groups()
+        order = np.argsort(group_of, kind="stable")
+        return np.split(order, np.cumsum(np.bincount(group_of))[:-1])
+
+    def allowed_counts(self) -> np.ndarray:
+        keys, group_of, sizes = self._groups()
+        src, fam = keys[:, 0], keys[:, 1]
+        allowed = _allowed_pairs(src, fam, src, fam, self.rules.same_source, self.rules.data_type)
+        per_group = allowed.astype(np.int64) @ sizes
+        # self is allowed even where its own group is blocked
+        per_group += ~allowed.diagonal()
+        return per_group[group_of]
+
+    def report(self, text_lengths: Sequence[int]) -> BlockingReport:
+        """Counts over ordered (query, candidate) pairs, self excluded; chars = candidate text + '|' separator."""
+        n = len(self)
+        keys, group_of, sizes = self._groups()
+        chars = np.bincount(group_of, weights=np.asarray(text_lengths, dtype=np.float64) + 1, minlength=len(keys))
+
+        src, fam = keys[:, 0], keys[:, 1]
+        by_source = ~_allowed_pairs(src, fam, src, fam, self.rules.same_source, False)
+        by_type = ~_allowed_pairs(src, fam, src, fam, False, self.rules.data_type) & ~by_source
+
+        self_chars = float(np.sum(np.asarray(text_lengths, dtype=np.float64) + 1))
+        same_pairs = int(sizes @ by_source @ sizes) - (n if self.rules.same_source else 0)
+        type_pairs = int(sizes @ by_type @ sizes)
+        blocked_chars = float(sizes @ (by_source | by_type) @ chars) - (self_chars if self.rules.same_source else 0.0)
+        return BlockingReport(
+            pairs=n * (n - 1),
+            same_source=same_pairs,
+            data_type=type_pairs,
+            candidate_chars=int(round(blocked_chars)),
+        )
@@ -0,0 +1,144 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Optional, Sequence, Tuple
+import numpy as np
+import scipy.sparse as sp
+
+from ..retrieval.embedding_provider import estimate_tokens, fractional_tokens
+from .candidate_graph import CandidateGraph
+
+BUDGET_UNITS = ("chars", "tokens")
+
+# prompt layout of the grouping stage (run_dataset.build_llm_reasoning_inputs):
+# 'Query:{query}<->Candidates:{cand1|cand2|...}', 'None' when there is no candidate
+_PROMPT_FRAME = "Query:<->Candidates:"
+_NO_CANDIDATES = "None"
+_SEPARATOR = "|"
+
+def _cost(text: str, unit: str) -> float:
+    return float(len(text)) if unit == "chars" else fractional_tokens(text)
+
+def llm_input_size(prompts: Sequence[str], system_prompt: str = "") -> Tuple[int, int]:
+    """(chars, estimated tokens) of the grouping stage's LLM input: one system + one user message per prompt."""
+    system_tokens = estimate_tokens(system_prompt) if system_prompt else 0
+    chars = sum(len(system_prompt) + len(p) for p in prompts)
+    tokens = sum(system_tokens + estimate_tokens(p) for p in prompts)
+    return chars, tokens
+
+@dataclass(frozen=True)
+class PromptBudget:
+    """
+    Total LLM input allowed for the whole grouping stage (all prompts together), in `unit`:
+    - chars: prompt characters (system prompt included per call)
+    - tokens: estimated tokens (embedding_provider.estimate_tokens, no tokenizer); the allocation
+      reserves one token per prompt for rounding, so the estimate of the built prompts never exceeds it
+    """
+    limit: int
+    unit: str = "tokens"
+
+    def __post_init__(self):
+        if self.unit not in BUDGET_UNITS:
+            raise ValueError(f"unit must be one of {BUDGET_UNITS}, got {self.unit!r}")
+        if self.limit < 0:
+            raise ValueError(f"limit must be >= 0, got {self.limit}")
+
+@dataclass(frozen=True)
+class BudgetReport:
+    """
+    - fixed: cost every prompt has without candidates (system prompt, query, 'None')
+    - spent: fixed + admitted candidates (upper bound of the built prompts' size)
+    - cutoff: lowest priority admitted (None if nothing was admitted)
+    - truncated_rows: queries that lost at least one Kneedle candidate
+    """
+    budget: PromptBudget
+    fixed: float
+    spent: float
+    eligible: int
+    admitted: int
+    truncated_rows: int
+    cutoff: Optional[float]
+
+    @property
+    def over_budget(self) -> bool:
+        return self.fixed > self.budget.limit
+
+    def __str__(self) -> str:
+        cutoff = "-" if self.cutoff is None else f"{self.cutoff:.4f}"
+        return (
+            f"{self.budget.unit}: spent<={int(np.ceil(self.spent))}/{self.budget.limit} (fixed={int(np.ceil(self.fixed))}) "
+            f"candidates={self.admitted}/{self.eligible} truncated_rows={self.truncated_rows} cutoff={cutoff}"
+            + ("  OVER BUDGET: queries alone exceed it" if self.over_budget else "")
+        )
+
+def allocate_budget(
+    graph: CandidateGraph,
+    texts: Sequence[str],
+    budget: PromptBudget,
+    system_prompt: str = "",
+) -> Tuple[CandidateGraph, BudgetReport]:
+    """
+    Keep the Kneedle candidates (apply_thresholds(..., as_graph=True)) that fit a global prompt budget.
+    Candidates are admitted across all queries in descending priority until the next one would
+    overflow: priority = similarity (the Value Jaccard estimate for value-overlap partners without a
+    score), made non-increasing along each row's prompt order, so every query keeps a prefix of
+    its candidate list. texts: rendered prompt string per element (catalog order).
+    Every query still gets its prompt; if those alone exceed the budget, no candidate is admitted.
+    """
+    n = len(graph)
+    unit = budget.unit
+    text_cost = np.array([_cost(t, unit) for t in texts], dtype=float)
+    if text_cost.size != n:
+        raise ValueError(f"Length mismatch: texts={text_cost.size}, graph={n}")
+
+    per_prompt = _cost(_PROMPT_FRAME + _NO_CANDIDATES, unit)
+    if system_prompt:
+        per_prompt += len(system_prompt) if unit == "chars" else estimate_tokens(system_prompt)
+    if unit == "tokens":
+        per_prompt += 1  # ceil() of the user message estimate
+    fixed = float(n * per_prompt + text_cost.sum())
+
+    sim = graph.similarity
+    rows, cols = graph.edges()
+    pos = np.arange(sim.nnz) - sim.indptr[rows]
+    edge_cost = text_cost[cols] + np.where(
+        pos == 0, -_cost(_NO_CANDIDATES, unit), _cost(_SEPARATOR, unit)
+    )
+
+    priority = sim.data.astype(float)
+    if graph.value_jaccard is not None:
+        priority = np.where(np.isnan(priority), graph.value_jaccard.data, priority)
+    priority = np.where(np.isnan(priority), -np.inf, priority)
+
+    # rank 0 = highest priority; running max of the rank within each row (rows offset so they never mix)
+    by_priority = np.argsort(-priority, kind="stable")
+    rank = np.empty(sim.nnz, dtype=np.int64)
+    rank[by_priority] = np.arange(sim.nnz)
+    offset = rows.astype(np.int64) * max(1, sim.nnz)
+    rank = np.maximum.accumulate(rank + offset) - offset
+
+    order = np.lexsort((pos, rows, rank))
+    spent = fixed + np.cumsum(edge_cost[order])
+    over = np.flatnonzero(spent > budget.limit)
+    n_admit = 0 if fixed > budget.limit else int(over[0]) if over.size else int(spent.size)
+    admitted = np.zeros(sim.nnz, dtype=bool)
+    admitted[order[:n_admit]] = True
+
+    kept_per_row = np.bincount(rows[admitted], minlength=n)
+    indptr = np.concatenate([[0], np.cumsum(kept_per_row)]).astype(sim.indptr.dtype)
+    similarity = sp.csr_matrix((sim.data[admitted], sim.indices[admitted], indptr), shape=sim.shape)
+    value_jaccard = None
+    if graph.value_jaccard is not None:
+        value_jaccard = sp.csr_matrix(
+            (graph.value_jaccard.data[admitted], sim.indices[admitted], indptr), shape=sim.shape
+        )
+
+    report = BudgetReport(
+        budget=budget,
+        fixed=fixed,
+        spent=float(spent[n_admit - 1]) if n_admit else fixed,
+        eligible=int(sim.nnz),
+        admitted=n_admit,
+        truncated_rows=int((kept_per_row < graph.degrees()).sum()),
+        cutoff=float(priority[by_priority[rank[order[n_admit - 1]]]]) if n_admit else None,
+    )
+    return CandidateGraph(similarity, value_jaccard), report
@@ -0,0 +1,122 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.csgraph import connected_components
+
+if TYPE_CHECKING:
+    from .thresholding import KeptCandidates
+
+@dataclass(frozen=True)
+class CandidateGraph:
+    """
+    Kneedle-filtered candidates as a sparse (N, N) graph over catalog element ids
+    (apply_thresholds(..., as_graph=True)); row i = query element i, self loops excluded:
+    - similarity: CSR float32 cosine similarity per kept (query, candidate) edge
+      (NaN = value-overlap partner without a retrieval score)
+    - value_jaccard: CSR with the same structure, Jaccard estimate per edge (NaN = none), or None
+    Each row's entries are stored in prompt order (similarity descending, then value-overlap
+    partners by Jaccard), so column indices are NOT sorted; use row(i) rather than CSR slicing.
+    Memory is O(kept candidates).
+    """
+    similarity: sp.csr_matrix
+    value_jaccard: Optional[sp.csr_matrix] = None
+
+    @classmethod
+    def from_blocks(cls, blocks: Sequence["KeptCandidates"], n: int) -> "CandidateGraph":
+        """Stack consecutive KeptCandidates row blocks covering elements [0, n)."""
+        counts = np.zeros(n, dtype=np.int64)
+        for b in blocks:
+            counts[b.start:b.start + b.rows] = np.diff(b.indptr)
+        # one index dtype for indptr and indices, else scipy upcasts (copies) the indices
+        index_dtype = np.int32 if counts.sum() < np.iinfo(np.int32).max else np.int64
+        indptr = np.concatenate([[0], np.cumsum(counts)]).astype(index_dtype)
+        cols = np.concatenate([b.targets for b in blocks] or [np.zeros(0, np.int32)]).astype(index_dtype, copy=False)
+        sims = np.concatenate([b.sims for b in blocks] or [np.zeros(0, np.float32)]).astype(np.float32, copy=False)
+        similarity = sp.csr_matrix((sims, cols, indptr), shape=(n, n), copy=False)
+        value_jaccard = None
+        if any(b.jaccard is not None for b in blocks):
+            jaccard = np.concatenate(
+                [b.jaccard if b.jaccard is not None else np.full(b.targets.size, np.nan, np.float32) for b in blocks]
+            )
+            value_jaccard = sp.csr_matrix(
+                (jaccard.astype(np.float32, copy=False), cols, indptr), shape=(n, n), copy=False
+            )
+        return cls(similarity, value_jaccard)
+
+    def __len__(self) -> int:
+        return int(self.similarity.shape[0])
+
+    @property
+    def nnz(self) -> int:
+        return int(self.similarity.nnz)
+
+    @property
+    def nbytes(self) -> int:
+        total = 0
+        for m in (self.similarity, self.value_jaccard):
+            if m is not None:
+                total += m.data.nbytes + m.indices.nbytes + m.indptr.nbytes
+        return int(total)
+
+    def degrees(self) -> np.ndarray:
+        return np.diff(self.similarity.indptr)
+
+    def row(self, i: int) -> np.ndarray:
+        """Candidate element ids of query i, in prompt order."""
+        start, stop = self.similarity.indptr[i], self.similarity.indptr[i + 1]
+        return self.similarity.indices[start:stop]
+
+    def edges(self) -> Tuple[np.ndarray, np.ndarray]:
+        """(query, candidate) element ids of every edge, row by row."""
+        rows = np.repeat(np.arange(len(self), dtype=np.int32), self.degrees())
+        return rows, self.similarity.indices
+
+    def to_lists(self, ids: Sequence[str]) -> List[List[Dict[str, Any]]]:
+        """
+        apply_thresholds' real_filter format: [{'Candidate': id, 'Cosine Similarity': sim}, ...] per row
+        (sim None where the similarity is NaN).
+        """
+        out: List[List[Dict[str, Any]]] = []
+        sim = self.similarity
+        for i in range(len(self)):
+            start, stop = sim.indptr[i], sim.indptr[i + 1]
+            row = [
+                {"Candidate": str(ids[j]), "Cosine Similarity": None if s != s else s}
+                for j, s in zip(sim.indices[start:stop].tolist(), sim.data[start:stop].tolist())
+            ]
+            if self.value_jaccard is not None:
+                for entry, jac in zip(row, self.value_jaccard.data[start:stop].tolist()):
+                    if jac == jac:
+                        entry["Value Jaccard"] = jac
+            out.append(row)
+        return out
+
+    def symmetrize(self) -> sp.csr_matrix:
+        """
+        Undirected candidate graph: edge i-j if either i lists j or j lists i; weight = the larger
+        similarity of the two directions (NaN only where both are NaN). Column indices sorted.
+        """
+        rows, cols = self.edges()
+        data = self.similarity.data
+        r = np.concatenate([rows, cols])
+        c = np.concatenate([cols, rows])
+        d = np.concatenate([data, data])
+        # per (r, c): largest similarity first, NaN last
+        order = np.lexsort((np.where(np.isnan(d), np.inf, -d), c, r))
+        r, c, d = r[order], c[order], d[order]
+        first = np.ones(r.size, dtype=bool)
+        first[1:] = (r[1:] != r[:-1]) | (c[1:] != c[:-1])
+        r, c, d = r[first], c[first], d[first]
+        n = len(self)
+        indptr = np.concatenate([[0], np.cumsum(np.bincount(r, minlength=n))])
+        return sp.csr_matrix((d, c.astype(np.int32), indptr), shape=(n, n))
+
+    def components(self) -> Tuple[int, np.ndarray]:
+        """Weakly connected components: (count, label per element); isolated elements are their own component."""
+        structure = sp.csr_matrix(
+            (np.ones(self.nnz, dtype=bool), self.similarity.indices, self.similarity.indptr),
+            shape=self.similarity.shape,
+        )
+        return connected_components(structure, directed=True, connection="weak")
@@ -38,11 +38,87 @@ def kneedle(sim_scores, S: float = 1.0, D: float = 0.85):
         if idx < maxima[0]:
             continue
 
-        if threshold is not None and y_diff[idx] < threshold:
+        # minima can reset threshold before any peak is seen (short/flat curves, e.g. top-k lists)
+        if threshold is not None and peak_idx is not None and y_diff[idx] < threshold:
             if curve == "concave":
                 knee = xs[peak_idx] if direction == "increasing" else xs[-(peak_idx + 1)]
             else:
                 knee = xs[-(peak_idx + 1)] if direction == "decreasing" else xs[peak_idx]
             break
 
-    return None if knee is None else knee * D
\ No newline at end of file
+    return None if knee is None else knee * D
+# rows x columns per block in kneedle_rows; first column window (doubles while rows are unresolved)
+_BLOCK_ELEMS = 1 << 22
+_FIRST_WINDOW = 32
+
+def kneedle_rows(sim_rows: np.ndarray, S: float = 1.0, D: float = 0.85) -> np.ndarray:
+    """
+    kneedle() for every row of a (R, n) NaN-free matrix at once, bit-identical per row; NaN = no knee.
+    The per-index walk is replaced by its closed form: at index i the active threshold comes from the
+    latest interior extremum at or before i (maximum -> Tmx of that peak, minimum -> 0.0), and the
+    knee is xs[latest maximum] at the first i past the first maximum with y_diff[i] < threshold.
+    Like the loop's early break, columns are scanned in growing windows and rows leave once resolved.
+    """
+    sim_rows = np.asarray(sim_rows)
+    R, n = sim_rows.shape
+    out = np.full(R, np.nan)
+    if n < 3:  # no interior maximum
+        return out
+    ys = np.arange(1, n + 1) / n
+    for start in range(0, R, max(1, _BLOCK_ELEMS // n)):
+        block = sim_rows[start:start + max(1, _BLOCK_ELEMS // n)]
+        out[start:start + block.shape[0]] = _kneedle_block(block, ys, S, D)
+    return out
+
+def _kneedle_block(rows: np.ndarray, ys: np.ndarray, S: float, D: float) -> np.ndarray:
+    R, n = rows.shape
+    # retrieval rows arrive sorted by descending similarity: reversing gives the same values as sorting
+    if bool((rows[:, :-1] >= rows[:, 1:]).all()):
+        xs = np.ascontiguousarray(rows[:, ::-1])
+    else:
+        xs = np.sort(rows, axis=1)
+    offset = S * np.abs(np.diff(xs, axis=1).mean(axis=1))
+    out = np.full(R, np.nan)
+
+    # per row: latest interior maximum / minimum so far and y_diff at that maximum
+    active = np.arange(R)
+    last_max = np.full(R, -1)
+    last_min = np.full(R, -1)
+    max_val = np.zeros(R)
+
+    lo, width = 1, _FIRST_WINDOW
+    while active.size and lo < n - 1:
+        hi = min(lo + width, n - 1)  # interior indices [lo, hi)
+        yd = ys[lo - 1:hi + 1] - xs[active, lo - 1:hi + 1]
+        mid = yd[:, 1:-1]
+        pos = np.arange(lo, hi)
+        is_max = (mid > yd[:, :-2]) & (mid > yd[:, 2:])
+        is_min = (mid < yd[:, :-2]) & (mid < yd[:, 2:])
+        lmax = np.maximum(np.maximum.accumulate(np.where(is_max, pos, -1), axis=1), last_max[active, None])
+        lmin = np.maximum(np.maximum.accumulate(np.where(is_min, pos, -1), axis=1), last_min[active, None])
+        in_window = lmax >= lo
+        peak_val = np.where(
+            in_window, np.take_along_axis(mid, np.where(in_window, lmax - lo, 0), axis=1), max_val[active, None]
+        )
+        threshold = np.where(lmax > lmin, peak_val - offset[active, None], 0.0)
+        hit = (lmax >= 0) & (mid < threshold)
+
+        found = hit.any(axis=1)
+        first = np.argmax(hit[found], axis=1)
+        peak = lmax[found][np.arange(first.size), first]
+        out[active[found]] = xs[active[found], peak] * D
+
+        keep = ~found
+        last_max[active] = lmax[:, -1]
+        last_min[active] = lmin[:, -1]
+        max_val[active] = peak_val[:, -1]
+        active = active[keep]
+        lo, width = hi, width * 2
+
+    if active.size:
+        # last index: never an extremum, still checked against the state of the last interior index
+        threshold = np.where(last_max[active] > last_min[active], max_val[active] - offset[active], 0.0)
+        hit = (last_max[active] >= 0) & (ys[n - 1] - xs[active, n - 1] < threshold)
+        done = active[hit]
+        out[done] = xs[done, last_max[done]] * D
+    return out
@@ -0,0 +1,55 @@
+from __future__ import annotations
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
+import numpy as np
+
+from .candidate_graph import CandidateGraph
+from .thresholding import KeptCandidates, SimMatrix, compute_thresholds, kept_candidates
+from .value_overlap import ValueOverlap, merge_value_candidates
+
+def iter_kept_candidates(
+    blocks: Iterable[Tuple[int, np.ndarray, np.ndarray]],
+    ids: np.ndarray,
+    S: float = 1.0,
+    D: float = 0.85,
+    overlap: Optional[ValueOverlap] = None,
+) -> Iterator[Tuple[np.ndarray, KeptCandidates]]:
+    """
+    Retrieval row blocks (start, indices (b, k), scores (b, k)), e.g. dense_cosine.iter_neighbor_blocks
+    -> per block: Kneedle thresholds of its rows and the candidates they keep.
+    The block's similarity rows are dropped before the next block is pulled, so only
+    O(block x k + kept candidates) is held. Same per-row result as build_sim_matrices ->
+    compute_thresholds -> [merge_value_candidates] -> apply_thresholds on the full arrays.
+    """
+    for start, indices, scores in blocks:
+        scores = np.asarray(scores, dtype=np.float32)
+        sim_matrix = SimMatrix(np.asarray(indices, dtype=np.int32), scores, ids)
+        thresholds = compute_thresholds(scores, S=S, D=D)
+        value_candidates = None
+        if overlap is not None:
+            value_candidates = merge_value_candidates(sim_matrix, scores, overlap, row_offset=start)
+        yield thresholds, kept_candidates(sim_matrix, scores, thresholds, value_candidates, start=start)
+
+def stream_filter(
+    blocks: Iterable[Tuple[int, np.ndarray, np.ndarray]],
+    ids: np.ndarray,
+    S: float = 1.0,
+    D: float = 0.85,
+    overlap: Optional[ValueOverlap] = None,
+    as_graph: bool = False,
+) -> Tuple[np.ndarray, Union[Tuple[List[List[dict]], List[List[dict]]], CandidateGraph]]:
+    """
+    Collect iter_kept_candidates into (thresholds, apply_thresholds' output):
+    (filtered, real_filter), or a CandidateGraph with as_graph=True.
+    """
+    n = len(ids)
+    thresholds = np.zeros(n, dtype=float)
+    kept: List[KeptCandidates] = []
+    for block_thresholds, block in iter_kept_candidates(blocks, ids, S=S, D=D, overlap=overlap):
+        thresholds[block.start:block.start + block.rows] = block_thresholds
+        kept.append(block.without_self() if as_graph else block)
+
+    if as_graph:
+        return thresholds, CandidateGraph.from_blocks(kept, n)
+    filtered = [row for block in kept for row in block.to_lists(ids)]
+    real_filter = [row for block in kept for row in block.without_self().to_lists(ids)]
+    return thresholds, (filtered, real_filter)
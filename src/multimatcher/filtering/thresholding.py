@@ -1,73 +1,239 @@
 from __future__ import annotations
-from typing import Any, Dict, List, Tuple
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Tuple, Union
+import sys
 import numpy as np
-from .kneedle import kneedle
+from .candidate_graph import CandidateGraph
+from .kneedle import kneedle_rows
+from ..retrieval.neighbors import NeighborArrays
+from ..schema.catalog import SchemaCatalog
+
+if TYPE_CHECKING:
+    from .value_overlap import ValueCandidates
+
+# rows x columns upcast to float64 at a time in compute_thresholds
+_THRESHOLD_BLOCK_ELEMS = 1 << 22
+
+@dataclass(frozen=True)
+class SimMatrix:
+    """
+    Typed candidate table (replaces the (N, K, 4) object array [from_id, rank, similarity, to_id]):
+    - indices: int32 (N, K) candidate element ids, most similar first (-1 = padding)
+    - scores: float32 (N, K) similarity (NaN = padding); the similarity_matrix returned next to it
+    - ids: interned id table, ids[i] = "source_name/element_name" of element i (row i's from_id);
+      rank = column + 1
+    Ids are only looked up for the entries apply_thresholds keeps.
+    """
+    indices: np.ndarray
+    scores: np.ndarray
+    ids: np.ndarray
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.indices.shape
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.indices.nbytes + self.scores.nbytes)
+
+    def to_ids(self, i: int, cols: np.ndarray) -> np.ndarray:
+        return self.ids[self.indices[i, cols]]
 
 def build_sim_matrices(
-    cosine_results: List[Dict[str, Any]],
-    all_meta: List[Dict[str, Any]],
-) -> Tuple[np.ndarray, np.ndarray]:
+    cosine_results: Union[List[Dict[str, Any]], NeighborArrays],
+    all_meta: Union[Sequence[Dict[str, Any]], SchemaCatalog],
+) -> Tuple[SimMatrix, np.ndarray]:
     """
     Build:
-      sim_matrix: (N, N, 4) = [from_id, rank(1-based), similarity, to_id]
-      similarity_matrix: (N, N) float
-    NOTE: from_id uses all_meta[i] (no regex parsing).
+      sim_matrix: SimMatrix (int32 neighbour indices + float32 scores + id table)
+      similarity_matrix: (N, K) float32 scores (sim_matrix.scores)
+    K = longest candidate list (N for all-pairs retrieval, k for top-k retrieval);
+    shorter rows are padded with NaN similarity / index -1.
+    NOTE: from_id uses all_meta[i] (no regex parsing); with a SchemaCatalog, its ids.
+    With NeighborArrays, the arrays are used as-is (no per-pair work).
     """
     N = len(cosine_results)
     if N != len(all_meta):
         raise ValueError(f"Length mismatch: cosine_results={N}, all_meta={len(all_meta)}")
 
-    sim_matrix = np.empty((N, N, 4), dtype=object)
+    if isinstance(all_meta, SchemaCatalog):
+        ids = all_meta.ids
+        index = all_meta.index
+    else:
+        ids = np.empty(N, dtype=object)
+        ids[:] = [sys.intern(f"{fm['source_name']}/{fm['element_name']}".lower()) for fm in all_meta]
+        index = {eid: i for i, eid in enumerate(ids)}
 
-    for i, result in enumerate(cosine_results):
-        fm = all_meta[i]
-        from_id = f"{fm['source_name']}/{fm['element_name']}".lower()
+    if isinstance(cosine_results, NeighborArrays):
+        scores = np.asarray(cosine_results.scores, dtype=np.float32)
+        return SimMatrix(np.asarray(cosine_results.indices, dtype=np.int32), scores, ids), scores
 
-        candidates = result.get("candidates", [])
-        for j, cand in enumerate(candidates[:N]):
-            tm = cand.get("metadata", {})
-            to_id = f"{tm['source_name']}/{tm['element_name']}".lower()
-            sim = float(cand["similarity"])
+    K = min(N, max((len(r.get("candidates", [])) for r in cosine_results), default=0))
+    indices = np.full((N, K), -1, dtype=np.int32)
+    scores = np.full((N, K), np.nan, dtype=np.float32)
 
-            sim_matrix[i, j, 0] = from_id
-            sim_matrix[i, j, 1] = j + 1
-            sim_matrix[i, j, 2] = sim
-            sim_matrix[i, j, 3] = to_id
+    for i, result in enumerate(cosine_results):
+        candidates = result.get("candidates", [])[:K]
+        if not candidates:
+            continue
+        row = [
+            index[f"{c['metadata']['source_name']}/{c['metadata']['element_name']}".lower()] for c in candidates
+        ]
+        indices[i, : len(row)] = row
+        scores[i, : len(row)] = [float(c["similarity"]) for c in candidates]
 
-    similarity_matrix = sim_matrix[:, :, 2].astype(float)
-    return sim_matrix, similarity_matrix
+    return SimMatrix(indices, scores, ids), scores
 
 def compute_thresholds(similarity_matrix: np.ndarray, S: float = 1.0, D: float = 0.85) -> np.ndarray:
+    """
+    Per-row Kneedle threshold over that row's scores (NaN padding from top-k retrieval is ignored);
+    0.0 where a row has no knee. Rows are processed in float64 batches of equal valid length by
+    kneedle_rows (bit-identical to calling kneedle() per row on the float64 scores).
+    """
+    similarity_matrix = np.asarray(similarity_matrix)
     N = similarity_matrix.shape[0]
-    thresholds = np.empty(N, dtype=float)
-    for i in range(N):
-        kp = kneedle(similarity_matrix[i], S=S, D=D)
-        thresholds[i] = float(kp) if kp is not None else 0.0
+    thresholds = np.zeros(N, dtype=float)
+    if N == 0 or similarity_matrix.ndim != 2 or similarity_matrix.shape[1] == 0:
+        return thresholds
+
+    K = similarity_matrix.shape[1]
+    lengths = K - np.isnan(similarity_matrix).sum(axis=1)
+    block = max(1, _THRESHOLD_BLOCK_ELEMS // K)
+    for n in np.unique(lengths):
+        if n == 0:
+            continue
+        rows = np.flatnonzero(lengths == n)
+        for start in range(0, rows.size, block):
+            chunk = rows[start:start + block]
+            scores = similarity_matrix[chunk].astype(float)
+            if n < K:
+                # NaN sorts last: the first n sorted values are the row's scores
+                scores = np.sort(scores, axis=1)[:, :n]
+            knees = kneedle_rows(scores, S=S, D=D)
+            found = ~np.isnan(knees)
+            thresholds[chunk[found]] = knees[found]
     return thresholds
 
-def apply_thresholds(
-    sim_matrix: np.ndarray,
+@dataclass(frozen=True)
+class KeptCandidates:
+    """
+    Entries kept by the Kneedle thresholds for query rows [start, start + rows), in output order
+    (the query's own entry first, then similarity descending, then value-overlap partners by
+    Jaccard; ties keep retrieval rank order):
+    - indptr: (rows + 1,) offsets into targets / sims / jaccard per row
+    - targets: int32 candidate element ids; sims: float32 similarity (NaN = value-overlap only)
+    - jaccard: float32 value-overlap Jaccard estimate (NaN = none), or None
+    Only the kept entries are stored, so blocks can be produced and collected one at a time.
+    """
+    start: int
+    indptr: np.ndarray
+    targets: np.ndarray
+    sims: np.ndarray
+    jaccard: Optional[np.ndarray] = None
+
+    @property
+    def rows(self) -> int:
+        return int(self.indptr.size - 1)
+
+    def to_lists(self, ids: np.ndarray) -> List[List[dict]]:
+        """apply_thresholds' filtered format, one list per row (self included)."""
+        to_ids = ids[self.targets].tolist()
+        # value-overlap partners without a retrieval score: None (NaN never compares equal)
+        sims = [None if s != s else s for s in self.sims.tolist()]
+        has_jaccard = None if self.jaccard is None else (~np.isnan(self.jaccard)).tolist()
+        filtered: List[List[dict]] = []
+        for start, stop in zip(self.indptr[:-1].tolist(), self.indptr[1:].tolist()):
+            row = [{"Candidate": str(to_ids[t]), "Cosine Similarity": sims[t]} for t in range(start, stop)]
+            if has_jaccard is not None:
+                for entry, t in zip(row, range(start, stop)):
+                    if has_jaccard[t]:
+                        entry["Value Jaccard"] = float(self.jaccard[t])
+            filtered.append(row)
+        return filtered
+
+    def without_self(self) -> "KeptCandidates":
+        rows = self.start + np.repeat(np.arange(self.rows), np.diff(self.indptr))
+        keep = self.targets != rows
+        counts = np.bincount(rows[keep] - self.start, minlength=self.rows)
+        return KeptCandidates(
+            start=self.start,
+            indptr=np.concatenate([[0], np.cumsum(counts)]),
+            targets=self.targets[keep],
+            sims=self.sims[keep],
+            jaccard=None if self.jaccard is None else self.jaccard[keep],
+        )
+
+def kept_candidates(
+    sim_matrix: SimMatrix,
     similarity_matrix: np.ndarray,
     thresholds: np.ndarray,
-) -> Tuple[List[List[dict]], List[List[dict]]]:
+    value_candidates: Optional["ValueCandidates"] = None,
+    start: int = 0,
+) -> KeptCandidates:
     """
-    Returns:
-      filtered: list[list[{'Candidate': id, 'Cosine Similarity': sim}, ...]]
-      real_filter: filtered with first element removed (to drop self)
+    Entries of (b, K) rows with similarity >= that row's threshold, plus the value_candidates
+    pairs below it or missing from the row. start: element id of the first row (streamed blocks).
     """
-    N = similarity_matrix.shape[0]
+    N, K = similarity_matrix.shape
     mask = similarity_matrix >= thresholds[:, None]
+    rows, cols = np.nonzero(mask)
+    targets = sim_matrix.indices[rows, cols].astype(np.int32)
+    sims = similarity_matrix[rows, cols].astype(np.float32)
+    # the query's own entry first, even when a duplicate vector ties with (or outranks) it
+    group = np.where(targets == start + rows, -1, 0).astype(np.int8)
+    key = -sims.astype(float)
+    jaccard = None
+    if value_candidates is not None:
+        v = value_candidates
+        placed = v.cols < K
+        forced = ~placed
+        forced[placed] = ~mask[v.rows[placed], v.cols[placed]]
+        # pairs above the threshold are already kept: attach their Jaccard (nonzero() keys are sorted)
+        above = placed & ~forced
+        jaccard = np.full(rows.size, np.nan, dtype=np.float32)
+        jaccard[np.searchsorted(rows * K + cols, v.rows[above] * K + v.cols[above])] = v.jaccard[above]
 
-    filtered: List[List[dict]] = []
-    for i in range(N):
-        valid_idxs = np.where(mask[i])[0]
-        order = valid_idxs[np.argsort(similarity_matrix[i, valid_idxs])[::-1]]
-        to_ids = sim_matrix[i, order, 3]
-        sims = similarity_matrix[i, order]
+        f_rows, f_cols = v.rows[forced], v.cols[forced]
+        f_sims = np.full(f_rows.size, np.nan, dtype=np.float32)
+        in_row = f_cols < K
+        f_sims[in_row] = similarity_matrix[f_rows[in_row], f_cols[in_row]]
+        rows = np.concatenate([rows, f_rows])
+        cols = np.concatenate([cols, f_cols])
+        targets = np.concatenate([targets, v.targets[forced]])
+        sims = np.concatenate([sims, f_sims])
+        group = np.concatenate([group, np.ones(f_rows.size, dtype=np.int8)])
+        key = np.concatenate([key, -v.jaccard[forced].astype(float)])
+        jaccard = np.concatenate([jaccard, v.jaccard[forced]])
+    order = np.lexsort((cols, key, group, rows))
+    return KeptCandidates(
+        start=start,
+        indptr=np.concatenate([[0], np.cumsum(np.bincount(rows[order], minlength=N))]),
+        targets=targets[order],
+        sims=sims[order],
+        jaccard=None if jaccard is None else jaccard[order],
+    )
 
-        filtered.append(
-            [{"Candidate": str(to_id), "Cosine Similarity": float(sim)} for to_id, sim in zip(to_ids, sims)]
-        )
+def apply_thresholds(
+    sim_matrix: SimMatrix,
+    similarity_matrix: np.ndarray,
+    thresholds: np.ndarray,
+    value_candidates: Optional["ValueCandidates"] = None,
+    as_graph: bool = False,
+) -> Union[Tuple[List[List[dict]], List[List[dict]]], CandidateGraph]:
+    """
+    Returns:
+      filtered: list[list[{'Candidate': id, 'Cosine Similarity': sim}, ...]]
+        (sim is None for value-overlap partners the retrieval did not return)
+      real_filter: filtered without the query's own entry (dropped by element index, not rank)
+    or, with as_graph=True, a CandidateGraph (CSR over element ids, self loops dropped, no id strings).
+    Candidate ids are looked up in sim_matrix.ids for the kept entries only.
+    value_candidates: from value_overlap.merge_value_candidates; these pairs are kept even below
+      the threshold (appended after the cosine-ranked ones, by Jaccard) and carry 'Value Jaccard'.
+    """
+    kept = kept_candidates(sim_matrix, similarity_matrix, thresholds, value_candidates)
+    if as_graph:
+        return CandidateGraph.from_blocks([kept.without_self()], len(sim_matrix.ids))
 
-    real_filter = [f[1:] for f in filtered]
-    return filtered, real_filter
\ No newline at end of file
+    filtered = kept.to_lists(sim_matrix.ids)
+    real_filter = kept.without_self().to_lists(sim_matrix.ids)
+    return filtered, real_filter
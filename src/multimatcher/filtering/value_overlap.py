@@ -0,0 +1,175 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+import numpy as np
+
+from ..schema.sketches import MinHash
+from .blocking import BlockingMask
+from .thresholding import SimMatrix
+
+@dataclass(frozen=True)
+class LshParams:
+    """
+    Banded LSH over MinHash signatures (num_perm = bands x rows):
+    - a pair becomes a candidate when all `rows` slots of at least one band agree,
+      i.e. with probability 1 - (1 - J^rows)^bands (S-curve around (1/bands)^(1/rows))
+    - max_bucket: buckets holding more elements are skipped (shared tiny domains such as
+      booleans or 1..5 ratings would otherwise pair every such column with every other)
+    - min_jaccard: colliding pairs below this estimated Jaccard are dropped
+    """
+    bands: int = 16
+    max_bucket: int = 100
+    min_jaccard: float = 0.5
+
+    def rows(self, num_perm: int) -> int:
+        if self.bands < 1 or num_perm % self.bands:
+            raise ValueError(f"num_perm ({num_perm}) must be a multiple of bands ({self.bands})")
+        return num_perm // self.bands
+
+    def threshold(self, num_perm: int) -> float:
+        """Jaccard where the collision probability curve is steepest."""
+        return (1.0 / self.bands) ** (1.0 / self.rows(num_perm))
+
+@dataclass(frozen=True)
+class ValueOverlap:
+    """
+    Value-overlap candidate pairs, both directions (left -> right and right -> left), self excluded:
+    - left / right: int32 element ids; jaccard: float32 MinHash estimate
+    - colliding: distinct unordered pairs sharing an LSH bucket (before min_jaccard / blocking)
+    - skipped_buckets: buckets over max_bucket
+    """
+    left: np.ndarray
+    right: np.ndarray
+    jaccard: np.ndarray
+    colliding: int = 0
+    skipped_buckets: int = 0
+
+    def __len__(self) -> int:
+        return int(self.left.size)
+
+    def __str__(self) -> str:
+        return (
+            f"pairs={len(self) // 2} colliding={self.colliding} skipped_buckets={self.skipped_buckets}"
+        )
+
+def _bucket_pairs(bucket: np.ndarray, max_bucket: int) -> Tuple[np.ndarray, np.ndarray, int]:
+    """Unordered (a, b) positions sharing a bucket id, a < b."""
+    sizes = np.bincount(bucket)
+    order = np.argsort(bucket, kind="stable")
+    bounds = np.concatenate([[0], np.cumsum(sizes)])
+    left: List[np.ndarray] = []
+    right: List[np.ndarray] = []
+    skipped = 0
+    for b in np.flatnonzero(sizes >= 2):
+        if sizes[b] > max_bucket:
+            skipped += 1
+            continue
+        members = np.sort(order[bounds[b]:bounds[b + 1]])
+        a, c = np.triu_indices(members.size, 1)
+        left.append(members[a])
+        right.append(members[c])
+    if not left:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, skipped
+    return np.concatenate(left), np.concatenate(right), skipped
+
+def value_overlap_pairs(
+    signatures: np.ndarray,
+    params: Optional[LshParams] = None,
+    blocking: Optional[BlockingMask] = None,
+) -> ValueOverlap:
+    """
+    Candidate pairs with overlapping value sets from (N, num_perm) MinHash signatures
+    (SchemaCatalog.value_minhash), without comparing all N^2 pairs:
+    one hash table per band, pairs only within shared buckets, Jaccard estimated as the
+    fraction of agreeing signature slots. Elements without values never pair.
+    """
+    params = params or LshParams()
+    n, num_perm = signatures.shape
+    rows = params.rows(num_perm)
+
+    ids = np.flatnonzero(~(signatures == MinHash.EMPTY).all(axis=1))
+    sig = signatures[ids]
+    keys: List[np.ndarray] = []
+    skipped = 0
+    for band in range(params.bands):
+        _, bucket = np.unique(sig[:, band * rows:(band + 1) * rows], axis=0, return_inverse=True)
+        a, b, s = _bucket_pairs(bucket.reshape(-1), params.max_bucket)
+        keys.append(a * len(ids) + b)
+        skipped += s
+    pair_keys = np.unique(np.concatenate(keys)) if keys else np.zeros(0, dtype=np.int64)
+    a, b = np.divmod(pair_keys, max(1, len(ids)))
+
+    jaccard = np.empty(a.size, dtype=np.float32)
+    for start in range(0, a.size, 65536):
+        stop = start + 65536
+        jaccard[start:stop] = (sig[a[start:stop]] == sig[b[start:stop]]).mean(axis=1)
+
+    left, right = ids[a], ids[b]
+    keep = jaccard >= params.min_jaccard
+    if blocking is not None:
+        keep &= blocking.allows(left, right)
+    left, right, jaccard = left[keep], right[keep], jaccard[keep]
+    return ValueOverlap(
+        left=np.concatenate([left, right]).astype(np.int32),
+        right=np.concatenate([right, left]).astype(np.int32),
+        jaccard=np.concatenate([jaccard, jaccard]),
+        colliding=int(pair_keys.size),
+        skipped_buckets=skipped,
+    )
+
+@dataclass(frozen=True)
+class ValueCandidates:
+    """
+    Value-overlap pairs located in a (N, K) candidate table, one entry per pair (sparse side table):
+    - rows: row of the query element in the table; targets: int32 partner element ids
+    - cols: column of the partner in that row, or K + t for the t-th partner missing from the row
+      (top-k / blocking-truncated lists), t ordered by Jaccard descending
+    - jaccard: float32 Jaccard estimate
+    Memory is O(overlap pairs), independent of K.
+    """
+    rows: np.ndarray
+    cols: np.ndarray
+    targets: np.ndarray
+    jaccard: np.ndarray
+
+    def __len__(self) -> int:
+        return int(self.rows.size)
+
+# cells of the (pairs x K) comparison done per chunk in merge_value_candidates
+_LOOKUP_CELLS = 1 << 22
+
+def merge_value_candidates(
+    sim_matrix: SimMatrix,
+    similarity_matrix: np.ndarray,
+    overlap: ValueOverlap,
+    row_offset: int = 0,
+) -> ValueCandidates:
+    """
+    Locate value-overlap pairs in build_sim_matrices' output, before apply_thresholds.
+    Pass the result to apply_thresholds so these pairs are kept regardless of the Kneedle
+    threshold; partners missing from a row are added with NaN similarity. The (N, K) arrays
+    are not modified.
+    row_offset: element id of the first row, for a streamed block of rows; pairs whose left
+      element is outside the block are ignored
+    """
+    N, K = similarity_matrix.shape
+    in_block = (overlap.left >= row_offset) & (overlap.left < row_offset + N)
+    rows = (overlap.left[in_block] - row_offset).astype(np.int64)
+    targets = overlap.right[in_block].astype(np.int32)
+    jaccard = overlap.jaccard[in_block].astype(np.float32)
+
+    # column of each partner in its row: compare the pair's row against the partner, chunked
+    cols = np.full(rows.size, -1, dtype=np.int64)
+    chunk = max(1, _LOOKUP_CELLS // max(1, K))
+    for s in range(0, rows.size, chunk):
+        hit = sim_matrix.indices[rows[s:s + chunk]] == targets[s:s + chunk, None]
+        cols[s:s + chunk] = np.where(hit.any(axis=1), hit.argmax(axis=1), -1)
+
+    # missing partners: K + rank within the row by Jaccard descending (ties keep overlap order)
+    missing = np.flatnonzero(cols < 0)
+    if missing.size:
+        missing = missing[np.lexsort((missing, -jaccard[missing], rows[missing]))]
+        r = rows[missing]
+        cols[missing] = K + np.arange(r.size) - np.searchsorted(r, r, side="left")
+    return ValueCandidates(rows, cols, targets, jaccard)
@@ -1,33 +1,140 @@
 from __future__ import annotations
-from typing import Any, Dict, List
+from dataclasses import dataclass, fields
+from typing import Any, Callable, Dict, List, Optional, Sequence, Union
 import os
 from pathlib import Path
+from urllib.parse import quote
 import chromadb
+import numpy as np
 from chromadb.utils import embedding_functions
 
+from ..filtering.blocking import ANY_FAMILY, BlockingMask
+from ..schema.catalog import SchemaCatalog
+from .compression import EmbeddingCompression
+from .embedding_cache import EmbeddingCache, text_key
+from .neighbors import NeighborArrays
+
+# query rows x n_results per request; larger result sets exceed chromadb's SQL variable limit
+_QUERY_RESULT_BATCH = 25000
+
+# ids per get() request (SQL variable limit)
+_GET_BATCH = 5000
+
+def element_id(meta: Dict[str, Any]) -> str:
+    """Collision-free Chroma id: percent-quoted source_name and element_name joined by '/'."""
+    return f"{quote(str(meta.get('source_name', '?')), safe='')}/{quote(str(meta.get('element_name', '?')), safe='')}"
+
+@dataclass
+class CollectionSyncStats:
+    """Index writes of compute_pairwise_cosine_similarity (accumulated over calls)."""
+    recreated: int = 0
+    embedded: int = 0
+    updated: int = 0
+    deleted: int = 0
+    unchanged: int = 0
+
+    def __str__(self) -> str:
+        return " ".join(f"{f.name}={getattr(self, f.name)}" for f in fields(self))
+
+def _stored_metadata(collection) -> Dict[str, Dict[str, Any]]:
+    out: Dict[str, Dict[str, Any]] = {}
+    offset = 0
+    while True:
+        page = collection.get(include=["metadatas"], limit=_GET_BATCH, offset=offset)
+        for eid, meta in zip(page["ids"], page["metadatas"]):
+            out[eid] = dict(meta or {})
+        if len(page["ids"]) < _GET_BATCH:
+            return out
+        offset += _GET_BATCH
+
+def _stored_embeddings(collection, ids: Sequence[str]) -> np.ndarray:
+    rows: Dict[str, np.ndarray] = {}
+    for start in range(0, len(ids), _GET_BATCH):
+        page = collection.get(ids=list(ids[start:start + _GET_BATCH]), include=["embeddings"])
+        for eid, vec in zip(page["ids"], page["embeddings"]):
+            rows[eid] = vec
+    if not ids:
+        return np.zeros((0, 0), dtype=np.float32)
+    return np.asarray([rows[eid] for eid in ids], dtype=np.float32)
+
+@dataclass(frozen=True)
+class HnswParams:
+    """Chroma HNSW index parameters (None -> Chroma default: M=16, ef_search=100, ef_construction=100)."""
+    M: Optional[int] = None
+    ef_search: Optional[int] = None
+    ef_construction: Optional[int] = None
+
+    def collection_metadata(self) -> Dict[str, Any]:
+        meta: Dict[str, Any] = {"hnsw:space": "cosine"}
+        if self.M is not None:
+            meta["hnsw:M"] = int(self.M)
+        if self.ef_search is not None:
+            meta["hnsw:search_ef"] = int(self.ef_search)
+        if self.ef_construction is not None:
+            meta["hnsw:construction_ef"] = int(self.ef_construction)
+        return meta
+
 def compute_pairwise_cosine_similarity(
     queries: List[str],
-    metadata: List[Dict[str, Any]],
-    openai_api_key: str,
+    metadata: Union[Sequence[Dict[str, Any]], SchemaCatalog],
+    openai_api_key: Optional[str],
     embedding_model: str,
     vectordb_path: str,
     collection_name: str,
-) -> List[Dict[str, Any]]:
+    embedding_cache: Optional[EmbeddingCache] = None,
+    top_k: Optional[int] = None,
+    hnsw: Optional[HnswParams] = None,
+    embed_fn: Optional[Callable[[List[str]], Any]] = None,
+    blocking: Optional[BlockingMask] = None,
+    reuse: bool = True,
+    sync_stats: Optional[CollectionSyncStats] = None,
+    as_arrays: bool = False,
+    compression: Optional[EmbeddingCompression] = None,
+) -> Union[List[Dict[str, Any]], NeighborArrays]:
     """
-    Compute all-pairs cosine similarity via Chroma (cosine distance -> similarity).
+    Compute cosine similarity via Chroma (cosine distance -> similarity).
+    - top_k=None: all pairs (k = N); otherwise only the k nearest neighbours per element,
+      so results (and everything downstream) are O(N*k)
+    - hnsw: index parameters; raise ef_search (>= k) for better top-k recall
+    - embed_fn: texts -> vectors (e.g. embedding_provider.BatchedEmbedder); default: Chroma's
+      OpenAIEmbeddingFunction
+    - blocking: blocked pairs are excluded inside the query (Chroma `where` per source/type group),
+      so they are never ranked or returned; self is still the first candidate
+    - reuse=True: the persistent collection is kept between runs and synced to `queries`: elements
+      with new or changed text (sha256 in metadata) are embedded and upserted, removed elements are
+      deleted, and stored vectors serve as query embeddings (an unchanged rerun embeds and writes
+      nothing). A different embedding model or HNSW setting rebuilds the collection.
+      reuse=False rebuilds on every call (for corpus-fitted embedders such as local-ngram).
+    - sync_stats: accumulates the index writes
+    - as_arrays: query ids + distances only and return NeighborArrays (row/column = input order)
+    - compression: dimension reduction applied before indexing (float32 only: Chroma stores float32;
+      PCA is corpus-fitted, so it rebuilds the collection like reuse=False)
+    With `embedding_cache`, each text is embedded at most once across runs (only cache misses
+    reach the embedding API). Chroma always receives precomputed embeddings.
     Returns:
       [{"query": str, "candidates": [{"similarity": float, "metadata": dict, "document": str}, ...]}, ...]
     """
     assert len(queries) == len(metadata), "queries and metadata must have same length"
+    if isinstance(metadata, SchemaCatalog):
+        metadata = metadata.metadata()
+
+    if compression is not None:
+        if compression.dtype != "float32":
+            raise ValueError(f"Chroma stores float32 vectors; {compression.dtype} storage needs the numpy engine")
+        if compression.corpus_fitted:
+            reuse = False
 
     os.environ.setdefault("CHROMA_TELEMETRY_DISABLED", "1")
     Path(vectordb_path).mkdir(parents=True, exist_ok=True)
 
     client = chromadb.PersistentClient(path=vectordb_path)
-    openai_ef = embedding_functions.OpenAIEmbeddingFunction(
-        api_key=openai_api_key,
-        model_name=embedding_model,
-    )
+    # with embed_fn, Chroma only receives precomputed vectors and needs no embedding function
+    openai_ef = None
+    if embed_fn is None:
+        openai_ef = embedding_functions.OpenAIEmbeddingFunction(
+            api_key=openai_api_key,
+            model_name=embedding_model,
+        )
 
     def _safe_delete(name: str):
         try:
@@ -35,13 +142,18 @@ def compute_pairwise_cosine_similarity(
         except Exception:
             pass
 
+    # stored with the collection: a different embedding model, reduction or HNSW setting forces a rebuild
+    collection_metadata = {**(hnsw or HnswParams()).collection_metadata(), "embedding_model": embedding_model}
+    if compression is not None:
+        collection_metadata["embedding_compression"] = compression.tag
+
     def _create_collection_with_fallback(name: str):
         try:
             _safe_delete(name)
             return client.create_collection(
                 name=name,
                 embedding_function=openai_ef,
-                metadata={"hnsw:space": "cosine"},
+                metadata=collection_metadata,
             )
         except Exception:
             _safe_delete(name)
@@ -50,23 +162,147 @@ def compute_pairwise_cosine_similarity(
                 embedding_function=openai_ef,
             )
 
-    collection = _create_collection_with_fallback(collection_name)
+    collection = None
+    if reuse:
+        try:
+            existing = client.get_collection(name=collection_name)
+        except Exception:
+            existing = None
+        if existing is not None and existing.metadata == collection_metadata:
+            collection = existing
+    if collection is None:
+        collection = _create_collection_with_fallback(collection_name)
+        if sync_stats is not None:
+            sync_stats.recreated += 1
+
+    # the stored text hash decides whether an element must be re-embedded
+    ids = [element_id(m) for m in metadata]
+    stored_metadata = [{**m, "text_sha256": text_key(q)} for m, q in zip(metadata, queries)]
+    if blocking is not None and blocking.rules.data_type:
+        stored_metadata = [{**m, "type_family": blocking.family(i)} for i, m in enumerate(stored_metadata)]
+    metadata = stored_metadata
+
+    stored = _stored_metadata(collection)
+    current = set(ids)
+    to_delete = [i for i in stored if i not in current]
+    to_embed: List[int] = []
+    to_update: List[int] = []
+    for row, (eid, meta) in enumerate(zip(ids, metadata)):
+        old = stored.get(eid)
+        if old is None or old.get("text_sha256") != meta["text_sha256"]:
+            to_embed.append(row)
+        elif old != {k: v for k, v in meta.items() if v is not None}:
+            to_update.append(row)
+    unchanged = sorted(set(range(len(ids))) - set(to_embed))
+
+    new_texts = [queries[i] for i in to_embed]
+    if not new_texts:
+        new_vectors = np.zeros((0, 0), dtype=np.float32)
+    elif embedding_cache is not None:
+        new_vectors = embedding_cache.embed(embedding_model, new_texts, embed_fn or openai_ef)
+    else:
+        new_vectors = np.asarray((embed_fn or openai_ef)(new_texts), dtype=np.float32)
+    if compression is not None and new_texts:
+        new_vectors = compression.reduce(new_vectors)
+    old_vectors = _stored_embeddings(collection, [ids[i] for i in unchanged])
 
-    ids = [f"{m.get('source_name','?')}-{m.get('element_name','?')}" for m in metadata]
-    collection.add(documents=queries, metadatas=metadata, ids=ids)
+    dim = new_vectors.shape[1] if len(to_embed) else (old_vectors.shape[1] if len(unchanged) else 0)
+    embeddings = np.empty((len(ids), dim), dtype=np.float32)
+    if to_embed:
+        embeddings[to_embed] = new_vectors
+    if unchanged:
+        embeddings[unchanged] = old_vectors
+
+    batch = client.get_max_batch_size()
+    for start in range(0, len(to_delete), batch):
+        collection.delete(ids=to_delete[start:start + batch])
+    for start in range(0, len(to_embed), batch):
+        rows = to_embed[start:start + batch]
+        collection.upsert(
+            ids=[ids[i] for i in rows],
+            embeddings=embeddings[rows],
+            documents=[queries[i] for i in rows],
+            metadatas=[metadata[i] for i in rows],
+        )
+    for start in range(0, len(to_update), batch):
+        rows = to_update[start:start + batch]
+        collection.update(ids=[ids[i] for i in rows], metadatas=[metadata[i] for i in rows])
+    if sync_stats is not None:
+        sync_stats.embedded += len(to_embed)
+        sync_stats.updated += len(to_update)
+        sync_stats.deleted += len(to_delete)
+        sync_stats.unchanged += len(unchanged) - len(to_update)
 
     n = len(queries)
     k = min(n, collection.count())
+    if top_k is not None:
+        k = max(1, min(k, int(top_k)))
+
+    # index-only mode: Chroma returns ids + distances only (no N^2 document/metadata copies)
+    include = ["distances"] if as_arrays else ["documents", "metadatas", "distances"]
+
+    def _query(rows: Sequence[int], n_results: int, where: Optional[Dict[str, Any]]):
+        out_ids: List[Any] = []
+        docs: List[Any] = []
+        metas: List[Any] = []
+        dists: List[Any] = []
+        rows_per_query = max(1, _QUERY_RESULT_BATCH // max(n_results, 1))
+        for start in range(0, len(rows), rows_per_query):
+            batch = rows[start:start + rows_per_query]
+            out = collection.query(
+                query_embeddings=embeddings[batch],
+                n_results=n_results,
+                where=where,
+                include=include,
+            )
+            out_ids.extend(out["ids"])
+            dists.extend(out.get("distances") or [])
+            docs.extend(out.get("documents") or [[] for _ in batch])
+            metas.extend(out.get("metadatas") or [[] for _ in batch])
+        return out_ids, docs, metas, dists
+
+    if blocking is None or not blocking.rules.enabled:
+        ids_list, docs_list, metas_list, distances_list = _query(list(range(n)), k, None)
+    else:
+        ids_list = [[] for _ in range(n)]
+        docs_list = [[] for _ in range(n)]
+        metas_list = [[] for _ in range(n)]
+        distances_list = [[] for _ in range(n)]
+        counts = blocking.allowed_counts()
+        self_excluded = blocking.rules.same_source  # `where` drops the query's own source, self included
+        for rows in blocking.groups():
+            r = int(rows[0])
+            clauses: List[Dict[str, Any]] = []
+            if blocking.rules.same_source:
+                clauses.append({"source_name": {"$ne": metadata[r]["source_name"]}})
+            if blocking.rules.data_type and blocking.family(r) != ANY_FAMILY:
+                clauses.append({"type_family": {"$in": [blocking.family(r), ANY_FAMILY]}})
+            where = None if not clauses else clauses[0] if len(clauses) == 1 else {"$and": clauses}
 
-    out = collection.query(
-        query_texts=queries,
-        n_results=k,
-        include=["documents", "metadatas", "distances"],
-    )
+            n_results = min(k, int(counts[r])) - int(self_excluded)
+            rows = [int(i) for i in rows]
+            if n_results > 0:
+                got_ids, docs, metas, dists = _query(rows, n_results, where)
+            else:
+                got_ids = docs = metas = dists = [[] for _ in rows]
+            for i, e, d, m, dd in zip(rows, got_ids, docs, metas, dists):
+                if self_excluded:
+                    e, dd = [ids[i], *e], [0.0, *dd]
+                    if not as_arrays:
+                        d, m = [queries[i], *d], [metadata[i], *m]
+                ids_list[i], docs_list[i], metas_list[i], distances_list[i] = e, d, m, dd
 
-    docs_list = out.get("documents", [])
-    metas_list = out.get("metadatas", [])
-    distances_list = out.get("distances", [])
+    if as_arrays:
+        row_of = {eid: row for row, eid in enumerate(ids)}
+        width = max((len(d) for d in distances_list), default=0)
+        indices = np.full((n, width), -1, dtype=np.int32)
+        scores = np.full((n, width), np.nan, dtype=np.float32)
+        for i, (got_ids, dists) in enumerate(zip(ids_list, distances_list)):
+            m = len(got_ids)
+            indices[i, :m] = [row_of[e] for e in got_ids]
+            scores[i, :m] = 1.0 - np.asarray(dists, dtype=np.float64)  # cosine distance -> similarity
+        order = np.argsort(-scores, axis=1, kind="stable")  # NaN padding stays last
+        return NeighborArrays(np.take_along_axis(indices, order, axis=1), np.take_along_axis(scores, order, axis=1))
 
     all_results: List[Dict[str, Any]] = []
     for q, docs, metas, dists in zip(queries, docs_list, metas_list, distances_list):
@@ -77,4 +313,4 @@ def compute_pairwise_cosine_similarity(
         cands.sort(key=lambda x: x["similarity"], reverse=True)
         all_results.append({"query": q, "candidates": cands})
 
-    return all_results
\ No newline at end of file
+    return all_results
@@ -0,0 +1,137 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Optional, Union
+import os
+import numpy as np
+
+REDUCTION_METHODS = ("prefix", "pca")
+STORAGE_DTYPES = ("float32", "float16", "int8")
+
+def _unit_rows(x: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(x, axis=1, keepdims=True)
+    np.divide(x, norms, out=x, where=norms > 0)
+    return x
+
+class QuantizedEmbeddings:
+    """
+    Row store of unit vectors as float16, or int8 codes with a per-vector scale (x ~= codes * scale).
+    - codes: (N, d) float16 / int8, optionally an np.memmap (.npy file, opened read-only)
+    - side: (N, 2) float32 [scale, 1 / norm of the dequantized row] (scale = 1 for float16)
+    block(start, stop) dequantizes rows to unit float32 vectors, so cosine similarity of the
+    stored vectors is exact up to float32 rounding.
+    """
+
+    def __init__(self, codes: np.ndarray, side: np.ndarray):
+        self.codes = codes
+        self.side = side
+
+    @classmethod
+    def quantize(cls, x: np.ndarray, dtype: str, path: Optional[str] = None, block_rows: int = 8192) -> "QuantizedEmbeddings":
+        """Quantize unit float32 rows; with `path`, codes go to a memory-mapped .npy (+ <path>.side.npy)."""
+        if dtype not in ("float16", "int8"):
+            raise ValueError(f"dtype must be float16 or int8. Got: {dtype!r}")
+        n, d = x.shape
+        if path is not None:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            codes = np.lib.format.open_memmap(path, mode="w+", dtype=np.dtype(dtype), shape=(n, d))
+        else:
+            codes = np.empty((n, d), dtype=np.dtype(dtype))
+        side = np.ones((n, 2), dtype=np.float32)
+
+        for start in range(0, n, block_rows):
+            stop = min(start + block_rows, n)
+            block = np.asarray(x[start:stop], dtype=np.float32)
+            if dtype == "int8":
+                scale = np.abs(block).max(axis=1) / 127.0
+                scale[scale == 0] = 1.0
+                q = np.rint(block / scale[:, None]).astype(np.int8)
+                side[start:stop, 0] = scale
+            else:
+                q = block.astype(np.float16)
+            codes[start:stop] = q
+            norms = np.linalg.norm(q.astype(np.float32) * side[start:stop, :1], axis=1)
+            side[start:stop, 1] = np.divide(1.0, norms, out=np.zeros_like(norms), where=norms > 0)
+
+        if path is not None:
+            codes.flush()
+            np.save(path + ".side.npy", side)
+            return cls.open(path)
+        return cls(codes, side)
+
+    @classmethod
+    def open(cls, path: str) -> "QuantizedEmbeddings":
+        return cls(np.load(path, mmap_mode="r"), np.load(path + ".side.npy"))
+
+    def __len__(self) -> int:
+        return int(self.codes.shape[0])
+
+    @property
+    def shape(self):
+        return self.codes.shape
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.codes.nbytes + self.side.nbytes)
+
+    def block(self, start: int, stop: int) -> np.ndarray:
+        scale = self.side[start:stop, 0] * self.side[start:stop, 1]
+        return np.asarray(self.codes[start:stop], dtype=np.float32) * scale[:, None]
+
+@dataclass(frozen=True)
+class EmbeddingCompression:
+    """
+    Post-embedding size reduction for retrieval:
+    - dim: keep this many dimensions (None = all) by `method`
+      - prefix: Matryoshka-style first-`dim` coordinates, re-normalized (text-embedding-3-* are trained for this)
+      - pca: projection on the top-`dim` principal components of the corpus (fitted per run)
+    - dtype: float32 (plain array) | float16 | int8 (per-vector scale) QuantizedEmbeddings
+    - store_path: memory-mapped .npy for the quantized codes (in memory if None)
+    """
+    dim: Optional[int] = None
+    method: str = "prefix"
+    dtype: str = "float32"
+    store_path: Optional[str] = None
+
+    def __post_init__(self):
+        if self.method not in REDUCTION_METHODS:
+            raise ValueError(f"method must be one of {REDUCTION_METHODS}. Got: {self.method!r}")
+        if self.dtype not in STORAGE_DTYPES:
+            raise ValueError(f"dtype must be one of {STORAGE_DTYPES}. Got: {self.dtype!r}")
+        if self.dim is not None and self.dim < 1:
+            raise ValueError(f"dim must be >= 1. Got: {self.dim}")
+
+    @property
+    def tag(self) -> str:
+        dim = "full" if self.dim is None else f"{self.method}{self.dim}"
+        return f"{dim}-{self.dtype}"
+
+    @property
+    def corpus_fitted(self) -> bool:
+        """PCA vectors depend on the whole corpus: stored ones cannot be reused incrementally."""
+        return self.method == "pca" and self.dim is not None
+
+    def reduce(self, embeddings: np.ndarray) -> np.ndarray:
+        """(N, D) -> unit float32 (N, min(dim, D))."""
+        x = np.asarray(embeddings, dtype=np.float32)
+        if self.dim is None or self.dim >= x.shape[1]:
+            return _unit_rows(x.copy())
+        if self.method == "prefix":
+            return _unit_rows(np.ascontiguousarray(x[:, : self.dim]))
+
+        # components from the D x D covariance (memory independent of N); the uncentered vectors are
+        # projected, so cosine similarity is preserved exactly once dim reaches the corpus rank
+        n, d = x.shape
+        gram = np.zeros((d, d), dtype=np.float64)
+        for start in range(0, n, 8192):
+            block = x[start:start + 8192].astype(np.float64)
+            gram += block.T @ block
+        mean = x.mean(axis=0, dtype=np.float64)
+        _, vecs = np.linalg.eigh(gram - n * np.outer(mean, mean))
+        components = vecs[:, ::-1][:, : self.dim].astype(np.float32)
+        return _unit_rows(x @ components)
+
+    def apply(self, embeddings: np.ndarray) -> Union[np.ndarray, QuantizedEmbeddings]:
+        x = self.reduce(embeddings)
+        if self.dtype == "float32":
+            return x
+        return QuantizedEmbeddings.quantize(x, self.dtype, path=self.store_path)
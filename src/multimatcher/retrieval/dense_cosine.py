@@ -0,0 +1,159 @@
+from __future__ import annotations
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+import numpy as np
+from chromadb.utils import embedding_functions
+
+from ..filtering.blocking import BlockingMask
+from ..schema.catalog import SchemaCatalog
+from .compression import EmbeddingCompression, QuantizedEmbeddings
+from .embedding_cache import EmbeddingCache
+from .neighbors import NeighborArrays
+
+DEFAULT_BLOCK_ROWS = 1024
+
+def normalize_rows(embeddings: np.ndarray) -> np.ndarray:
+    """float32 copy with unit L2 rows (zero rows stay zero)."""
+    x = np.array(embeddings, dtype=np.float32, copy=True)
+    norms = np.linalg.norm(x, axis=1, keepdims=True)
+    np.divide(x, norms, out=x, where=norms > 0)
+    return x
+
+def _block_sims(x: Union[np.ndarray, QuantizedEmbeddings], start: int, stop: int, block_rows: int) -> np.ndarray:
+    """(b, N) float32 similarities of rows [start, stop) against all rows."""
+    if not isinstance(x, QuantizedEmbeddings):
+        return x[start:stop] @ x.T
+    # quantized rows are dequantized per column chunk: float32 never holds more than one chunk
+    n = len(x)
+    q = x.block(start, stop)
+    sims = np.empty((stop - start, n), dtype=np.float32)
+    for col in range(0, n, block_rows):
+        col_stop = min(col + block_rows, n)
+        sims[:, col:col_stop] = q @ x.block(col, col_stop).T
+    return sims
+
+def _topk_width(n: int, top_k: Optional[int], blocking: Optional[BlockingMask]) -> int:
+    k = n if top_k is None else max(0, min(int(top_k), n))
+    if blocking is not None and n:
+        k = min(k, int(blocking.allowed_counts().max()))
+    return k
+
+def iter_neighbor_blocks(
+    embeddings: Union[np.ndarray, QuantizedEmbeddings],
+    top_k: Optional[int] = None,
+    block_rows: int = DEFAULT_BLOCK_ROWS,
+    blocking: Optional[BlockingMask] = None,
+) -> Iterator[Tuple[int, np.ndarray, np.ndarray]]:
+    """
+    dense_cosine_topk one row block at a time: yields (start, indices (b, k), scores (b, k)) for
+    query rows [start, start + b). Only the current block is held (block_rows x N scores).
+    """
+    x = embeddings if isinstance(embeddings, QuantizedEmbeddings) else normalize_rows(embeddings)
+    n = x.shape[0]
+    k = _topk_width(n, top_k, blocking)
+
+    for start in range(0, n, block_rows):
+        stop = min(start + block_rows, n)
+        if k == 0:
+            yield start, np.empty((stop - start, 0), dtype=np.int32), np.empty((stop - start, 0), dtype=np.float32)
+            continue
+        sims = _block_sims(x, start, stop, block_rows)
+        if blocking is not None:
+            sims[~blocking.mask(start, stop)] = -np.inf
+        if k < n:
+            part = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+            part.sort(axis=1)  # index order -> stable tie-break below
+            part_sims = np.take_along_axis(sims, part, axis=1)
+            order = np.argsort(-part_sims, axis=1, kind="stable")
+            idx = np.take_along_axis(part, order, axis=1)
+        else:
+            idx = np.argsort(-sims, axis=1, kind="stable")
+        row_scores = np.take_along_axis(sims, idx, axis=1)
+        del sims
+        if blocking is not None:
+            blocked = np.isneginf(row_scores)
+            idx[blocked] = -1
+            row_scores[blocked] = np.nan
+        yield start, idx.astype(np.int32), row_scores
+
+def dense_cosine_topk(
+    embeddings: Union[np.ndarray, QuantizedEmbeddings],
+    top_k: Optional[int] = None,
+    block_rows: int = DEFAULT_BLOCK_ROWS,
+    blocking: Optional[BlockingMask] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Exact all-pairs cosine similarity by blocked float32 matmul.
+    Returns (indices int32 (N, k), scores float32 (N, k)), each row sorted by descending similarity
+    (ties by element index; with top_k, ties straddling the k-th place are kept arbitrarily).
+    top_k=None -> k = N (full ranking).
+    blocking: blocked pairs are masked out before selection; k shrinks to the largest allowed
+    candidate count and shorter rows are padded with index -1 / score NaN.
+    Peak extra memory: block_rows x N float32 scores per block.
+    QuantizedEmbeddings (float16 / int8, possibly memory-mapped) are scored as stored, dequantized
+    block by block, so the full float32 matrix is never materialized.
+    """
+    n = embeddings.shape[0]
+    k = _topk_width(n, top_k, blocking)
+    indices = np.empty((n, k), dtype=np.int32)
+    scores = np.empty((n, k), dtype=np.float32)
+    if k == 0:
+        return indices, scores
+
+    for start, idx, row_scores in iter_neighbor_blocks(embeddings, top_k, block_rows, blocking):
+        indices[start:start + idx.shape[0]] = idx
+        scores[start:start + idx.shape[0]] = row_scores
+    return indices, scores
+
+def topk_to_cosine_results(
+    queries: Sequence[str],
+    metadata: Sequence[Dict[str, Any]],
+    indices: np.ndarray,
+    scores: np.ndarray,
+) -> List[Dict[str, Any]]:
+    """Adapter to compute_pairwise_cosine_similarity's output format (consumed by build_sim_matrices); index -1 = padding."""
+    return NeighborArrays(indices, scores).to_cosine_results(queries, metadata)
+
+def compute_pairwise_cosine_similarity_dense(
+    queries: List[str],
+    metadata: Union[Sequence[Dict[str, Any]], SchemaCatalog],
+    openai_api_key: Optional[str],
+    embedding_model: str,
+    embedding_cache: Optional[EmbeddingCache] = None,
+    top_k: Optional[int] = None,
+    block_rows: int = DEFAULT_BLOCK_ROWS,
+    embed_fn: Optional[Callable[[List[str]], Any]] = None,
+    blocking: Optional[BlockingMask] = None,
+    as_arrays: bool = False,
+    compression: Optional[EmbeddingCompression] = None,
+    as_blocks: bool = False,
+) -> Union[List[Dict[str, Any]], NeighborArrays, Iterator[Tuple[int, np.ndarray, np.ndarray]]]:
+    """
+    Same contract as chroma_cosine.compute_pairwise_cosine_similarity, computed exactly in memory
+    (no vector DB): embed with embed_fn (default: Chroma's OpenAIEmbeddingFunction; through
+    `embedding_cache` if given) -> normalize -> blocked matmul -> sort.
+    as_arrays=True returns the NeighborArrays directly (no per-pair dicts).
+    as_blocks=True embeds now and returns the iter_neighbor_blocks generator: row blocks are scored
+    only as the consumer pulls them (filtering.streaming), so (N, k) arrays are never stored.
+    compression: reduce dimensions and/or quantize the vectors before scoring (the embedding cache
+    keeps full-precision vectors, so every setting reuses the same API results).
+    """
+    assert len(queries) == len(metadata), "queries and metadata must have same length"
+
+    if embed_fn is None:
+        embed_fn = embedding_functions.OpenAIEmbeddingFunction(api_key=openai_api_key, model_name=embedding_model)
+    if embedding_cache is not None:
+        embeddings = embedding_cache.embed(embedding_model, queries, embed_fn)
+    else:
+        embeddings = np.asarray(embed_fn(list(queries)), dtype=np.float32)
+
+    if compression is not None:
+        embeddings = compression.apply(embeddings)
+
+    if as_blocks:
+        return iter_neighbor_blocks(embeddings, top_k=top_k, block_rows=block_rows, blocking=blocking)
+    indices, scores = dense_cosine_topk(embeddings, top_k=top_k, block_rows=block_rows, blocking=blocking)
+    if as_arrays:
+        return NeighborArrays(indices, scores)
+    if isinstance(metadata, SchemaCatalog):
+        metadata = metadata.metadata()
+    return topk_to_cosine_results(queries, metadata, indices, scores)
@@ -0,0 +1,129 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence
+import hashlib
+import os
+import sqlite3
+import numpy as np
+
+# SQLite host-parameter limit is 999 on older builds
+_LOOKUP_BATCH = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS embeddings (
+    model TEXT NOT NULL,
+    text_sha256 TEXT NOT NULL,
+    dim INTEGER NOT NULL,
+    vector BLOB NOT NULL,
+    PRIMARY KEY (model, text_sha256)
+) WITHOUT ROWID
+"""
+
+@dataclass(frozen=True)
+class EmbeddingCacheStats:
+    entries: int
+    size_bytes: int
+    hits: int
+    misses: int
+
+    def __str__(self) -> str:
+        return (
+            f"entries={self.entries} size={self.size_bytes / 1e6:.1f}MB "
+            f"hits={self.hits} misses={self.misses}"
+        )
+
+def text_key(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+class EmbeddingCache:
+    """
+    Persistent content-addressed embedding store: (embedding model, sha256(text)) -> float32 vector.
+    - SQLite in WAL mode: concurrent runs on one machine read while one writes; inserts are
+      INSERT OR IGNORE, so two runs embedding the same text cannot conflict
+    - only cache misses (deduplicated) are sent to the embedding provider
+    """
+
+    def __init__(self, path: str, timeout_s: float = 60.0):
+        self.path = path
+        self.timeout_s = timeout_s
+        self.hits = 0
+        self.misses = 0
+        parent = os.path.dirname(os.path.abspath(path))
+        os.makedirs(parent, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=self.timeout_s)
+        conn.execute(f"PRAGMA busy_timeout={int(self.timeout_s * 1000)}")
+        return conn
+
+    def get_many(self, model: str, keys: Sequence[str]) -> Dict[str, np.ndarray]:
+        found: Dict[str, np.ndarray] = {}
+        conn = self._connect()
+        try:
+            for start in range(0, len(keys), _LOOKUP_BATCH):
+                batch = list(keys[start:start + _LOOKUP_BATCH])
+                rows = conn.execute(
+                    f"SELECT text_sha256, vector FROM embeddings WHERE model = ? "
+                    f"AND text_sha256 IN ({','.join('?' * len(batch))})",
+                    [model, *batch],
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float32)
+        finally:
+            conn.close()
+        return found
+
+    def put_many(self, model: str, keys: Sequence[str], vectors: np.ndarray) -> None:
+        vectors = np.asarray(vectors, dtype=np.float32)
+        rows = [(model, key, int(vec.size), vec.tobytes()) for key, vec in zip(keys, vectors)]
+        conn = self._connect()
+        try:
+            with conn:
+                conn.executemany(
+                    "INSERT OR IGNORE INTO embeddings (model, text_sha256, dim, vector) VALUES (?, ?, ?, ?)",
+                    rows,
+                )
+        finally:
+            conn.close()
+
+    def embed(
+        self,
+        model: str,
+        texts: Sequence[str],
+        embed_fn: Callable[[List[str]], Sequence[Sequence[float]]],
+    ) -> np.ndarray:
+        """(N, dim) float32 embeddings for `texts`; embed_fn is called once, on the missing texts only."""
+        keys = [text_key(t) for t in texts]
+        cached = self.get_many(model, sorted(set(keys)))
+
+        missing: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in cached and key not in missing:
+                missing[key] = text
+        self.hits += len(texts) - sum(1 for key in keys if key in missing)
+        self.misses += sum(1 for key in keys if key in missing)
+
+        if missing:
+            miss_keys = list(missing)
+            vectors = np.asarray(embed_fn([missing[k] for k in miss_keys]), dtype=np.float32)
+            self.put_many(model, miss_keys, vectors)
+            cached.update(zip(miss_keys, vectors))
+
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.stack([cached[key] for key in keys])
+
+    def stats(self, model: Optional[str] = None) -> EmbeddingCacheStats:
+        conn = self._connect()
+        try:
+            if model is None:
+                entries = conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            else:
+                entries = conn.execute("SELECT COUNT(*) FROM embeddings WHERE model = ?", (model,)).fetchone()[0]
+        finally:
+            conn.close()
+        size = sum(os.path.getsize(p) for p in (self.path, self.path + "-wal") if os.path.exists(p))
+        return EmbeddingCacheStats(entries=int(entries), size_bytes=size, hits=self.hits, misses=self.misses)
@@ -0,0 +1,206 @@
+from __future__ import annotations
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+import hashlib
+import math
+import random
+import threading
+import time
+import numpy as np
+
+# OpenAI embeddings: <= 2048 inputs and <= 300k tokens per request
+DEFAULT_MAX_BATCH_TEXTS = 2048
+DEFAULT_MAX_BATCH_TOKENS = 200_000
+# schema texts (JSON-ish, ids, numbers) tokenize denser than prose; overestimate rather than overflow
+BYTES_PER_TOKEN = 3
+
+def fractional_tokens(text: str) -> float:
+    """Unrounded estimate_tokens: additive over pieces of a text (sum, then round up once)."""
+    return len(text.encode("utf-8")) / BYTES_PER_TOKEN
+
+def estimate_tokens(text: str) -> int:
+    """Conservative token estimate (no tokenizer dependency)."""
+    return max(1, math.ceil(fractional_tokens(text)))
+
+def pack_batches(
+    texts: Sequence[str],
+    max_batch_tokens: int = DEFAULT_MAX_BATCH_TOKENS,
+    max_batch_texts: int = DEFAULT_MAX_BATCH_TEXTS,
+) -> List[range]:
+    """
+    Split texts into contiguous batches (input order kept) of at most max_batch_texts texts and
+    max_batch_tokens estimated tokens; a single text above the token limit gets its own batch.
+    """
+    batches: List[range] = []
+    start = 0
+    tokens = 0
+    for i, text in enumerate(texts):
+        t = estimate_tokens(text)
+        if i > start and (tokens + t > max_batch_tokens or i - start >= max_batch_texts):
+            batches.append(range(start, i))
+            start, tokens = i, 0
+        tokens += t
+    if start < len(texts):
+        batches.append(range(start, len(texts)))
+    return batches
+
+class ThrottledError(RuntimeError):
+    """Provider-agnostic 'slow down' signal (raised by FakeEmbeddingProvider)."""
+
+class OpenAIEmbeddingProvider:
+    """One embeddings request per call through the official `openai` client."""
+
+    def __init__(self, api_key: str, model: str, timeout_s: Optional[float] = None):
+        import openai
+
+        self.model = model
+        self._openai = openai
+        # retries are handled by BatchedEmbedder (with backoff across the whole pool)
+        self._client = openai.OpenAI(api_key=api_key, timeout=timeout_s, max_retries=0)
+
+    def embed_batch(self, texts: List[str]) -> List[List[float]]:
+        resp = self._client.embeddings.create(model=self.model, input=texts)
+        return [d.embedding for d in sorted(resp.data, key=lambda d: d.index)]
+
+    def is_retryable(self, exc: BaseException) -> bool:
+        o = self._openai
+        return isinstance(exc, (o.RateLimitError, o.APITimeoutError, o.APIConnectionError, o.InternalServerError))
+
+class FakeEmbeddingProvider:
+    """
+    Offline stand-in for benchmarks/tests:
+    - deterministic unit vectors seeded by sha256(text)
+    - simulated request latency: latency_s + s_per_token * estimated tokens (sleeps, so threads overlap)
+    - throttle_every=n raises ThrottledError on every n-th request
+    """
+
+    def __init__(
+        self,
+        dim: int = 256,
+        latency_s: float = 0.05,
+        s_per_token: float = 0.0,
+        throttle_every: int = 0,
+        model: str = "fake",
+    ):
+        self.model = model
+        self.dim = dim
+        self.latency_s = latency_s
+        self.s_per_token = s_per_token
+        self.throttle_every = throttle_every
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def embed_batch(self, texts: List[str]) -> List[List[float]]:
+        with self._lock:
+            self.calls += 1
+            call = self.calls
+        time.sleep(self.latency_s + self.s_per_token * sum(estimate_tokens(t) for t in texts))
+        if self.throttle_every and call % self.throttle_every == 0:
+            raise ThrottledError(f"throttled (request {call})")
+        out = []
+        for text in texts:
+            seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "little")
+            v = np.random.default_rng(seed).standard_normal(self.dim)
+            out.append((v / np.linalg.norm(v)).tolist())
+        return out
+
+    def is_retryable(self, exc: BaseException) -> bool:
+        return isinstance(exc, ThrottledError)
+
+@dataclass(frozen=True)
+class EmbedderStats:
+    texts: int
+    requests: int
+    retries: int
+    est_tokens: int
+    seconds: float
+
+    def __str__(self) -> str:
+        return (
+            f"texts={self.texts} requests={self.requests} retries={self.retries} "
+            f"est_tokens={self.est_tokens} time={self.seconds:.1f}s"
+        )
+
+class BatchedEmbedder:
+    """
+    embed_fn for the retrieval stage (callable: list of texts -> (N, dim) float32):
+    - texts packed into batches by estimated tokens (pack_batches)
+    - up to `concurrency` requests in flight (thread pool; the work is network-bound)
+    - retryable errors (throttling, timeouts, 5xx) retried with capped exponential backoff + jitter
+    - output rows in input order
+    """
+
+    def __init__(
+        self,
+        provider,
+        max_batch_tokens: int = DEFAULT_MAX_BATCH_TOKENS,
+        max_batch_texts: int = DEFAULT_MAX_BATCH_TEXTS,
+        concurrency: int = 4,
+        max_retries: int = 6,
+        backoff_base_s: float = 1.0,
+        backoff_max_s: float = 60.0,
+    ):
+        self.provider = provider
+        self.max_batch_tokens = max_batch_tokens
+        self.max_batch_texts = max_batch_texts
+        self.concurrency = max(1, concurrency)
+        self.max_retries = max_retries
+        self.backoff_base_s = backoff_base_s
+        self.backoff_max_s = backoff_max_s
+        self._texts = 0
+        self._requests = 0
+        self._retries = 0
+        self._tokens = 0
+        self._seconds = 0.0
+        self._lock = threading.Lock()
+
+    def _embed_with_retry(self, texts: List[str]) -> List[List[float]]:
+        attempt = 0
+        while True:
+            with self._lock:
+                self._requests += 1
+            try:
+                vectors = self.provider.embed_batch(texts)
+            except Exception as e:
+                if attempt >= self.max_retries or not self.provider.is_retryable(e):
+                    raise
+                with self._lock:
+                    self._retries += 1
+                delay = min(self.backoff_max_s, self.backoff_base_s * 2 ** attempt)
+                time.sleep(delay * random.uniform(0.5, 1.0))
+                attempt += 1
+                continue
+            if len(vectors) != len(texts):
+                raise RuntimeError(f"Embedding provider returned {len(vectors)} vectors for {len(texts)} texts")
+            return vectors
+
+    def __call__(self, texts: Sequence[str]) -> np.ndarray:
+        texts = list(texts)
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        t0 = time.perf_counter()
+        batches = pack_batches(texts, self.max_batch_tokens, self.max_batch_texts)
+        chunks = [texts[b.start:b.stop] for b in batches]
+        if self.concurrency == 1 or len(chunks) == 1:
+            results = [self._embed_with_retry(c) for c in chunks]
+        else:
+            with ThreadPoolExecutor(max_workers=min(self.concurrency, len(chunks))) as ex:
+                results = list(ex.map(self._embed_with_retry, chunks))  # map keeps batch order
+        out = np.asarray([v for vectors in results for v in vectors], dtype=np.float32)
+
+        with self._lock:
+            self._texts += len(texts)
+            self._tokens += sum(estimate_tokens(t) for t in texts)
+            self._seconds += time.perf_counter() - t0
+        return out
+
+    def stats(self) -> EmbedderStats:
+        with self._lock:
+            return EmbedderStats(
+                texts=self._texts,
+                requests=self._requests,
+                retries=self._retries,
+                est_tokens=self._tokens,
+                seconds=self._seconds,
+            )
@@ -0,0 +1,91 @@
+from __future__ import annotations
+from typing import List, Sequence, Tuple
+import re
+import numpy as np
+import scipy.sparse as sp
+
+LOCAL_MODEL_PREFIX = "local-"
+DEFAULT_LOCAL_DIM = 1024
+
+_LOCAL_MODEL_RE = re.compile(r"^local-ngram(?:-(\d+))?$")
+_POLY = np.uint64(0x100000001B3)  # FNV-1a 64 prime as rolling-hash base
+
+def is_local_model(embedding_model: str) -> bool:
+    return embedding_model.startswith(LOCAL_MODEL_PREFIX)
+
+def _mix64(x: np.ndarray) -> np.ndarray:
+    """splitmix64 finalizer (spreads rolling-hash bits before the modulo)."""
+    x = x ^ (x >> np.uint64(30))
+    x = x * np.uint64(0xBF58476D1CE4E5B9)
+    x = x ^ (x >> np.uint64(27))
+    x = x * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+class HashedNgramEmbedder:
+    """
+    Local CPU embedder: hashed character n-gram TF-IDF (no network, no model files).
+    - lowercased UTF-8 bytes, n-grams n in ngram_range hashed into `dim` buckets (vectorized rolling hash)
+    - sublinear TF (1 + log tf) x smoothed IDF fitted on the texts of each call, rows L2-normalized
+    IDF depends on the whole text list, so call it once on the full corpus (not through the
+    embedding cache or BatchedEmbedder, which would fit it per batch).
+    Model names: "local-ngram" (dim 1024) or "local-ngram-<dim>".
+    """
+
+    def __init__(self, dim: int = DEFAULT_LOCAL_DIM, ngram_range: Tuple[int, int] = (3, 5)):
+        if dim < 1:
+            raise ValueError(f"dim must be >= 1. Got: {dim}")
+        self.dim = dim
+        self.ngram_range = ngram_range
+
+    @classmethod
+    def from_model_name(cls, embedding_model: str) -> "HashedNgramEmbedder":
+        m = _LOCAL_MODEL_RE.match(embedding_model)
+        if m is None:
+            raise ValueError(f"Unknown local embedding model: {embedding_model!r} (expected local-ngram[-<dim>])")
+        return cls(dim=int(m.group(1)) if m.group(1) else DEFAULT_LOCAL_DIM)
+
+    def _hashed_ngrams(self, texts: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """(row index, bucket) per n-gram occurrence."""
+        n_min, n_max = self.ngram_range
+        encoded = [f" {t.lower()} ".encode("utf-8") for t in texts]
+        lengths = np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded))
+        total = int(lengths.sum())
+        buf = np.frombuffer(b"".join(encoded), dtype=np.uint8).astype(np.uint64)
+
+        row_of_pos = np.repeat(np.arange(len(texts), dtype=np.int64), lengths)
+        ends = np.repeat(np.cumsum(lengths), lengths)
+        remaining = ends - np.arange(total, dtype=np.int64)  # bytes from this position to end of its text
+
+        rows: List[np.ndarray] = []
+        buckets: List[np.ndarray] = []
+        h = np.zeros(total, dtype=np.uint64)
+        shifted = np.zeros(total, dtype=np.uint64)
+        for n in range(1, n_max + 1):
+            shifted[:] = 0
+            shifted[: total - n + 1] = buf[n - 1:]
+            h = h * _POLY + shifted  # hash of bytes [i, i+n), wraps mod 2^64
+            if n < n_min:
+                continue
+            valid = remaining >= n
+            rows.append(row_of_pos[valid])
+            buckets.append((_mix64(h[valid] + np.uint64(n)) % np.uint64(self.dim)).astype(np.int64))
+        return np.concatenate(rows), np.concatenate(buckets)
+
+    def __call__(self, texts: Sequence[str]) -> np.ndarray:
+        texts = list(texts)
+        if not texts:
+            return np.zeros((0, self.dim), dtype=np.float32)
+        rows, buckets = self._hashed_ngrams(texts)
+        tf = sp.csr_matrix(
+            (np.ones(rows.size, dtype=np.float32), (rows, buckets)), shape=(len(texts), self.dim)
+        )  # duplicates summed -> counts
+        tf.data = 1.0 + np.log(tf.data)
+
+        df = np.bincount(tf.indices, minlength=self.dim)
+        idf = (np.log((1.0 + len(texts)) / (1.0 + df)) + 1.0).astype(np.float32)
+        tf.data *= idf[tf.indices]
+
+        out = tf.toarray()
+        norms = np.linalg.norm(out, axis=1, keepdims=True)
+        np.divide(out, norms, out=out, where=norms > 0)
+        return out.astype(np.float32, copy=False)
@@ -0,0 +1,40 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Any, Dict, List, Sequence
+import numpy as np
+
+@dataclass(frozen=True)
+class NeighborArrays:
+    """
+    Index-only retrieval result, row i = query element i (input order):
+    - indices: int32 (N, K) candidate element ids, most similar first (-1 = padding)
+    - scores: float32 (N, K) cosine similarity (NaN = padding)
+    K = N for all-pairs retrieval, k for top-k; documents/metadata stay with the catalog.
+    """
+    indices: np.ndarray
+    scores: np.ndarray
+
+    def __len__(self) -> int:
+        return int(self.indices.shape[0])
+
+    @property
+    def width(self) -> int:
+        return int(self.indices.shape[1]) if self.indices.ndim == 2 else 0
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.indices.nbytes + self.scores.nbytes)
+
+    def to_cosine_results(self, queries: Sequence[str], metadata: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Expand to compute_pairwise_cosine_similarity's list-of-dicts format."""
+        return [
+            {
+                "query": q,
+                "candidates": [
+                    {"similarity": float(s), "metadata": metadata[j], "document": queries[j]}
+                    for j, s in zip(row_idx.tolist(), row_sims.tolist())
+                    if j >= 0
+                ],
+            }
+            for q, row_idx, row_sims in zip(queries, self.indices, self.scores)
+        ]
@@ -1,19 +1,24 @@
 from __future__ import annotations
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 import os
-import json
 import pandas as pd
-from langchain_core.prompts import PromptTemplate
 
 from .models import GraphEdge, SchemaContext
-from .io import read_csv_clean, load_json_lines
+from .io import read_csv_bytes, read_csv_clean, load_json_lines, sniff_csv
 from .json_flatten import flatten_dict
-from .stats import get_data_type, stat_compute, extract_unique_values, sample_up_to_k, to_python_types
-
-schema_description_prompt = PromptTemplate.from_template(
-    "source_type:{source_type},source_name:{source_name},element_type:{element_type},"
-    "element_name:{element_name},data_type:{data_type},sample_values:{sample_values},"
-    "stat_summary:{stat_summary},graph_edges:{graph_edges}"
+from .stats import get_data_type, stat_compute, extract_unique_values, sample_up_to_k
+from .profile import ProfileConfig, profile_csv_chunks, profile_json_lines
+from .cache import ProfileCache
+from .render import render_prompt_from_context  # re-exported (public API)
+from .sampling import BlockSample, sample_json_lines, sample_line_blocks
+from .sketches import MinHash
+
+_CSV_READ_KWARGS: Dict[str, Any] = dict(
+    encodings=["utf-8", "cp949", "latin1"],
+    engine="python",
+    quotechar='"',
+    escapechar="\\",
+    on_bad_lines="warn",
 )
 
 def graph_edge_generation(
@@ -22,6 +27,8 @@ def graph_edge_generation(
     direction: str,
     source_node: str,
     target_node: str,
+    profile: Optional[ProfileConfig] = None,
+    cache: Optional[ProfileCache] = None,
 ) -> GraphEdge:
     direction = direction.lower()
     source_node = source_node.lower()
@@ -30,19 +37,29 @@ def graph_edge_generation(
     file_path = os.path.join(path, fname)
     data_name = fname.rsplit(".", 1)[0]
 
-    df = read_csv_clean(
-        file_path,
-        encodings=["utf-8", "cp949", "latin1"],
-        engine="python",
-        quotechar='"',
-        escapechar="\\",
-        on_bad_lines="warn",
-    ).infer_objects()
+    profile = profile or ProfileConfig()
+    if cache is not None:
+        params = {"direction": direction, "source": source_node, "target": target_node}
+        entry, hit = cache.lookup("graph_edge", file_path, params, profile)
+        if hit is not None:
+            return hit
+        edge = graph_edge_generation(path, fname, direction, source_node, target_node, profile)
+        cache.store(entry, edge)
+        return edge
 
     edge_property: Dict[str, List[Any]] = {}
-    for col in df.columns:
-        unique_vals = extract_unique_values(df[col].dropna())
-        edge_property[col] = sample_up_to_k(unique_vals, k=5)
+    sampled = _sample_csv(file_path, profile)
+    if sampled is None and profile.streaming:
+        for col, acc in profile_csv_chunks(file_path, profile, **_CSV_READ_KWARGS).items():
+            edge_property[col] = acc.finalize()[1]
+    else:
+        if sampled is not None:
+            df = sampled[0]
+        else:
+            df = read_csv_clean(file_path, backend=profile.csv_backend, **_CSV_READ_KWARGS).infer_objects()
+        for col in df.columns:
+            unique_vals = extract_unique_values(df[col].dropna())
+            edge_property[col] = sample_up_to_k(unique_vals, k=5)
 
     return GraphEdge(
         edge_name=data_name,
@@ -57,32 +74,69 @@ def schema_generation(
     fname: str,
     model: str,
     graph_edges_input: Optional[List[GraphEdge]] = None,
+    profile: Optional[ProfileConfig] = None,
+    cache: Optional[ProfileCache] = None,
 ) -> List[SchemaContext]:
+    """
+    Profile one source file into SchemaContexts (one per column/field/property).
+    With `profile.chunksize` set, CSVs and JSON Lines are profiled in bounded memory.
+    With `profile.row_budget` set, files above the budget are profiled from a block sample.
+    With `cache`, a previous result for the same file fingerprint + settings is reused.
+    """
     model = model.lower()
+    profile = profile or ProfileConfig()
     file_path = os.path.join(path, fname)
     data_name = fname.rsplit(".", 1)[0]
 
+    if cache is not None:
+        # cached without edges (they are profiled and cached on their own); attached on the way out
+        entry, contexts = cache.lookup("schema", file_path, {"model": model}, profile)
+        if contexts is None:
+            contexts = schema_generation(path, fname, model, None, profile)
+            cache.store(entry, contexts)
+        if model == "graph" and graph_edges_input:
+            contexts = with_graph_edges(contexts, graph_edges_input)
+        return contexts
+
+    sample: Optional[BlockSample] = None
     if model == "document":
-        df = pd.DataFrame([flatten_dict(rec) for rec in load_json_lines(file_path)])
         element_type = "field"
         source_type = "document"
         graph_edges = None
 
-    elif model in {"table", "graph"}:
-        df = read_csv_clean(
-            file_path,
-            encodings=["utf-8", "cp949", "latin1"],
-            engine="python",
-            quotechar='"',
-            escapechar="\\",
-            on_bad_lines="warn",
-        ).infer_objects()
+        sampled = sample_json_lines(file_path, profile.row_budget, profile.sample_seed) if profile.row_budget else None
+        if sampled is not None:
+            records, sample = sampled
+            df = pd.DataFrame([flatten_dict(rec) for rec in records])
+        elif profile.streaming:
+            return [
+                _context_from_profile(
+                    source_type, data_name, element_type, key, *acc.finalize(), graph_edges, acc.value_minhash()
+                )
+                for key, acc in profile_json_lines(file_path, profile).items()
+            ]
+        else:
+            df = pd.DataFrame([flatten_dict(rec) for rec in load_json_lines(file_path)])
 
+    elif model in {"table", "graph"}:
         source_type = model
         element_type = "column" if model == "table" else "property"
         graph_edges = [] if model == "graph" else None
         if model == "graph" and graph_edges_input:
             graph_edges = graph_edges_input
+
+        sampled = _sample_csv(file_path, profile)
+        if sampled is not None:
+            df, sample = sampled
+        elif profile.streaming:
+            return [
+                _context_from_profile(
+                    source_type, data_name, element_type, col, *acc.finalize(), graph_edges, acc.value_minhash()
+                )
+                for col, acc in profile_csv_chunks(file_path, profile, **_CSV_READ_KWARGS).items()
+            ]
+        else:
+            df = read_csv_clean(file_path, backend=profile.csv_backend, **_CSV_READ_KWARGS).infer_objects()
     else:
         raise ValueError("Invalid model type. Must be 'table', 'document', or 'graph'.")
 
@@ -90,6 +144,9 @@ def schema_generation(
     for col in df.columns:
         unique_vals = extract_unique_values(df[col].dropna())
         samples = sample_up_to_k(unique_vals, k=5)
+        stat_summary = stat_compute(df[col], mode=profile.profile_mode, hll_precision=profile.hll_precision) or {}
+        if sample is not None:
+            stat_summary = {**stat_summary, **sample.summary()}
 
         ctx = SchemaContext(
             source_type=source_type,
@@ -98,18 +155,49 @@ def schema_generation(
             element_name=col,
             data_type=get_data_type(df[col]),
             sample_values=samples,
-            stat_summary=stat_compute(df[col]) if pd.api.types.is_numeric_dtype(df[col]) else {},
+            stat_summary=stat_summary,
             graph_edges=graph_edges,
+            value_minhash=MinHash.of(unique_vals, profile.minhash_perm).tolist() if profile.minhash_perm else None,
         )
         contexts.append(ctx)
 
     return contexts
 
-def render_prompt_from_context(ctx: SchemaContext) -> str:
-    payload = ctx.model_dump(exclude_none=True)
-
-    payload["sample_values"] = json.dumps(to_python_types(payload.get("sample_values", [])), ensure_ascii=False)
-    payload["stat_summary"]  = json.dumps(to_python_types(payload.get("stat_summary", {})), ensure_ascii=False)
-    payload["graph_edges"]   = json.dumps(to_python_types(payload.get("graph_edges", [])), ensure_ascii=False)
-
-    return schema_description_prompt.format(**payload)
\ No newline at end of file
+def with_graph_edges(contexts: List[SchemaContext], graph_edges: List[GraphEdge]) -> List[SchemaContext]:
+    """Copies of graph-node contexts carrying `graph_edges` (the same list object on every copy)."""
+    return [ctx.model_copy(update={"graph_edges": graph_edges}) for ctx in contexts]
+
+def _sample_csv(file_path: str, profile: ProfileConfig) -> Optional[Tuple[pd.DataFrame, BlockSample]]:
+    """Block-sampled CSV -> (DataFrame, BlockSample) under profile.row_budget, or None to read it all."""
+    if not profile.row_budget:
+        return None
+    sample = sample_line_blocks(file_path, profile.row_budget, header=True, seed=profile.sample_seed)
+    if sample is None:
+        return None
+    read_kwargs = dict(_CSV_READ_KWARGS)
+    encodings = read_kwargs.pop("encodings")
+    df = read_csv_bytes(sample.data, sniff_csv(file_path, encodings), encodings, **read_kwargs).infer_objects()
+    return df, sample
+
+def _context_from_profile(
+    source_type: str,
+    source_name: str,
+    element_type: str,
+    element_name: str,
+    data_type: str,
+    samples: List[Any],
+    stat_summary: Dict[str, Any],
+    graph_edges: Optional[List[GraphEdge]],
+    value_minhash: Optional[List[int]] = None,
+) -> SchemaContext:
+    return SchemaContext(
+        source_type=source_type,
+        source_name=source_name,
+        element_type=element_type,
+        element_name=element_name,
+        data_type=data_type,
+        sample_values=samples,
+        stat_summary=stat_summary,
+        graph_edges=graph_edges,
+        value_minhash=value_minhash,
+    )
@@ -0,0 +1,178 @@
+from __future__ import annotations
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple
+import glob
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+
+from .models import GraphEdge, SchemaContext
+from .profile import ProfileConfig
+
+# bump when profiling output changes for identical inputs/settings
+# (2: value_minhash, approx mode, capped exact distinct counts)
+PROFILE_CACHE_VERSION = 2
+
+_HASH_BLOCK = 1 << 20
+
+# modules whose code determines a profile; their source is part of every key
+_PROFILING_MODULES = ("build", "io", "json_flatten", "models", "profile", "sampling", "sketches", "stats")
+
+_ENTRY_TYPES = {"schema": list, "graph_edge": GraphEdge}
+
+def default_cache_dir(name: str) -> str:
+    """
+    Per-user cache location, never next to the data:
+    $MULTIMATCHER_CACHE_DIR or $XDG_CACHE_HOME/multimatcher or ~/.cache/multimatcher, then `name`.
+    """
+    root = os.getenv("MULTIMATCHER_CACHE_DIR") or os.path.join(
+        os.getenv("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"), "multimatcher"
+    )
+    return os.path.join(root, name)
+
+@lru_cache(maxsize=1)
+def profiling_code_hash() -> str:
+    """sha256 over the profiling modules' source, so edited profiling code never reuses old entries."""
+    h = hashlib.sha256()
+    here = os.path.dirname(os.path.abspath(__file__))
+    for name in _PROFILING_MODULES:
+        with open(os.path.join(here, f"{name}.py"), "rb") as f:
+            h.update(name.encode("utf-8") + b"\0" + f.read())
+    return h.hexdigest()
+
+@dataclass(frozen=True)
+class CacheStats:
+    entries: int
+    size_bytes: int
+    hits: int
+    misses: int
+
+    def __str__(self) -> str:
+        return (
+            f"entries={self.entries} size={self.size_bytes / 1e6:.1f}MB "
+            f"hits={self.hits} misses={self.misses}"
+        )
+
+class ProfileCache:
+    """
+    On-disk cache of profiled SchemaContext / GraphEdge results (opt-in; see default_cache_dir).
+    - key: (file path, size, mtime_ns | content sha256, kind, call params, ProfileConfig, version,
+      profiling code hash); sample_seed only counts when row_budget sampling is on
+    - one pickle per entry: <cache_dir>/<file basename>.<key>.pkl (atomic replace; safe across processes)
+    - an entry is only used if it records the same version and key and holds the expected type;
+      anything else counts as a miss and is overwritten. Entries are pickles: only point
+      cache_dir at a directory you trust.
+    """
+
+    def __init__(self, cache_dir: str, key_mode: str = "mtime"):
+        if key_mode not in ("mtime", "content"):
+            raise ValueError(f"Unknown key_mode: {key_mode}. Must be 'mtime' or 'content'.")
+        self.cache_dir = cache_dir
+        self.key_mode = key_mode
+        self.hits = 0
+        self.misses = 0
+
+    def _fingerprint(self, file_path: str) -> Dict[str, Any]:
+        st = os.stat(file_path)
+        fp: Dict[str, Any] = {"path": os.path.abspath(file_path), "size": st.st_size}
+        if self.key_mode == "content":
+            h = hashlib.sha256()
+            with open(file_path, "rb") as f:
+                for block in iter(lambda: f.read(_HASH_BLOCK), b""):
+                    h.update(block)
+            fp["sha256"] = h.hexdigest()
+        else:
+            fp["mtime_ns"] = st.st_mtime_ns
+        return fp
+
+    def key(self, kind: str, file_path: str, params: Dict[str, Any], profile: ProfileConfig) -> str:
+        settings = asdict(profile)
+        if not profile.row_budget:
+            # every row is profiled: the seed does not affect the result (0 and None both mean no budget)
+            settings["row_budget"] = None
+            del settings["sample_seed"]
+        payload = {
+            "version": PROFILE_CACHE_VERSION,
+            "code": profiling_code_hash(),
+            "kind": kind,
+            "file": self._fingerprint(file_path),
+            "params": params,
+            "profile": settings,
+        }
+        blob = json.dumps(payload, sort_keys=True, default=str).encode("utf-8")
+        return hashlib.sha256(blob).hexdigest()
+
+    def _entry_path(self, file_path: str, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{os.path.basename(file_path)}.{key}.pkl")
+
+    def lookup(
+        self, kind: str, file_path: str, params: Dict[str, Any], profile: ProfileConfig
+    ) -> Tuple[str, Optional[Any]]:
+        """Returns (entry path, cached value or None) and counts the hit/miss."""
+        key = self.key(kind, file_path, params, profile)
+        entry = self._entry_path(file_path, key)
+        try:
+            with open(entry, "rb") as f:
+                record = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+            record = None
+        value = _check_record(record, kind, key)
+        if value is None:
+            self.misses += 1
+            return entry, None
+        self.hits += 1
+        return entry, value
+
+    def store(self, entry: str, value: Any) -> None:
+        os.makedirs(self.cache_dir, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                record = {"version": PROFILE_CACHE_VERSION, "key": _entry_key(entry), "value": value}
+                pickle.dump(record, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, entry)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+    def _entries(self, file_name: Optional[str] = None) -> list:
+        pattern = f"{glob.escape(file_name) if file_name else '*'}.{'[0-9a-f]' * 64}.pkl"
+        return glob.glob(os.path.join(glob.escape(self.cache_dir), pattern))
+
+    def stats(self) -> CacheStats:
+        entries = self._entries()
+        return CacheStats(
+            entries=len(entries),
+            size_bytes=sum(os.path.getsize(p) for p in entries if os.path.exists(p)),
+            hits=self.hits,
+            misses=self.misses,
+        )
+
+    def invalidate(self, file_name: Optional[str] = None) -> int:
+        """Delete every entry (or only those of one source file, by basename). Returns #deleted."""
+        removed = 0
+        for p in self._entries(os.path.basename(file_name) if file_name else None):
+            try:
+                os.remove(p)
+                removed += 1
+            except FileNotFoundError:
+                pass
+        return removed
+
+def _entry_key(entry: str) -> str:
+    return os.path.basename(entry).rsplit(".", 2)[-2]
+
+def _check_record(record: Any, kind: str, key: str) -> Optional[Any]:
+    """The cached value if `record` is a current entry for `key`, else None."""
+    if not isinstance(record, dict) or record.get("version") != PROFILE_CACHE_VERSION or record.get("key") != key:
+        return None
+    value = record.get("value")
+    if not isinstance(value, _ENTRY_TYPES[kind]):
+        return None
+    if kind == "schema" and not all(isinstance(ctx, SchemaContext) for ctx in value):
+        return None
+    return value
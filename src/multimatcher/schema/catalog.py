@@ -0,0 +1,128 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+import numpy as np
+import pandas as pd
+
+from .models import GraphEdge, SchemaContext
+from .sketches import MinHash
+
+def _value(cat: pd.Categorical, i: int) -> Optional[str]:
+    code = cat.codes[i]
+    return None if code < 0 else cat.categories[code]
+
+@dataclass(frozen=True)
+class SchemaCatalog:
+    """
+    Columnar (struct-of-arrays) store of schema elements, one row per SchemaContext.
+    - element i has the integer id i; `ids[i]` is its pipeline id "source_name/element_name" (lowercased,
+      as in retrieval results / real_filter)
+    - source_type / source_name / element_type / data_type: pd.Categorical (int8/16 codes + interned labels)
+    - sample_values / stat_summary: per-element payloads; graph_edges: distinct edge lists + int32 index (-1 = None)
+    - value_minhash: uint64 (N, num_perm) value-set signatures (MinHash.EMPTY rows = no values),
+      None when profiled without ProfileConfig.minhash_perm
+    - SchemaContext views are materialized lazily (`catalog[i]`, iteration)
+    """
+    source_type: pd.Categorical
+    source_name: pd.Categorical
+    element_type: pd.Categorical
+    element_name: np.ndarray
+    data_type: pd.Categorical
+    sample_values: List[Optional[List[Any]]]
+    stat_summary: List[Optional[Dict[str, Any]]]
+    edge_lists: List[List[GraphEdge]]
+    edge_index: np.ndarray
+    value_minhash: Optional[np.ndarray] = None
+
+    @classmethod
+    def from_contexts(cls, contexts: Sequence[SchemaContext]) -> "SchemaCatalog":
+        edge_lists: List[List[GraphEdge]] = []
+        edge_slot: Dict[int, int] = {}
+        edge_index = np.full(len(contexts), -1, dtype=np.int32)
+        for i, ctx in enumerate(contexts):
+            if ctx.graph_edges is None:
+                continue
+            slot = edge_slot.get(id(ctx.graph_edges))
+            if slot is None:
+                slot = edge_slot[id(ctx.graph_edges)] = len(edge_lists)
+                edge_lists.append(ctx.graph_edges)
+            edge_index[i] = slot
+
+        element_name = np.empty(len(contexts), dtype=object)
+        element_name[:] = [ctx.element_name for ctx in contexts]
+
+        value_minhash = None
+        num_perm = max((len(ctx.value_minhash) for ctx in contexts if ctx.value_minhash), default=0)
+        if num_perm:
+            value_minhash = np.full((len(contexts), num_perm), MinHash.EMPTY, dtype=np.uint64)
+            for i, ctx in enumerate(contexts):
+                if ctx.value_minhash:
+                    value_minhash[i] = ctx.value_minhash
+        return cls(
+            source_type=pd.Categorical([ctx.source_type for ctx in contexts]),
+            source_name=pd.Categorical([ctx.source_name for ctx in contexts]),
+            element_type=pd.Categorical([ctx.element_type for ctx in contexts]),
+            element_name=element_name,
+            data_type=pd.Categorical([ctx.data_type for ctx in contexts]),
+            sample_values=[ctx.sample_values for ctx in contexts],
+            stat_summary=[ctx.stat_summary for ctx in contexts],
+            edge_lists=edge_lists,
+            edge_index=edge_index,
+            value_minhash=value_minhash,
+        )
+
+    def __len__(self) -> int:
+        return int(self.element_name.size)
+
+    def __getitem__(self, i: int) -> SchemaContext:
+        return self.context(i)
+
+    def __iter__(self) -> Iterator[SchemaContext]:
+        for i in range(len(self)):
+            yield self.context(i)
+
+    def context(self, i: int) -> SchemaContext:
+        """SchemaContext view of element i (graph_edges are the shared GraphEdge objects)."""
+        slot = int(self.edge_index[i])
+        return SchemaContext.model_construct(
+            source_type=_value(self.source_type, i),
+            source_name=_value(self.source_name, i),
+            element_type=_value(self.element_type, i),
+            element_name=self.element_name[i],
+            data_type=_value(self.data_type, i),
+            sample_values=self.sample_values[i],
+            stat_summary=self.stat_summary[i],
+            graph_edges=self.edge_lists[slot] if slot >= 0 else None,
+            value_minhash=self._minhash_list(i),
+        )
+
+    def _minhash_list(self, i: int) -> Optional[List[int]]:
+        if self.value_minhash is None or bool((self.value_minhash[i] == MinHash.EMPTY).all()):
+            return None
+        return self.value_minhash[i].tolist()
+
+    @cached_property
+    def ids(self) -> np.ndarray:
+        names = np.asarray(self.source_name, dtype=object)
+        out = np.empty(len(self), dtype=object)
+        out[:] = [f"{s}/{e}".lower() for s, e in zip(names, self.element_name)]
+        return out
+
+    @cached_property
+    def index(self) -> Dict[str, int]:
+        """Pipeline id -> element id (the last element wins on duplicate ids)."""
+        return {eid: i for i, eid in enumerate(self.ids)}
+
+    def index_of(self, element_id: str) -> Optional[int]:
+        return self.index.get(element_id)
+
+    def metadata(self) -> List[Dict[str, Any]]:
+        """Per-element retrieval metadata (source_type/source_name/element_type/element_name)."""
+        columns = [
+            ("source_type", np.asarray(self.source_type, dtype=object)),
+            ("source_name", np.asarray(self.source_name, dtype=object)),
+            ("element_type", np.asarray(self.element_type, dtype=object)),
+            ("element_name", self.element_name),
+        ]
+        return [{key: col[i] for key, col in columns} for i in range(len(self))]
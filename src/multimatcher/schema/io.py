@@ -1,34 +1,201 @@
 from __future__ import annotations
-from typing import List
+from dataclasses import dataclass
+from typing import Iterator, List, Optional
+import codecs
+import csv
+import io
 import json
+import re
 import pandas as pd
 
-def load_json_lines(filepath: str) -> List[dict]:
-    """Read JSON Lines -> list[dict]."""
+# prefix used to detect encoding/dialect (bounded; never the whole file)
+SNIFF_BYTES = 1 << 20
+
+_C_ERROR_ROW_RE = re.compile(r"\brow (\d+)")
+
+@dataclass(frozen=True)
+class CsvDialect:
+    encoding: str
+    delimiter: str
+
+def iter_json_lines(filepath: str) -> Iterator[dict]:
+    """Stream JSON Lines -> dict per non-empty line."""
     with open(filepath, "r", encoding="utf-8") as f:
-        out = []
         for line in f:
             line = line.strip()
             if not line:
                 continue
-            out.append(json.loads(line))
-        return out
+            yield json.loads(line)
+
+def load_json_lines(filepath: str) -> List[dict]:
+    """Read JSON Lines -> list[dict]."""
+    return list(iter_json_lines(filepath))
+
+def _drop_unnamed(df: pd.DataFrame) -> pd.DataFrame:
+    return df.loc[:, ~df.columns.str.startswith("Unnamed:")]
+
+def sniff_csv(
+    file_path: str,
+    encodings: List[str] = ["utf-8", "cp949", "latin1"],
+    sample_bytes: int = SNIFF_BYTES,
+) -> CsvDialect:
+    """
+    Detect encoding + delimiter from a bounded prefix of the file.
+    - encoding: first candidate that decodes the prefix (a multi-byte char cut at the
+      prefix boundary is tolerated); latin1 if none does
+    - delimiter: csv.Sniffer over the first lines, defaulting to ','
+    """
+    with open(file_path, "rb") as f:
+        head = f.read(sample_bytes)
+        at_eof = not f.read(1)
+
+    encoding, text = "latin1", None
+    for enc in encodings:
+        try:
+            text = codecs.getincrementaldecoder(enc)().decode(head, final=at_eof)
+            encoding = enc
+            break
+        except (UnicodeDecodeError, LookupError):
+            continue
+    if text is None:
+        text = head.decode("latin1")
+
+    lines = text.splitlines()[:50]
+    delimiter = ","
+    if lines:
+        try:
+            sniffed = csv.Sniffer().sniff("\n".join(lines), delimiters=",;\t|").delimiter
+            # trust the header: a comma-separated header wins over a sniffed delimiter it doesn't contain
+            if not ("," in lines[0] and sniffed not in lines[0]):
+                delimiter = sniffed
+        except csv.Error:
+            pass
+
+    return CsvDialect(encoding=encoding, delimiter=delimiter)
 
 def read_csv_clean(
     file_path: str,
     encodings: List[str] = ["utf-8", "cp949", "latin1"],
+    backend: str = "legacy",
     **kwargs,
 ) -> pd.DataFrame:
-    """Try multiple encodings; drop 'Unnamed:' columns."""
+    """
+    Try multiple encodings; drop 'Unnamed:' columns.
+    backend:
+      - "legacy": re-parse once per encoding with the caller's engine
+      - "c" / "pyarrow": sniff encoding + delimiter once, then a single fast parse
+        (the caller's engine is only used as fallback for rows the fast parser rejects)
+    """
+    if backend in ("c", "pyarrow"):
+        return _read_csv_sniffed(file_path, encodings, fast_engine=backend, **kwargs)
+    if backend != "legacy":
+        raise ValueError(f"Unknown CSV backend: {backend}. Must be 'legacy', 'c', or 'pyarrow'.")
+
     for enc in encodings:
         try:
             df = pd.read_csv(file_path, encoding=enc, **kwargs)
-            df = df.loc[:, ~df.columns.str.startswith("Unnamed:")]
+            df = _drop_unnamed(df)
             return df
         except UnicodeDecodeError:
             continue
 
     # fallback
     df = pd.read_csv(file_path, encoding="latin1", engine="python", **kwargs)
-    df = df.loc[:, ~df.columns.str.startswith("Unnamed:")]
-    return df
\ No newline at end of file
+    df = _drop_unnamed(df)
+    return df
+
+def _read_csv_sniffed(
+    file_path: str,
+    encodings: List[str],
+    fast_engine: str = "c",
+    **kwargs,
+) -> pd.DataFrame:
+    fallback_engine = kwargs.pop("engine", None) or "python"
+    dialect = sniff_csv(file_path, encodings)
+    kwargs.setdefault("sep", dialect.delimiter)
+
+    # prefix looked fine but a later byte didn't decode -> try the remaining candidates
+    order = [dialect.encoding] + [e for e in encodings if e != dialect.encoding]
+    for enc in order:
+        try:
+            return _drop_unnamed(_read_csv_fast(file_path, enc, fast_engine, fallback_engine, **kwargs))
+        except UnicodeDecodeError:
+            continue
+
+    df = pd.read_csv(file_path, encoding="latin1", engine=fallback_engine, **kwargs)
+    return _drop_unnamed(df)
+
+def _read_csv_fast(
+    file_path: str,
+    encoding: str,
+    fast_engine: str,
+    fallback_engine: str,
+    **kwargs,
+) -> pd.DataFrame:
+    engines = [fast_engine, "c"] if fast_engine == "pyarrow" else ["c"]
+    for engine in engines:
+        try:
+            return pd.read_csv(file_path, encoding=encoding, engine=engine, **kwargs)
+        except UnicodeDecodeError:
+            raise
+        except pd.errors.ParserError as e:
+            if engine == "c":
+                return _read_csv_split(file_path, encoding, fallback_engine, e, **kwargs)
+        except (ImportError, ValueError):
+            continue  # engine not installed / option unsupported -> next engine
+
+    return pd.read_csv(file_path, encoding=encoding, engine=fallback_engine, **kwargs)
+
+def _read_csv_split(
+    file_path: str,
+    encoding: str,
+    fallback_engine: str,
+    error: Exception,
+    **kwargs,
+) -> pd.DataFrame:
+    """
+    The C tokenizer gave up at a record (e.g. 'EOF inside string starting at row N').
+    Keep the C parse for every record before it and hand only the rest to the fallback engine.
+    """
+    m = _C_ERROR_ROW_RE.search(str(error))
+    if not m:
+        return pd.read_csv(file_path, encoding=encoding, engine=fallback_engine, **kwargs)
+
+    bad_row = int(m.group(1))  # record index, header = 0
+    head: Optional[pd.DataFrame] = None
+    if bad_row > 1:
+        head = pd.read_csv(file_path, encoding=encoding, engine="c", nrows=bad_row - 1, **kwargs)
+    tail = pd.read_csv(
+        file_path, encoding=encoding, engine=fallback_engine, skiprows=range(1, bad_row), **kwargs
+    )
+    if head is None:
+        return tail
+    if tail.empty:
+        return head
+    return pd.concat([head, tail], ignore_index=True)
+
+def read_csv_bytes(
+    data: bytes,
+    dialect: CsvDialect,
+    encodings: List[str] = ["utf-8", "cp949", "latin1"],
+    **kwargs,
+) -> pd.DataFrame:
+    """
+    Parse an in-memory CSV (e.g. a block sample) with an already sniffed dialect.
+    C engine first; the caller's engine only for data the C tokenizer rejects.
+    """
+    fallback_engine = kwargs.pop("engine", None) or "python"
+    kwargs.setdefault("sep", dialect.delimiter)
+    order = [dialect.encoding] + [e for e in encodings if e != dialect.encoding]
+    for enc in order:
+        try:
+            try:
+                df = pd.read_csv(io.BytesIO(data), encoding=enc, engine="c", **kwargs)
+            except pd.errors.ParserError:
+                df = pd.read_csv(io.BytesIO(data), encoding=enc, engine=fallback_engine, **kwargs)
+            return _drop_unnamed(df)
+        except UnicodeDecodeError:
+            continue
+
+    df = pd.read_csv(io.BytesIO(data), encoding="latin1", engine=fallback_engine, **kwargs)
+    return _drop_unnamed(df)
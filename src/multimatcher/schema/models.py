@@ -20,4 +20,7 @@ class SchemaContext(BaseModel):
     sample_values: Optional[List[Union[str, int, float]]] = Field(None)
     stat_summary: Optional[Dict] = Field(None)
 
-    graph_edges: Optional[List[GraphEdge]] = Field(None)
\ No newline at end of file
+    graph_edges: Optional[List[GraphEdge]] = Field(None)
+
+    # MinHash of the distinct values (ProfileConfig.minhash_perm); not part of the rendered prompt
+    value_minhash: Optional[List[int]] = Field(None, exclude=True)
\ No newline at end of file
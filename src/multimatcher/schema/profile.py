@@ -0,0 +1,383 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+import math
+import numpy as np
+import pandas as pd
+
+from .io import iter_json_lines, sniff_csv
+from .json_flatten import flatten_dict
+from .sketches import DistinctReservoir, DuplicateTracker, HyperLogLog, MinHash, QuantileSketch
+from .stats import PROFILE_MODES, approx_unique_stats, extract_unique_values
+
+# pandas' default boolean literals (python/C engines)
+_TRUE_VALUES = {"True", "TRUE", "true"}
+_FALSE_VALUES = {"False", "FALSE", "false"}
+
+# integer ranges numpy can hold: pandas infers int64, uint64 (all >= 0) or object beyond them
+_INT64_MIN, _INT64_MAX, _UINT64_MAX = -(2**63), 2**63 - 1, 2**64 - 1
+
+@dataclass(frozen=True)
+class ProfileConfig:
+    """
+    Profiling settings shared by schema_generation / graph_edge_generation.
+    - chunksize: rows per chunk for bounded-memory (streaming) profiling; None = load whole file
+    - sample_k: number of sample_values per element
+    - quantile_capacity: per-level capacity of the median sketch (exact below this many values)
+    - csv_backend: "c" | "pyarrow" (sniff encoding/dialect once, single fast parse) | "legacy"
+    - profile_mode: "exact" | "approx" (HyperLogLog distinct counts, selection/sketch medians;
+      stat_summary reports the error bounds used)
+    - hll_precision: HyperLogLog register bits for profile_mode="approx"
+    - row_budget: profile at most ~this many rows per file (block-level random sample via byte-offset
+      seeks; stat_summary is marked "sampled"); None = every row
+    - sample_seed: seed of the block offsets (None = different sample each run)
+    - minhash_perm: MinHash signature length of each element's distinct values (value-overlap
+      candidates); 0 = no signature
+    - distinct_cap: chunked exact mode keeps a numeric column's distinct values (for
+      percentage_unique_value) up to this many; beyond it the column switches to HyperLogLog +
+      duplicate tracking and stat_summary reports the error under "approximation"
+    """
+    chunksize: Optional[int] = None
+    sample_k: int = 5
+    quantile_capacity: int = 8192
+    csv_backend: str = "c"
+    profile_mode: str = "exact"
+    hll_precision: int = 14
+    row_budget: Optional[int] = None
+    sample_seed: Optional[int] = 0
+    minhash_perm: int = 0
+    distinct_cap: int = 100_000
+
+    @property
+    def streaming(self) -> bool:
+        return bool(self.chunksize)
+
+
+class NumericAccumulator:
+    """
+    One-pass count/min/max/mean/var (Chan et al. merge), median sketch and distinct count:
+    - exact: set of distinct values while it holds at most distinct_cap of them, then the
+      approx structures seeded from it (memory stays bounded on key-like columns)
+    - approx: HyperLogLog + duplicate tracker (exact uniqueness; memory released on the first repeat)
+    """
+
+    def __init__(
+        self,
+        quantile_capacity: int = 8192,
+        approx: bool = False,
+        hll_precision: int = 14,
+        distinct_cap: int = 100_000,
+    ):
+        self.count = 0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.sketch = QuantileSketch(quantile_capacity)
+        self.approx = approx
+        self.hll_precision = hll_precision
+        self.distinct_cap = distinct_cap
+        self.distinct: Optional[set] = None if approx else set()
+        self.hll = HyperLogLog(hll_precision) if approx else None
+        self.duplicates = DuplicateTracker() if approx else None
+
+    def update(self, values: np.ndarray) -> None:
+        n = int(values.size)
+        if n == 0:
+            return
+        vf = values.astype(float, copy=False)
+        c_mean = float(vf.sum()) / n
+        c_m2 = float(((vf - c_mean) ** 2).sum())
+
+        total = self.count + n
+        delta = c_mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += c_m2 + delta * delta * self.count * n / total
+        self.count = total
+
+        c_min, c_max = values.min(), values.max()
+        self.min = c_min if self.min is None else min(self.min, c_min)
+        self.max = c_max if self.max is None else max(self.max, c_max)
+
+        self.sketch.update(vf)
+        if self.distinct is None:
+            self.hll.update(vf)
+            self.duplicates.update(vf)
+            return
+        # raw values: large uint64 / int64 keys would collide as floats
+        self.distinct.update(np.unique(values).tolist())
+        if len(self.distinct) > self.distinct_cap:
+            # HyperLogLog ignores repeats, so the distinct values seen so far stand in for the stream
+            seen = np.fromiter(self.distinct, dtype=float, count=len(self.distinct))
+            self.hll = HyperLogLog(self.hll_precision)
+            self.hll.update(seen)
+            self.duplicates = DuplicateTracker()
+            if self.count > seen.size:
+                self.duplicates.release()
+            else:
+                self.duplicates.update(seen)
+            self.distinct = None
+
+    def summary(self, null_count: int, integer: bool) -> Dict[str, Any]:
+        """Same keys/rounding as stats.stat_compute."""
+        n = self.count
+        if n == 0:
+            return {
+                "count": 0, "min": None, "max": None, "mean": None, "median": None,
+                "std": None, "var": None, "percentage_unique_value": None,
+                "possible_primary_key": False,
+            }
+        var = self.m2 / (n - 1) if n > 1 else math.nan
+        cast = int if integer else float
+        if self.distinct is None:
+            unique = approx_unique_stats(n, null_count, self.hll, self.duplicates.all_distinct)
+        else:
+            percentage_unique = round(len(self.distinct) / n * 100, 1)
+            unique = {
+                "percentage_unique_value": percentage_unique,
+                "possible_primary_key": bool(null_count == 0 and percentage_unique == 100),
+            }
+        summary = {
+            "count": n,
+            "min": round(cast(self.min), 1),
+            "max": round(cast(self.max), 1),
+            "mean": round(self.mean, 1),
+            "median": round(self.sketch.median(), 1),
+            "std": round(math.sqrt(var), 1),
+            "var": round(var, 1),
+            **unique,
+        }
+        if self.approx:
+            summary["approximation"] = {
+                "distinct_relative_error": round(self.hll.relative_error, 4),
+                "median_rank_error": round(self.sketch.rank_error(), 4),
+            }
+        elif self.distinct is None:
+            summary["approximation"] = {"distinct_relative_error": round(self.hll.relative_error, 4)}
+        return summary
+
+
+class ColumnAccumulator:
+    """
+    Per-column streaming profile, fed either raw CSV string chunks (`update`) or
+    native JSON values (`update_values`).
+    Tracks the pandas dtype the full column would have been inferred as
+    (bool / integer / float / object), so the final SchemaContext matches the
+    in-memory path.
+    """
+
+    def __init__(self, config: ProfileConfig, raw_strings: bool = True):
+        self.config = config
+        self.raw_strings = raw_strings
+        self.null_count = 0
+        self.absent_count = 0  # JSON records without this key (NaN-filled, unlike an explicit null)
+        self.kind: Optional[str] = None  # None (all null so far) | "bool" | "int" | "float" | "object"
+        self.int_min: Optional[int] = None  # range of the native ints seen (update_values)
+        self.int_max: Optional[int] = None
+        self.reservoir = DistinctReservoir(config.sample_k)
+        self.minhash: Optional[MinHash] = MinHash(config.minhash_perm) if config.minhash_perm else None
+        if config.profile_mode not in PROFILE_MODES:
+            raise ValueError(f"Unknown profile_mode: {config.profile_mode}. Must be 'exact' or 'approx'.")
+        self.numeric: Optional[NumericAccumulator] = NumericAccumulator(
+            config.quantile_capacity,
+            approx=config.profile_mode == "approx",
+            hll_precision=config.hll_precision,
+            distinct_cap=config.distinct_cap,
+        )
+
+    def _merge_kind(self, kind: str) -> None:
+        if self.kind is None or self.kind == kind:
+            self.kind = kind
+        elif {self.kind, kind} == {"int", "float"}:
+            self.kind = "float"
+        else:
+            self.kind = "object"
+        if self.kind in ("object", "bool"):
+            self.numeric = None
+
+    def update(self, raw: pd.Series) -> None:
+        """raw: one chunk of the column read with dtype=object (NA already parsed as NaN)."""
+        present = raw.dropna()
+        self.null_count += int(raw.size - present.size)
+        if present.empty:
+            return
+
+        if self.kind != "object":
+            kind, nums = _infer_chunk_kind(present)
+            self._merge_kind(kind)
+            if self.numeric is not None and nums is not None:
+                self.numeric.update(nums)
+
+        self._update_values(extract_unique_values(present))
+
+    def _update_values(self, unique: List[Any]) -> None:
+        self.reservoir.update(unique)
+        if self.minhash is not None:
+            self.minhash.update(unique)
+
+    def update_values(self, values: List[Any]) -> None:
+        """values: non-null native values of one block of records (nulls are counted by the caller)."""
+        if not values:
+            return
+
+        if self.kind != "object":
+            kinds = {_py_kind(v) for v in values}
+            for kind in kinds:
+                self._merge_kind(kind)
+            if "int" in kinds and self.kind in ("int", "float"):
+                self._merge_int_range([v for v in values if type(v) is int])
+            if self.numeric is not None:
+                if self.kind == "float":
+                    dtype = float
+                else:
+                    dtype = np.uint64 if self.int_max > _INT64_MAX else np.int64
+                self.numeric.update(np.asarray(values, dtype=dtype))
+
+        self._update_values(extract_unique_values(pd.Series(values, dtype=object)))
+
+    def _merge_int_range(self, ints: List[int]) -> None:
+        """Integers numpy cannot hold make the column object, like pandas' inference (int64 / uint64 / object)."""
+        lo, hi = min(ints), max(ints)
+        self.int_min = lo if self.int_min is None else min(self.int_min, lo)
+        self.int_max = hi if self.int_max is None else max(self.int_max, hi)
+        if self.int_min < _INT64_MIN or self.int_max > _UINT64_MAX:
+            self._merge_kind("object")
+        elif self.kind == "int" and self.int_min < 0 and self.int_max > _INT64_MAX:
+            self._merge_kind("object")  # negative and above int64: no common integer dtype
+
+    def value_minhash(self) -> Optional[List[int]]:
+        return self.minhash.tolist() if self.minhash is not None else None
+
+    def finalize(self) -> Tuple[str, List[Any], Dict[str, Any]]:
+        # all-NaN column -> float64 in pandas; header-only column / explicit-null-only field -> object
+        all_nan = (self.raw_strings and self.null_count) or self.absent_count
+        kind = self.kind or ("float" if all_nan else "object")
+        if self.null_count and kind == "int":
+            kind = "float"
+        if self.null_count and kind == "bool":
+            kind = "object-bool"  # object column holding True/False
+
+        samples = self.reservoir.values()
+        if kind == "int":
+            samples = [int(v) for v in samples]
+        elif kind == "float":
+            # parse like the CSV reader does (float() can differ in the last ulp)
+            samples = pd.to_numeric(pd.Series(samples, dtype=object)).astype(float).tolist()
+        elif kind in ("bool", "object-bool") and self.raw_strings:
+            samples = [v in _TRUE_VALUES for v in samples]
+
+        data_type = {"int": "integer", "float": "float", "bool": "boolean"}.get(kind, "string")
+        stats: Dict[str, Any] = {}
+        if kind in ("int", "float") and self.numeric is not None:
+            stats = self.numeric.summary(self.null_count, integer=(kind == "int"))
+        return data_type, samples, stats
+
+
+def _py_kind(v: Any) -> str:
+    if isinstance(v, bool):
+        return "bool"
+    if isinstance(v, int):
+        return "int"
+    if isinstance(v, float):
+        return "float"
+    return "object"
+
+
+def _infer_chunk_kind(present: pd.Series) -> Tuple[str, Optional[np.ndarray]]:
+    values = present.astype(str)
+    nums = pd.to_numeric(values, errors="coerce")
+    if not nums.isna().any():
+        arr = nums.to_numpy()
+        return ("int" if arr.dtype.kind in "iu" else "float"), arr
+    uniq = set(values.unique().tolist())
+    if uniq <= (_TRUE_VALUES | _FALSE_VALUES):
+        return "bool", None
+    return "object", None
+
+
+def profile_csv_chunks(
+    file_path: str,
+    config: ProfileConfig,
+    encodings: List[str] = ["utf-8", "cp949", "latin1"],
+    **kwargs,
+) -> Dict[str, ColumnAccumulator]:
+    """
+    Stream a CSV in `config.chunksize`-row chunks into per-column accumulators.
+    Peak memory is bounded by the chunk size, not the file size.
+    """
+    if config.csv_backend != "legacy":
+        fallback_engine = kwargs.pop("engine", None) or "python"
+        dialect = sniff_csv(file_path, encodings)
+        kwargs.setdefault("sep", dialect.delimiter)
+        order = [dialect.encoding] + [e for e in encodings if e != dialect.encoding]
+        for enc in order:
+            try:
+                return _profile_csv_chunks(file_path, config, encoding=enc, engine="c", **kwargs)
+            except UnicodeDecodeError:
+                continue
+            except pd.errors.ParserError:
+                # rows the C tokenizer rejects: re-stream with the caller's engine
+                return _profile_csv_chunks(file_path, config, encoding=enc, engine=fallback_engine, **kwargs)
+        return _profile_csv_chunks(file_path, config, encoding="latin1", engine=fallback_engine, **kwargs)
+
+    for enc in encodings:
+        try:
+            return _profile_csv_chunks(file_path, config, encoding=enc, **kwargs)
+        except UnicodeDecodeError:
+            continue
+
+    # fallback
+    return _profile_csv_chunks(file_path, config, encoding="latin1", **kwargs)
+
+
+def _profile_csv_chunks(file_path: str, config: ProfileConfig, **kwargs) -> Dict[str, ColumnAccumulator]:
+    accs: Dict[str, ColumnAccumulator] = {}
+    reader = pd.read_csv(file_path, dtype=object, chunksize=config.chunksize, **kwargs)
+    with reader:
+        for chunk in reader:
+            chunk = chunk.loc[:, ~chunk.columns.str.startswith("Unnamed:")]
+            for col in chunk.columns:
+                if col not in accs:
+                    accs[col] = ColumnAccumulator(config)
+                accs[col].update(chunk[col])
+    return accs
+
+
+def profile_json_lines(file_path: str, config: ProfileConfig) -> Dict[str, ColumnAccumulator]:
+    """
+    Stream a JSON Lines file, flattening each record on the fly (same keys as flatten_dict),
+    and feed per-field accumulators in blocks of `config.chunksize` records.
+    No DataFrame is built; memory is bounded by the block size.
+    """
+    accs: Dict[str, ColumnAccumulator] = {}
+    seen: Dict[str, int] = {}
+    present: Dict[str, int] = {}
+    block: Dict[str, List[Any]] = {}
+    n_records = 0
+    block_size = config.chunksize or 10_000
+
+    def flush() -> None:
+        for key, values in block.items():
+            accs[key].update_values(values)
+        block.clear()
+
+    for rec in iter_json_lines(file_path):
+        n_records += 1
+        for key, v in flatten_dict(rec).items():
+            if key not in accs:
+                accs[key] = ColumnAccumulator(config, raw_strings=False)
+                seen[key] = present[key] = 0
+            seen[key] += 1
+            if v is None or (isinstance(v, float) and math.isnan(v)):
+                continue
+            present[key] += 1
+            block.setdefault(key, []).append(v)
+        if n_records % block_size == 0:
+            flush()
+    flush()
+
+    # records missing a field (or holding null) become NaN in the DataFrame path
+    for key, acc in accs.items():
+        acc.null_count = n_records - present[key]
+        acc.absent_count = n_records - seen[key]
+    return accs
@@ -0,0 +1,64 @@
+from __future__ import annotations
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import json
+
+from .models import GraphEdge, SchemaContext
+from .stats import to_python_types
+
+# plain str.format template (same text LangChain's PromptTemplate used to produce)
+SCHEMA_DESCRIPTION_TEMPLATE = (
+    "source_type:{source_type},source_name:{source_name},element_type:{element_type},"
+    "element_name:{element_name},data_type:{data_type},sample_values:{sample_values},"
+    "stat_summary:{stat_summary},graph_edges:{graph_edges}"
+)
+
+def _dumps(obj: Any) -> str:
+    return json.dumps(to_python_types(obj), ensure_ascii=False)
+
+def _render_edges(edges: Optional[Sequence[GraphEdge]]) -> str:
+    return _dumps([e.model_dump(exclude_none=True) for e in edges or []])
+
+def _render(ctx: SchemaContext, graph_edges: str) -> str:
+    payload = ctx.model_dump(exclude_none=True, exclude={"graph_edges"})
+    payload["sample_values"] = _dumps(payload.get("sample_values", []))
+    payload["stat_summary"] = _dumps(payload.get("stat_summary", {}))
+    payload["graph_edges"] = graph_edges
+    return SCHEMA_DESCRIPTION_TEMPLATE.format(**payload)
+
+def render_prompt_from_context(ctx: SchemaContext) -> str:
+    return _render(ctx, _render_edges(ctx.graph_edges))
+
+class PromptRenderer:
+    """
+    Memoized render_prompt_from_context.
+    - each SchemaContext is rendered once (keyed by object identity; the context is kept
+      alive by the cache, so the id is never reused)
+    - graph_edges payloads are serialized once per distinct edge list and shared by every
+      node property that references the same GraphEdge objects
+    Contexts must not be mutated after their first render.
+    """
+
+    def __init__(self):
+        self._texts: Dict[int, Tuple[SchemaContext, str]] = {}
+        self._edges: Dict[Tuple[int, ...], Tuple[Sequence[GraphEdge], str]] = {}
+
+    def _edges_text(self, edges: Optional[Sequence[GraphEdge]]) -> str:
+        key = tuple(id(e) for e in edges or [])
+        hit = self._edges.get(key)
+        if hit is None:
+            hit = (list(edges or []), _render_edges(edges))
+            self._edges[key] = hit
+        return hit[1]
+
+    def render(self, ctx: SchemaContext) -> str:
+        hit = self._texts.get(id(ctx))
+        if hit is None:
+            hit = (ctx, _render(ctx, self._edges_text(ctx.graph_edges)))
+            self._texts[id(ctx)] = hit
+        return hit[1]
+
+    def render_all(self, contexts: Sequence[SchemaContext]) -> List[str]:
+        return [self.render(ctx) for ctx in contexts]
+
+    def __len__(self) -> int:
+        return len(self._texts)
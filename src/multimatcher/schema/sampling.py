@@ -0,0 +1,108 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+import json
+import math
+import os
+import random
+
+from .io import SNIFF_BYTES
+
+# rows read per random block (contiguous rows keep the read pattern sequential)
+DEFAULT_BLOCK_ROWS = 1000
+# small budgets are still spread over at least this many blocks
+MIN_BLOCKS = 32
+
+@dataclass(frozen=True)
+class BlockSample:
+    """Bytes of a block-sampled line-oriented file: header line (if any) + sampled lines."""
+    data: bytes
+    rows: int
+    estimated_rows: int
+
+    def summary(self) -> Dict[str, Any]:
+        """Marker merged into stat_summary of every element profiled from this sample."""
+        return {"sampled": True, "sample_rows": self.rows, "estimated_rows": self.estimated_rows}
+
+def sample_line_blocks(
+    file_path: str,
+    row_budget: int,
+    header: bool = True,
+    block_rows: int = DEFAULT_BLOCK_ROWS,
+    seed: Optional[int] = 0,
+) -> Optional[BlockSample]:
+    """
+    Block-level random sample of at most ~`row_budget` lines, without scanning the file.
+    - row count is estimated from the mean line length of a bounded prefix
+    - the data region is split into equal byte strata; one block per stratum starts at a random
+      offset, resyncs on the next line boundary and takes lines starting inside its stratum
+      (so blocks never overlap)
+    Returns None when the file is estimated to fit the budget (caller reads it as usual).
+    Note: a CSV field with an embedded newline can be cut at a resync point; the reader's
+    on_bad_lines handling drops such rows.
+    """
+    if row_budget <= 0:
+        raise ValueError("row_budget must be > 0")
+
+    size = os.path.getsize(file_path)
+    with open(file_path, "rb") as f:
+        head = f.read(SNIFF_BYTES)
+        data_start = 0
+        header_line = b""
+        if header:
+            nl = head.find(b"\n")
+            if nl < 0:
+                return None
+            data_start = nl + 1
+            header_line = head[:data_start]
+
+        prefix = head[data_start:]
+        last_nl = prefix.rfind(b"\n")
+        n_lines = prefix.count(b"\n")
+        if n_lines == 0:
+            return None  # a single (partial) line: nothing to estimate from
+        avg_line = (last_nl + 1) / n_lines
+        estimated_rows = int((size - data_start) / avg_line)
+        if estimated_rows <= row_budget:
+            return None
+
+        n_blocks = max(math.ceil(row_budget / block_rows), min(MIN_BLOCKS, row_budget))
+        rows_per_block, extra = divmod(row_budget, n_blocks)
+        stratum = (size - data_start) / n_blocks
+        slack = max(1, int(stratum - (rows_per_block + 1) * avg_line))
+        rng = random.Random(seed)
+
+        lines: List[bytes] = []
+        for i in range(n_blocks):
+            lo = data_start + int(i * stratum)
+            hi = data_start + int((i + 1) * stratum)
+            offset = lo + rng.randrange(slack)
+            if offset > data_start:
+                f.seek(offset - 1)
+                f.readline()  # finish the line holding offset-1 -> next line boundary
+            else:
+                f.seek(offset)
+            quota = rows_per_block + (1 if i < extra else 0)
+            taken = 0
+            while taken < quota and f.tell() < hi:
+                line = f.readline()
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                lines.append(line if line.endswith(b"\n") else line + b"\n")
+                taken += 1
+
+    return BlockSample(data=header_line + b"".join(lines), rows=len(lines), estimated_rows=estimated_rows)
+
+def sample_json_lines(
+    file_path: str,
+    row_budget: int,
+    seed: Optional[int] = 0,
+) -> Optional[Tuple[List[dict], BlockSample]]:
+    """Block-sampled JSON Lines -> (records, BlockSample), or None if the file fits the budget."""
+    sample = sample_line_blocks(file_path, row_budget, header=False, seed=seed)
+    if sample is None:
+        return None
+    records = [json.loads(line) for line in sample.data.decode("utf-8").splitlines() if line.strip()]
+    return records, sample
@@ -0,0 +1,294 @@
+from __future__ import annotations
+from typing import Any, Dict, List, Optional
+import math
+import random
+import numpy as np
+import pandas as pd
+
+class QuantileSketch:
+    """
+    Mergeable compacting quantile sketch (KLL-style, equal level capacities).
+    - Exact while fewer than `capacity` values have been added
+    - Level i holds values of weight 2**i; a full level is sorted and every
+      second value (random offset) is promoted to the next level
+    """
+
+    def __init__(self, capacity: int = 8192):
+        if capacity < 2:
+            raise ValueError("capacity must be >= 2")
+        self.capacity = int(capacity)
+        self.count = 0
+        self._levels: List[List[np.ndarray]] = [[]]
+        self._sizes: List[int] = [0]
+
+    @property
+    def is_exact(self) -> bool:
+        return len(self._levels) == 1
+
+    def update(self, values: np.ndarray) -> None:
+        values = np.asarray(values, dtype=float)
+        if values.size == 0:
+            return
+        self.count += int(values.size)
+        self._push(0, values)
+
+    def merge(self, other: "QuantileSketch") -> None:
+        self.count += other.count
+        for level, arrays in enumerate(other._levels):
+            for arr in arrays:
+                self._push(level, arr)
+
+    def _push(self, level: int, values: np.ndarray) -> None:
+        while len(self._levels) <= level:
+            self._levels.append([])
+            self._sizes.append(0)
+        self._levels[level].append(values)
+        self._sizes[level] += int(values.size)
+
+        while self._sizes[level] > self.capacity:
+            buf = np.sort(np.concatenate(self._levels[level]))
+            if buf.size % 2:
+                keep, buf = buf[-1:], buf[:-1]
+            else:
+                keep = buf[:0]
+            promoted = buf[random.getrandbits(1)::2]
+            self._levels[level] = [keep] if keep.size else []
+            self._sizes[level] = int(keep.size)
+            self._push(level + 1, promoted)
+
+    def quantile(self, q: float) -> Optional[float]:
+        if self.count == 0:
+            return None
+        if self.is_exact:
+            return float(np.quantile(np.concatenate(self._levels[0]), q))
+
+        vals: List[np.ndarray] = []
+        weights: List[np.ndarray] = []
+        for level, arrays in enumerate(self._levels):
+            for arr in arrays:
+                vals.append(arr)
+                weights.append(np.full(arr.size, float(2 ** level)))
+        v = np.concatenate(vals)
+        w = np.concatenate(weights)
+        order = np.argsort(v, kind="stable")
+        v, cw = v[order], np.cumsum(w[order])
+        target = q * cw[-1]
+        idx = int(np.searchsorted(cw, target, side="left"))
+        return float(v[min(idx, v.size - 1)])
+
+    def median(self) -> Optional[float]:
+        return self.quantile(0.5)
+
+    def rank_error(self) -> float:
+        """Rough normalized rank error bound (0.0 while exact)."""
+        if self.is_exact:
+            return 0.0
+        return float(np.sqrt(len(self._levels)) / self.capacity)
+
+
+class DistinctReservoir:
+    """
+    Uniform sample of up to k *distinct* values (bottom-k by salted hash).
+    - Bounded memory, independent of stream length
+    - Keeps first-appearance order while no value was ever rejected
+    """
+
+    def __init__(self, k: int = 5, salt: Optional[str] = None):
+        self.k = int(k)
+        self.salt = salt if salt is not None else f"{random.getrandbits(64):016x}"[:16]
+        self._items: Dict[Any, int] = {}
+        self.overflowed = False
+
+    def update(self, values: List[Any]) -> None:
+        if self.k <= 0 or not values:
+            return
+        new = [v for v in values if v not in self._items]
+        if not new:
+            return
+        arr = np.empty(len(new), dtype=object)
+        arr[:] = new
+        prio = pd.util.hash_array(arr, hash_key=self.salt)
+        if len(new) > self.k:
+            self.overflowed = True
+            keep = np.argpartition(prio, self.k - 1)[: self.k]
+            keep.sort()
+            new = [new[i] for i in keep]
+            prio = prio[keep]
+
+        for v, p in zip(new, prio.tolist()):
+            self._items[v] = p
+        if len(self._items) > self.k:
+            self.overflowed = True
+            ranked = sorted(self._items.items(), key=lambda kv: kv[1])[: self.k]
+            kept = {v for v, _ in ranked}
+            self._items = {v: p for v, p in self._items.items() if v in kept}
+
+    def values(self) -> List[Any]:
+        if not self.overflowed:
+            return list(self._items)
+        return [v for v, _ in sorted(self._items.items(), key=lambda kv: kv[1])]
+
+
+class HyperLogLog:
+    """
+    HyperLogLog distinct counter over 64-bit value hashes (pd.util.hash_array).
+    - 2**precision one-byte registers (16KB at the default precision 14)
+    - relative standard error ~ 1.04 / sqrt(2**precision); linear counting for small cardinalities
+    - Mergeable (register-wise max)
+    """
+
+    def __init__(self, precision: int = 14):
+        if not 4 <= precision <= 18:
+            raise ValueError("precision must be in [4, 18]")
+        self.precision = int(precision)
+        self.m = 1 << self.precision
+        self.registers = np.zeros(self.m, dtype=np.uint8)
+
+    @property
+    def relative_error(self) -> float:
+        return 1.04 / math.sqrt(self.m)
+
+    def update(self, values: np.ndarray) -> None:
+        values = np.asarray(values)
+        if values.size == 0:
+            return
+        if values.dtype.kind == "f":
+            values = values + 0.0  # -0.0 -> 0.0 (equal values must hash equally)
+        h = pd.util.hash_array(values, categorize=False)
+        idx = (h >> np.uint64(64 - self.precision)).astype(np.intp)
+        # rank = position of the first 1-bit in the next 32 hash bits (exact in float64)
+        w = ((h >> np.uint64(32 - self.precision)) & np.uint64(0xFFFFFFFF)).astype(np.float64)
+        rank = np.full(w.shape, 33, dtype=np.uint8)
+        nz = w > 0
+        rank[nz] = (32 - np.floor(np.log2(w[nz]))).astype(np.uint8)
+        np.maximum.at(self.registers, idx, rank)
+
+    def merge(self, other: "HyperLogLog") -> None:
+        if other.precision != self.precision:
+            raise ValueError("cannot merge HyperLogLog sketches of different precision")
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def count(self) -> float:
+        m = float(self.m)
+        alpha = 0.7213 / (1.0 + 1.079 / m)
+        estimate = alpha * m * m / float(np.ldexp(1.0, -self.registers.astype(np.int32)).sum())
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros:
+            return m * math.log(m / zeros)
+        return estimate
+
+
+class DuplicateTracker:
+    """
+    Exact "has any value repeated?" check over 64-bit fingerprints.
+    - Holds fingerprints only while the stream is still duplicate-free; released on the first duplicate
+    - A fingerprint collision (p ~ n**2 / 2**65) is the only way to report a false duplicate
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.duplicated = False
+        self._chunks: List[np.ndarray] = []
+
+    def update(self, values: np.ndarray) -> None:
+        values = np.asarray(values)
+        if self.duplicated or values.size == 0:
+            return
+        if values.dtype.kind == "f":
+            values = values + 0.0
+        h = np.sort(pd.util.hash_array(values, categorize=False))
+        self.count += int(h.size)
+        if h.size > 1 and bool((h[1:] == h[:-1]).any()):
+            self.release()
+            return
+        for prev in self._chunks:
+            pos = np.searchsorted(prev, h).clip(max=prev.size - 1)
+            if bool((prev[pos] == h).any()):
+                self.release()
+                return
+        self._chunks.append(h)
+        if len(self._chunks) > 8:  # bound the per-chunk probe cost
+            self._chunks = [np.sort(np.concatenate(self._chunks))]
+
+    def release(self) -> None:
+        self.duplicated = True
+        self._chunks = []
+
+    @property
+    def all_distinct(self) -> bool:
+        return not self.duplicated
+
+
+# fixed so that signatures of different columns / runs are comparable
+_MINHASH_SEED = 0x5EED
+_MINHASH_BLOCK = 4096
+
+def _splitmix64(z: np.ndarray) -> np.ndarray:
+    """splitmix64 finalizer (uint64 arithmetic wraps)."""
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return z ^ (z >> np.uint64(31))
+
+def canonical_values(values: List[Any]) -> np.ndarray:
+    """
+    Values -> comparable strings for value-overlap sketches (object array):
+    numbers by value (1, 1.0, "1" and "1.0" are equal), everything else stripped + lowercased.
+    """
+    s = pd.Series(values, dtype=object)
+    out = s.astype(str).str.strip().str.lower().to_numpy(dtype=object)
+    nums = pd.to_numeric(s, errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+    finite = np.isfinite(nums)
+    integral = finite & (nums == np.floor(nums)) & (np.abs(nums) < 2.0 ** 53)
+    out[integral] = nums[integral].astype(np.int64).astype(str).astype(object)
+    other = finite & ~integral
+    out[other] = [repr(float(v)) for v in nums[other]]
+    return out
+
+
+class MinHash:
+    """
+    MinHash signature of a value set: num_perm minimums of independently mixed 64-bit value hashes.
+    - values go through canonical_values, so typed and text columns of the same domain compare
+    - P(sig_a[i] == sig_b[i]) = Jaccard(a, b); mergeable (element-wise min); order/duplicate insensitive
+    - an empty set keeps the EMPTY sentinel in every slot
+    """
+
+    EMPTY = np.iinfo(np.uint64).max
+
+    def __init__(self, num_perm: int = 64):
+        if num_perm < 1:
+            raise ValueError("num_perm must be >= 1")
+        self.num_perm = int(num_perm)
+        self.signature = np.full(self.num_perm, self.EMPTY, dtype=np.uint64)
+        rng = np.random.default_rng(_MINHASH_SEED)
+        self._salts = rng.integers(0, self.EMPTY, size=self.num_perm, dtype=np.uint64, endpoint=True)
+
+    @classmethod
+    def of(cls, values: List[Any], num_perm: int = 64) -> "MinHash":
+        mh = cls(num_perm)
+        mh.update(values)
+        return mh
+
+    @property
+    def is_empty(self) -> bool:
+        return bool((self.signature == self.EMPTY).all())
+
+    def update(self, values: List[Any]) -> None:
+        if len(values) == 0:
+            return
+        h = pd.util.hash_array(canonical_values(values))
+        for start in range(0, h.size, _MINHASH_BLOCK):
+            block = h[None, start:start + _MINHASH_BLOCK] ^ self._salts[:, None]
+            np.minimum(self.signature, _splitmix64(block).min(axis=1), out=self.signature)
+
+    def merge(self, other: "MinHash") -> None:
+        if other.num_perm != self.num_perm:
+            raise ValueError("cannot merge MinHash sketches of different num_perm")
+        np.minimum(self.signature, other.signature, out=self.signature)
+
+    def jaccard(self, other: "MinHash") -> float:
+        return float(np.mean(self.signature == other.signature))
+
+    def tolist(self) -> Optional[List[int]]:
+        """Signature as Python ints (SchemaContext payload); None for an empty set."""
+        return None if self.is_empty else self.signature.tolist()
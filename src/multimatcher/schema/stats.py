@@ -6,24 +6,108 @@ import numpy as np
 import pandas as pd
 from pandas.api import types as pdt
 
-def stat_compute(series: pd.Series) -> Optional[Dict[str, Optional[Union[int, float, str, bool]]]]:
-    if pd.api.types.is_numeric_dtype(series):
-        null_count = series.isna().sum()
-        count_val = series.count()
-        percentage_unique = round(series.nunique() / count_val * 100, 1) if count_val > 0 else None
+from .sketches import HyperLogLog
 
+PROFILE_MODES = ("exact", "approx")
+
+# approx mode: only columns whose distinct estimate is within this many standard errors of
+# the row count get the exact uniqueness check
+_UNIQUE_CHECK_SIGMAS = 6.0
+
+def stat_compute(
+    series: pd.Series,
+    mode: str = "exact",
+    hll_precision: int = 14,
+) -> Optional[Dict[str, Optional[Union[int, float, str, bool]]]]:
+    """
+    Numeric summary in one vectorized kernel (same values as the pandas reductions):
+    a single sort gives min/max/median/#unique, one masked sum gives mean/var/std.
+    Non-numeric (incl. bool) columns -> None.
+    mode="approx": no sort; median by selection (np.partition), #unique by HyperLogLog,
+    exact uniqueness check only for columns that may be unique; adds "approximation" error bounds.
+    """
+    if mode not in PROFILE_MODES:
+        raise ValueError(f"Unknown profile_mode: {mode}. Must be 'exact' or 'approx'.")
+    if not pdt.is_numeric_dtype(series) or pdt.is_bool_dtype(series):
+        return None
+
+    mask = series.isna().to_numpy()
+    values = series.to_numpy()[~mask] if mask.any() else series.to_numpy()
+    null_count = int(mask.sum())
+    count_val = int(values.size)
+    if count_val == 0:
         return {
-            "count": count_val,
-            "min": round(series.min(), 1) if count_val > 0 else None,
-            "max": round(series.max(), 1) if count_val > 0 else None,
-            "mean": round(series.mean(), 1) if count_val > 0 else None,
-            "median": round(series.median(), 1) if count_val > 0 else None,
-            "std": round(series.std(), 1) if count_val > 0 else None,
-            "var": round(series.var(), 1) if count_val > 0 else None,
+            "count": 0, "min": None, "max": None, "mean": None, "median": None,
+            "std": None, "var": None, "percentage_unique_value": None,
+            "possible_primary_key": False,
+        }
+
+    lo, hi = (count_val - 1) // 2, count_val // 2
+    if mode == "approx":
+        vmin, vmax = values.min(), values.max()
+        part = np.partition(values.astype(np.float64), [lo, hi])
+        median = (part[lo] + part[hi]) / 2
+        hll = HyperLogLog(hll_precision)
+        hll.update(values.astype(np.float64))
+        may_be_unique = hll.count() >= count_val * (1 - _UNIQUE_CHECK_SIGMAS * hll.relative_error)
+        unique = approx_unique_stats(
+            count_val, null_count, hll, all_distinct=may_be_unique and pd.Series(values).is_unique
+        )
+    else:
+        sv = np.sort(values)
+        vmin, vmax = sv[0], sv[-1]
+        median = (np.float64(sv[lo]) + np.float64(sv[hi])) / 2
+        n_unique = int(np.count_nonzero(sv[1:] != sv[:-1])) + 1
+        percentage_unique = round(n_unique / count_val * 100, 1)
+        unique = {
             "percentage_unique_value": percentage_unique,
-            "possible_primary_key": bool(null_count == 0 and (percentage_unique == 100)),
+            "possible_primary_key": bool(null_count == 0 and percentage_unique == 100),
         }
-    return None
+
+    # pandas (nanops) sums the full-length array with NaN zero-filled; do the same so the
+    # floating-point summation order (and thus the rounded result) is identical
+    full = series.to_numpy(dtype=np.float64, na_value=np.nan)
+    if null_count:
+        full = np.where(mask, 0.0, full)
+    mean = full.sum(dtype=np.float64) / count_val
+    if count_val > 1:
+        sqr = (mean - full) ** 2
+        if null_count:
+            sqr[mask] = 0.0
+        var = sqr.sum(dtype=np.float64) / (count_val - 1)
+    else:
+        var = np.float64(np.nan)
+
+    summary = {
+        "count": count_val,
+        "min": round(vmin, 1),
+        "max": round(vmax, 1),
+        "mean": round(mean, 1),
+        "median": round(median, 1),
+        "std": round(np.sqrt(var), 1),
+        "var": round(var, 1),
+        **unique,
+    }
+    if mode == "approx":
+        summary["approximation"] = {
+            "distinct_relative_error": round(hll.relative_error, 4),
+            "median_rank_error": 0.0,
+        }
+    return summary
+
+def approx_unique_stats(count: int, null_count: int, hll: HyperLogLog, all_distinct: bool) -> Dict[str, Any]:
+    """
+    percentage_unique_value from a HyperLogLog estimate; uniqueness itself is exact, so a
+    duplicate-free column always reports 100.0 / possible_primary_key, and any other column < 100.
+    """
+    if all_distinct:
+        percentage_unique = 100.0
+    else:
+        percentage_unique = min(round(min(hll.count(), count) / count * 100, 1), 99.9)
+    return {
+        "percentage_unique_value": percentage_unique,
+        "possible_primary_key": bool(null_count == 0 and all_distinct),
+    }
 
 def get_data_type(series: pd.Series) -> str:
     dtype = series.dtype
@@ -39,42 +123,78 @@ def get_data_type(series: pd.Series) -> str:
         return "datetime"
     return str(dtype)
 
-def extract_unique_values(col_vals: pd.Series) -> List[Any]:
-    """Supports JSON-encoded list strings; flattens list values if any exist."""
-    def try_parse(x: Any) -> Any:
-        if isinstance(x, str):
-            s = x.strip()
-            if s.startswith("[") and s.endswith("]"):
-                try:
-                    parsed = json.loads(s)
-                    if isinstance(parsed, list):
-                        return parsed
-                except json.JSONDecodeError:
-                    pass
+def _load_json_list(x: str) -> Any:
+    try:
+        parsed = json.loads(x.strip())
+    except json.JSONDecodeError:
         return x
+    return parsed if isinstance(parsed, list) else x
 
-    def flatten(x: Any):
-        if isinstance(x, list):
-            for elem in x:
-                yield from flatten(elem)
+# infer_dtype kinds of object columns that may hold str / list values
+_MIXED_KINDS = ("mixed", "mixed-integer")
+
+def _parse_json_lists(col_vals: pd.Series) -> pd.Series:
+    """Replace JSON-encoded list strings by lists; only candidate strings reach json.loads."""
+    if pdt.is_string_dtype(col_vals) and col_vals.dtype != object:
+        is_str = col_vals.notna().to_numpy()
+    elif col_vals.dtype == object:
+        kind = pdt.infer_dtype(col_vals, skipna=True)  # C-level scan
+        if kind == "string":
+            is_str = col_vals.notna().to_numpy()
+        elif kind in _MIXED_KINDS:
+            is_str = np.fromiter((type(v) is str for v in col_vals.to_numpy()), bool, len(col_vals))
         else:
-            yield x
-
-    parsed = col_vals.map(try_parse)
-
-    if parsed.apply(lambda x: isinstance(x, list)).any():
-        seen = set()
-        uniques: List[Any] = []
-        for item in parsed:
-            for val in flatten(item):
-                if pd.isna(val):
-                    continue
-                if val not in seen:
-                    seen.add(val)
-                    uniques.append(val)
-        return uniques
-
-    return parsed.unique().tolist()
+            return col_vals
+    else:
+        return col_vals
+    if not is_str.any():
+        return col_vals
+
+    stripped = col_vals[is_str].astype(object).str.strip()
+    candidates = np.zeros(len(col_vals), dtype=bool)
+    candidates[is_str] = (stripped.str.startswith("[") & stripped.str.endswith("]")).to_numpy(dtype=bool)
+    if not candidates.any():
+        return col_vals
+
+    arr = col_vals.to_numpy(dtype=object, copy=True)
+    for i in np.flatnonzero(candidates):
+        arr[i] = _load_json_list(arr[i])
+    return pd.Series(arr, dtype=object)
+
+def _has_lists(values: pd.Series) -> bool:
+    if values.dtype != object:
+        return False
+    # lists only show up in the "mixed" kinds
+    if pdt.infer_dtype(values, skipna=True) not in _MIXED_KINDS:
+        return False
+    return any(isinstance(v, list) for v in values.to_numpy())
+
+def _flatten_unique(values: pd.Series) -> List[Any]:
+    while _has_lists(values):
+        values = values.explode(ignore_index=True)
+    return pd.unique(values.dropna()).tolist()
+
+def extract_unique_values(col_vals: pd.Series) -> List[Any]:
+    """
+    Supports JSON-encoded list strings; flattens list values if any exist.
+    - hashable columns are factorized first, so JSON-list detection (vectorized .str ops)
+      and parsing only touch distinct values
+    - (nested) lists are flattened with repeated explode, keeping first-seen order
+    """
+    if _has_lists(col_vals):  # native list values (JSON documents)
+        return _flatten_unique(_parse_json_lists(col_vals))
+
+    if col_vals.dtype == object:
+        col_vals = col_vals.infer_objects()  # e.g. all-numeric object column -> float64 (as Series.map did)
+    uniques = pd.Series(pd.unique(col_vals), dtype=col_vals.dtype)
+    parsed = _parse_json_lists(uniques)
+    if not _has_lists(parsed):
+        return parsed.tolist()
+
+    # JSON-list strings: parse each distinct string once, expand back to row order, flatten
+    codes, distinct = pd.factorize(col_vals)  # NA -> -1 (dropped by the flatten anyway)
+    parsed = _parse_json_lists(pd.Series(distinct, dtype=object)).to_numpy(dtype=object)
+    return _flatten_unique(pd.Series(parsed[codes[codes >= 0]], dtype=object))
 
 def sample_up_to_k(values: List[Any], k: int = 5) -> List[Any]:
     return values if len(values) <= k else random.sample(values, k=k)
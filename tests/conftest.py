@@ -0,0 +1,8 @@
+# tests/conftest.py
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+# packaging 없이 바로 실행 (same as scripts/): add repo_root/src to sys.path
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
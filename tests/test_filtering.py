@@ -0,0 +1,145 @@
+# tests/test_filtering.py
+"""Vectorized / typed / streamed filtering must match the straightforward per-row versions."""
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from multimatcher.filtering.kneedle import kneedle, kneedle_rows
+from multimatcher.filtering.streaming import stream_filter
+from multimatcher.filtering.thresholding import apply_thresholds, build_sim_matrices, compute_thresholds
+from multimatcher.filtering.value_overlap import ValueOverlap, merge_value_candidates
+from multimatcher.retrieval.dense_cosine import dense_cosine_topk, iter_neighbor_blocks
+from multimatcher.retrieval.neighbors import NeighborArrays
+
+BLOCK_ROWS = 16  # same for batch and streamed retrieval, so the scores are bit-identical
+
+
+def _embeddings(n: int = 90, dim: int = 8, duplicates: int = 0, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(max(1, n // 5), dim))
+    x = centers[rng.integers(0, len(centers), size=n)] + 0.5 * rng.normal(size=(n, dim))
+    x[n - duplicates:] = x[:duplicates]  # identical vectors tie with self
+    return x.astype(np.float32)
+
+
+def _ids(n: int) -> np.ndarray:
+    ids = np.empty(n, dtype=object)
+    ids[:] = [f"source_{i % 4}/column_{i}" for i in range(n)]
+    return ids
+
+
+def _meta(ids: np.ndarray):
+    return [{"source_name": s.split("/")[0], "element_name": s.split("/")[1]} for s in ids]
+
+
+def _overlap(n: int, pairs: int = 60, seed: int = 1) -> ValueOverlap:
+    rng = np.random.default_rng(seed)
+    p = np.unique(np.sort(rng.integers(0, n, size=(pairs, 2)), axis=1), axis=0)
+    p = p[p[:, 0] != p[:, 1]]
+    jaccard = np.round(rng.uniform(0.5, 1.0, size=len(p)), 1).astype(np.float32)  # with ties
+    return ValueOverlap(
+        left=np.concatenate([p[:, 0], p[:, 1]]).astype(np.int32),
+        right=np.concatenate([p[:, 1], p[:, 0]]).astype(np.int32),
+        jaccard=np.concatenate([jaccard, jaccard]),
+        colliding=len(p),
+        skipped_buckets=0,
+    )
+
+
+def _batch(x, ids, top_k, overlap=None, as_graph=False):
+    neighbors = NeighborArrays(*dense_cosine_topk(x, top_k=top_k, block_rows=BLOCK_ROWS))
+    sim_matrix, similarity_matrix = build_sim_matrices(neighbors, _meta(ids))
+    thresholds = compute_thresholds(similarity_matrix)
+    value_candidates = None if overlap is None else merge_value_candidates(sim_matrix, similarity_matrix, overlap)
+    out = apply_thresholds(sim_matrix, similarity_matrix, thresholds, value_candidates, as_graph=as_graph)
+    return thresholds, out, (sim_matrix, similarity_matrix)
+
+
+@pytest.mark.parametrize("n", [3, 4, 10, 57, 200])
+def test_kneedle_rows_matches_kneedle(n):
+    rng = np.random.default_rng(n)
+    rows = [
+        -np.sort(-rng.random(n)),
+        -np.sort(-np.round(rng.random(n), 1)),  # ties
+        -np.sort(-rng.beta(2, 5, n).astype(np.float32)).astype(float),
+        np.linspace(1.0, 0.0, n),
+        np.full(n, 0.5),
+    ]
+    got = kneedle_rows(np.stack(rows))
+    for row, value in zip(rows, got):
+        expected = kneedle(row)
+        if expected is None:
+            assert np.isnan(value)
+        else:
+            assert value == expected
+
+
+def test_compute_thresholds_matches_per_row_kneedle():
+    x = _embeddings()
+    _, _, (_, similarity_matrix) = _batch(x, _ids(len(x)), top_k=12)
+    padded = similarity_matrix.copy()
+    padded[::3, 8:] = np.nan  # shorter rows (blocking / truncated retrieval)
+    thresholds = compute_thresholds(padded)
+    for row, value in zip(padded, thresholds):
+        scores = row[~np.isnan(row)].astype(float)
+        expected = kneedle(scores)
+        assert value == (0.0 if expected is None else expected)
+
+
+@pytest.mark.parametrize("top_k", [None, 7])
+def test_apply_thresholds_matches_reference(top_k):
+    x = _embeddings()
+    ids = _ids(len(x))
+    thresholds, (filtered, _), (sim_matrix, similarity_matrix) = _batch(x, ids, top_k)
+    for i, row in enumerate(filtered):
+        keep = np.flatnonzero(similarity_matrix[i] >= thresholds[i])
+        keep = keep[np.argsort(-similarity_matrix[i, keep], kind="stable")]
+        self_first = sorted(keep.tolist(), key=lambda c: sim_matrix.indices[i, c] != i)
+        assert row == [
+            {"Candidate": ids[sim_matrix.indices[i, c]], "Cosine Similarity": float(similarity_matrix[i, c])}
+            for c in self_first
+        ]
+
+
+@pytest.mark.parametrize("top_k", [None, 7])
+def test_graph_and_lists_drop_self_by_index(top_k):
+    x = _embeddings(duplicates=20)
+    ids = _ids(len(x))
+    _, (filtered, real_filter), _ = _batch(x, ids, top_k)
+    _, graph, _ = _batch(x, ids, top_k, as_graph=True)
+    for i in range(len(x)):
+        assert filtered[i][0]["Candidate"] == ids[i]
+        assert [e["Candidate"] for e in real_filter[i]] == ids[graph.row(i)].tolist()
+        assert ids[i] not in {e["Candidate"] for e in real_filter[i]}
+    assert graph.to_lists(ids) == real_filter
+
+
+@pytest.mark.parametrize("top_k", [None, 7])
+@pytest.mark.parametrize("with_overlap", [False, True])
+def test_stream_filter_matches_batch(top_k, with_overlap):
+    x = _embeddings(duplicates=6)
+    ids = _ids(len(x))
+    overlap = _overlap(len(x)) if with_overlap else None
+    thresholds, lists, _ = _batch(x, ids, top_k, overlap)
+    _, graph, _ = _batch(x, ids, top_k, overlap, as_graph=True)
+    blocks = lambda: iter_neighbor_blocks(x, top_k=top_k, block_rows=BLOCK_ROWS)
+
+    streamed_thresholds, streamed_lists = stream_filter(blocks(), ids, overlap=overlap)
+    _, streamed_graph = stream_filter(blocks(), ids, overlap=overlap, as_graph=True)
+    np.testing.assert_array_equal(streamed_thresholds, thresholds)
+    assert streamed_lists == lists
+    assert streamed_graph.to_lists(ids) == graph.to_lists(ids) == lists[1]
+    if with_overlap and top_k:
+        # partners outside the top-k list have no cosine: None, never NaN
+        assert any(e["Cosine Similarity"] is None for row in lists[0] for e in row)
+
+
+def test_value_overlap_partners_kept_below_threshold():
+    x = _embeddings()
+    ids = _ids(len(x))
+    overlap = _overlap(len(x))
+    _, (filtered, _), _ = _batch(x, ids, top_k=7, overlap=overlap)
+    for left, right, jaccard in zip(overlap.left.tolist(), overlap.right.tolist(), overlap.jaccard.tolist()):
+        entry = next(e for e in filtered[left] if e["Candidate"] == ids[right])
+        assert entry["Value Jaccard"] == jaccard
@@ -0,0 +1,183 @@
+# tests/test_profiling.py
+"""Chunked / streamed / cached profiling must reproduce the in-memory DataFrame profile."""
+from __future__ import annotations
+
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from multimatcher.schema.build import graph_edge_generation, schema_generation
+from multimatcher.schema.cache import ProfileCache
+from multimatcher.schema.profile import ProfileConfig
+from multimatcher.schema.stats import extract_unique_values, stat_compute
+
+
+def _write_csv(path, n: int = 40) -> None:
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(
+        {
+            "id": np.arange(n),
+            "code": rng.integers(0, 4, n),
+            "score": rng.normal(50, 10, n).round(3),
+            "maybe_int": [None if i % 7 == 3 else i for i in range(n)],
+            "flag": [bool(i % 2) for i in range(n)],
+            "maybe_flag": [None if i % 5 == 0 else bool(i % 3) for i in range(n)],
+            "name": [f"name_{i % 9}" for i in range(n)],
+            "tag": [["a", "b"][i % 2] for i in range(n)],
+            "empty": [None] * n,
+        }
+    )
+    df.to_csv(path, index=False)
+
+
+def _write_jsonl(path, n: int = 25) -> None:
+    records = []
+    for i in range(n):
+        rec = {
+            "id": i,
+            "kind": ["x", "y", "z"][i % 3],
+            "price": i * 1.25 if i % 4 else i,  # int + float -> float
+            "stock": None if i % 6 == 1 else i % 5,  # int + explicit null -> float
+            "active": bool(i % 2),
+            "meta": {"rank": i % 4, "label": f"l{i % 2}"},
+        }
+        if i % 5 != 2:
+            rec["optional"] = i  # absent key -> NaN in the DataFrame
+        if i % 3 == 0:
+            rec["note"] = None  # explicit null only
+        records.append(rec)
+    path.write_text("\n".join(json.dumps(r) for r in records) + "\n")
+
+
+def assert_same_contexts(expected, actual) -> None:
+    """Equal SchemaContexts; sample_values are random draws, so beyond k distinct only their validity is checked."""
+    assert [c.element_name for c in actual] == [c.element_name for c in expected]
+    for e, a in zip(expected, actual):
+        assert a.model_dump(exclude={"sample_values"}) == e.model_dump(exclude={"sample_values"}), e.element_name
+        if len(e.sample_values) < 5:
+            assert a.sample_values == e.sample_values, e.element_name
+        else:
+            assert len(a.sample_values) == len(e.sample_values)
+            assert len(set(map(str, a.sample_values))) == len(a.sample_values)
+
+
+@pytest.mark.parametrize("chunksize", [1, 7, 1000])
+def test_chunked_csv_matches_in_memory(tmp_path, chunksize):
+    _write_csv(tmp_path / "t.csv")
+    expected = schema_generation(str(tmp_path), "t.csv", "table")
+    actual = schema_generation(str(tmp_path), "t.csv", "table", profile=ProfileConfig(chunksize=chunksize))
+    assert_same_contexts(expected, actual)
+
+
+def test_chunked_csv_distinct_cap_keeps_uniqueness_exact(tmp_path):
+    _write_csv(tmp_path / "t.csv", n=300)
+    expected = {c.element_name: c.stat_summary for c in schema_generation(str(tmp_path), "t.csv", "table")}
+    capped = schema_generation(str(tmp_path), "t.csv", "table", profile=ProfileConfig(chunksize=50, distinct_cap=10))
+    for ctx in capped:
+        stats = ctx.stat_summary
+        if not stats:
+            continue
+        assert stats["possible_primary_key"] == expected[ctx.element_name]["possible_primary_key"]
+        if ctx.element_name in ("id", "score", "maybe_int"):
+            assert "approximation" in stats
+        else:  # "code": 4 distinct values, under the cap
+            assert stats == expected[ctx.element_name]
+
+
+@pytest.mark.parametrize("chunksize", [1, 4, 1000])
+def test_streamed_jsonl_matches_dataframe(tmp_path, chunksize):
+    _write_jsonl(tmp_path / "doc.json")
+    expected = schema_generation(str(tmp_path), "doc.json", "document")
+    actual = schema_generation(str(tmp_path), "doc.json", "document", profile=ProfileConfig(chunksize=chunksize))
+    assert_same_contexts(expected, actual)
+
+
+def test_streamed_jsonl_integers_beyond_int64(tmp_path):
+    # regression: np.asarray(..., dtype=np.int64) raised OverflowError on these
+    records = [
+        {
+            "big": 2**70 if i == 3 else i,  # beyond uint64 -> object
+            "unsigned": 2**63 + i,  # uint64
+            "mixed_sign": -1 if i == 0 else (2**63 if i == 5 else i),  # no common integer dtype -> object
+            "with_float": 1.5 if i == 0 else (2**63 if i == 2 else i),  # float64
+            "float_big": 0.5 if i == 0 else (2**70 if i == 6 else i),  # object
+        }
+        for i in range(8)
+    ]
+    (tmp_path / "doc.json").write_text("\n".join(json.dumps(r) for r in records) + "\n")
+    expected = schema_generation(str(tmp_path), "doc.json", "document")
+    for chunksize in (2, 100):
+        actual = schema_generation(str(tmp_path), "doc.json", "document", profile=ProfileConfig(chunksize=chunksize))
+        assert_same_contexts(expected, actual)
+    types = {c.element_name: c.data_type for c in expected}
+    assert types == {
+        "big": "string", "unsigned": "integer", "mixed_sign": "string", "with_float": "float", "float_big": "string",
+    }
+
+
+@pytest.mark.parametrize(
+    "values",
+    [
+        [3, 1, 2, 2, None, 7],
+        [0.5, -1.25, 3.0, None, 0.5],
+        [10, 10, 10],
+        [None, None],
+        list(range(101)),
+    ],
+)
+def test_stat_compute_matches_pandas(values):
+    series = pd.Series(values, dtype=float if None in values else None)
+    present = series.dropna()
+    stats = stat_compute(series)
+    if present.empty:
+        assert stats["count"] == 0
+        return
+    expected = {
+        "count": int(present.count()),
+        "min": round(present.min(), 1),
+        "max": round(present.max(), 1),
+        "mean": round(series.mean(), 1),
+        "median": round(series.median(), 1),
+        "var": round(series.var(), 1) if present.size > 1 else None,
+        "percentage_unique_value": round(present.nunique() / present.size * 100, 1),
+    }
+    for key, value in expected.items():
+        if value is None:
+            assert np.isnan(stats[key])
+        else:
+            assert stats[key] == value, key
+
+
+def test_extract_unique_values_first_seen_order():
+    series = pd.Series(["b", "a", "b", '["c", "a"]', "d", None])
+    assert extract_unique_values(series.dropna()) == ["b", "a", "c", "d"]
+
+
+def test_cache_hit_matches_fresh_profile(tmp_path):
+    _write_csv(tmp_path / "t.csv")
+    _write_jsonl(tmp_path / "doc.json")
+    cache = ProfileCache(str(tmp_path / "cache"))
+    for fname, model in (("t.csv", "table"), ("doc.json", "document"), ("t.csv", "graph")):
+        fresh = schema_generation(str(tmp_path), fname, model)
+        stored = schema_generation(str(tmp_path), fname, model, cache=cache)
+        hit = schema_generation(str(tmp_path), fname, model, cache=cache)
+        assert hit == stored
+        assert_same_contexts(fresh, hit)
+    assert (cache.hits, cache.misses) == (3, 3)
+
+    edge = graph_edge_generation(str(tmp_path), "t.csv", "out", "a", "b", cache=cache)
+    assert graph_edge_generation(str(tmp_path), "t.csv", "out", "a", "b", cache=cache) == edge
+    with_edges = schema_generation(str(tmp_path), "t.csv", "graph", [edge], cache=cache)
+    assert all(ctx.graph_edges == [edge] for ctx in with_edges)
+    assert cache.misses == 4  # edges are attached to the cached edge-free profile
+
+
+def test_cache_key_ignores_seed_without_row_budget(tmp_path):
+    _write_csv(tmp_path / "t.csv")
+    cache = ProfileCache(str(tmp_path / "cache"))
+    path = str(tmp_path / "t.csv")
+    key = lambda **kw: cache.key("schema", path, {"model": "table"}, ProfileConfig(**kw))
+    assert key(sample_seed=0) == key(sample_seed=1) == key(row_budget=0, sample_seed=2)
+    assert key(row_budget=10, sample_seed=0) != key(row_budget=10, sample_seed=1)